@@ -11,6 +11,31 @@ import vertexai
 load_dotenv()
 
 
+def _model_quotas(defaults: dict) -> dict:
+    """
+    Merge MODEL_QUOTAS overrides into the default quotas per model and setting
+
+    Overriding only "rpm" of a model keeps its default "tpm" and
+    "max_concurrency"; models without defaults are added as given.
+
+    Raises:
+        ValueError: If MODEL_QUOTAS is not a JSON object of objects
+    """
+    raw = os.getenv("MODEL_QUOTAS", "")
+    if not raw.strip():
+        return defaults
+    try:
+        overrides = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"MODEL_QUOTAS is not valid JSON: {e}") from None
+    if not isinstance(overrides, dict) or not all(isinstance(quota, dict) for quota in overrides.values()):
+        raise ValueError('MODEL_QUOTAS must map model names to objects, e.g. {"gemini-2.5-pro": {"rpm": 120}}')
+    return {
+        model: {**defaults.get(model, {}), **overrides.get(model, {})}
+        for model in {**defaults, **overrides}
+    }
+
+
 class Config:
     """Application configuration"""
 
@@ -22,6 +47,151 @@ class Config:
     # Gemini API Configuration
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 
+    # Model backend: "google" (Vertex AI / Gemini API) or "fake" (in-process stand-in for load tests)
+    MODEL_BACKEND = os.getenv("MODEL_BACKEND", "google").lower()
+    # Latency/error profile for the fake backend: inline JSON or a path to a JSON file
+    FAKE_BACKEND_PROFILE = os.getenv("FAKE_BACKEND_PROFILE", "")
+
+    # Async execution configuration (thread pool size and timeout per workload class)
+    TEXT_EXECUTOR_WORKERS = int(os.getenv("TEXT_EXECUTOR_WORKERS", "8"))
+    IMAGE_EXECUTOR_WORKERS = int(os.getenv("IMAGE_EXECUTOR_WORKERS", "4"))
+    VIDEO_EXECUTOR_WORKERS = int(os.getenv("VIDEO_EXECUTOR_WORKERS", "4"))
+    IO_EXECUTOR_WORKERS = int(os.getenv("IO_EXECUTOR_WORKERS", "8"))
+    TEXT_CALL_TIMEOUT = float(os.getenv("TEXT_CALL_TIMEOUT", "180"))
+    IMAGE_CALL_TIMEOUT = float(os.getenv("IMAGE_CALL_TIMEOUT", "120"))
+    VIDEO_CALL_TIMEOUT = float(os.getenv("VIDEO_CALL_TIMEOUT", "60"))
+    IO_CALL_TIMEOUT = float(os.getenv("IO_CALL_TIMEOUT", "60"))
+
+    # Per-model quotas used by the request scheduler (0 = unlimited).
+    # Override or extend with MODEL_QUOTAS='{"gemini-2.5-pro": {"rpm": 120}}' (settings merge per model)
+    MODEL_QUOTAS = _model_quotas({
+        "gemini-2.5-pro": {"rpm": 60, "tpm": 1000000, "max_concurrency": 16},
+        "gemini-2.5-flash": {"rpm": 120, "tpm": 2000000, "max_concurrency": 32},
+        "gemini-2.5-flash-image": {"rpm": 60, "tpm": 500000, "max_concurrency": 8},
+        "veo-3.0-generate-001": {"rpm": 10, "tpm": 0, "max_concurrency": 4},
+        "gemini-3-pro-preview": {"rpm": 30, "tpm": 1000000, "max_concurrency": 8},
+    })
+    DEFAULT_MODEL_CONCURRENCY = int(os.getenv("DEFAULT_MODEL_CONCURRENCY", "16"))
+    SCHEDULER_MAX_QUEUE_WAIT = float(os.getenv("SCHEDULER_MAX_QUEUE_WAIT", "300"))
+
+    # Retry, retry-budget and hedging configuration for model calls
+    RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+    RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1.0"))
+    RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "20"))
+    RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+    RETRY_BUDGET_MAX_TOKENS = float(os.getenv("RETRY_BUDGET_MAX_TOKENS", "10"))
+    HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "true").lower() == "true"
+    HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "2.0"))
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
+    # Maximum image variations generated concurrently per request (the model limiter still applies)
+    IMAGE_VARIATION_CONCURRENCY = int(os.getenv("IMAGE_VARIATION_CONCURRENCY", "5"))
+
+    # Batch translation packing: languages per prompt are limited by an output token budget and a hard cap
+    TRANSLATION_BATCH_OUTPUT_TOKENS = int(os.getenv("TRANSLATION_BATCH_OUTPUT_TOKENS", "8192"))
+    TRANSLATION_BATCH_MAX_LANGUAGES = int(os.getenv("TRANSLATION_BATCH_MAX_LANGUAGES", "4"))
+
+    # Translation memory, opt-in (SQLite file; empty keeps it in memory for the process lifetime).
+    # When disabled, batch translation uses the packed multi-language path only
+    TRANSLATION_MEMORY_ENABLED = os.getenv("TRANSLATION_MEMORY_ENABLED", "false").lower() == "true"
+    TRANSLATION_MEMORY_PATH = os.getenv("TRANSLATION_MEMORY_PATH", "")
+    TRANSLATION_MEMORY_FUZZY_THRESHOLD = float(os.getenv("TRANSLATION_MEMORY_FUZZY_THRESHOLD", "0.6"))
+
+    # Brief analysis response cache (memory LRU plus optional disk tier; empty dir disables disk)
+    BRIEF_CACHE_MAX_ENTRIES = int(os.getenv("BRIEF_CACHE_MAX_ENTRIES", "256"))
+    BRIEF_CACHE_DIR = os.getenv("BRIEF_CACHE_DIR", "")
+    BRIEF_CACHE_TTL = float(os.getenv("BRIEF_CACHE_TTL", "604800"))
+    BRIEF_CACHE_MAX_BYTES = int(os.getenv("BRIEF_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+
+    # Video operation polling: first check delay, adaptive interval bounds, concurrent status checks, overall timeout
+    VIDEO_POLL_INITIAL_DELAY = float(os.getenv("VIDEO_POLL_INITIAL_DELAY", "3"))
+    VIDEO_POLL_MIN_INTERVAL = float(os.getenv("VIDEO_POLL_MIN_INTERVAL", "2"))
+    VIDEO_POLL_MAX_INTERVAL = float(os.getenv("VIDEO_POLL_MAX_INTERVAL", "15"))
+    VIDEO_POLL_BATCH_SIZE = int(os.getenv("VIDEO_POLL_BATCH_SIZE", "32"))
+    VIDEO_OPERATION_TIMEOUT = float(os.getenv("VIDEO_OPERATION_TIMEOUT", "600"))
+
+    # Content-addressed media store ("local" directory or "gcs" bucket shared across workers);
+    # ASSET_BASE_URL prefixes asset URLs (empty = relative to this API)
+    ASSET_STORE = os.getenv("ASSET_STORE", "local").lower()
+    ASSET_STORE_DIR = os.getenv("ASSET_STORE_DIR", os.path.join(tempfile.gettempdir(), "brandstreams_assets"))
+    # Local store garbage collection: assets not stored or touched again within the TTL are deleted, then
+    # the least recently used ones until the directory fits in MAX_BYTES (0 disables either limit)
+    ASSET_STORE_TTL = float(os.getenv("ASSET_STORE_TTL", "604800"))
+    ASSET_STORE_MAX_BYTES = int(os.getenv("ASSET_STORE_MAX_BYTES", str(5 * 1024 * 1024 * 1024)))
+    ASSET_GCS_BUCKET = os.getenv("ASSET_GCS_BUCKET", "")
+    ASSET_GCS_PREFIX = os.getenv("ASSET_GCS_PREFIX", "assets")
+    ASSET_BASE_URL = os.getenv("ASSET_BASE_URL", "")
+
+    # Binary image uploads: size limit
+    MAX_IMAGE_UPLOAD_BYTES = int(os.getenv("MAX_IMAGE_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+
+    # Image preprocessing before model calls: longest edge per endpoint profile, JPEG quality, result cache size
+    IMAGE_PREPROCESS_ENABLED = os.getenv("IMAGE_PREPROCESS_ENABLED", "true").lower() == "true"
+    IMAGE_PREPROCESS_EDIT_MAX_EDGE = int(os.getenv("IMAGE_PREPROCESS_EDIT_MAX_EDGE", "1024"))
+    IMAGE_PREPROCESS_REFERENCE_MAX_EDGE = int(os.getenv("IMAGE_PREPROCESS_REFERENCE_MAX_EDGE", "1024"))
+    IMAGE_PREPROCESS_EVALUATION_MAX_EDGE = int(os.getenv("IMAGE_PREPROCESS_EVALUATION_MAX_EDGE", "768"))
+    IMAGE_PREPROCESS_VIDEO_MAX_EDGE = int(os.getenv("IMAGE_PREPROCESS_VIDEO_MAX_EDGE", "1280"))
+    IMAGE_PREPROCESS_JPEG_QUALITY = int(os.getenv("IMAGE_PREPROCESS_JPEG_QUALITY", "90"))
+    IMAGE_PREPROCESS_CACHE_BYTES = int(os.getenv("IMAGE_PREPROCESS_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+    # Run recognized common filters and adjustments (sepia, brightness, warmth, ...) locally instead of on the model
+    IMAGE_LOCAL_ENGINE_ENABLED = os.getenv("IMAGE_LOCAL_ENGINE_ENABLED", "true").lower() == "true"
+
+    # Image editing sessions: idle time before a session is dropped, memory budget for cached working images
+    EDIT_SESSION_IDLE_SECONDS = float(os.getenv("EDIT_SESSION_IDLE_SECONDS", "1800"))
+    EDIT_SESSION_MAX_BYTES = int(os.getenv("EDIT_SESSION_MAX_BYTES", str(256 * 1024 * 1024)))
+
+    # Document extraction process pool: workers, pages per parallel PDF shard, per-document page and time budgets
+    EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+    EXTRACTION_PAGES_PER_SHARD = int(os.getenv("EXTRACTION_PAGES_PER_SHARD", "20"))
+    EXTRACTION_MAX_PAGES = int(os.getenv("EXTRACTION_MAX_PAGES", "500"))
+    EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "60"))
+    EXTRACTION_MAX_TASKS_PER_CHILD = int(os.getenv("EXTRACTION_MAX_TASKS_PER_CHILD", "200"))
+    # Extraction engines per document type (see app/utils/extractor_backends.py; benchmark_extraction.py compares them)
+    EXTRACTION_PDF_BACKEND = os.getenv("EXTRACTION_PDF_BACKEND", "pypdf2")
+    EXTRACTION_DOCX_BACKEND = os.getenv("EXTRACTION_DOCX_BACKEND", "python-docx")
+
+    # Extraction result cache (memory LRU plus a disk tier shared by all workers on the host; empty dir disables disk)
+    EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "64"))
+    EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", os.path.join(tempfile.gettempdir(), "brandstreams_cache"))
+    EXTRACTION_CACHE_TTL = float(os.getenv("EXTRACTION_CACHE_TTL", "604800"))
+    EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+    # Brief files: scanned or image-heavy PDFs (large per page, or little extractable text per page) are sent to the
+    # model as the original document instead of extracted text, up to the inline request limit
+    BRIEF_DIRECT_UPLOAD_ENABLED = os.getenv("BRIEF_DIRECT_UPLOAD_ENABLED", "true").lower() == "true"
+    BRIEF_DIRECT_UPLOAD_MAX_BYTES = int(os.getenv("BRIEF_DIRECT_UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+    BRIEF_DIRECT_BYTES_PER_PAGE = int(os.getenv("BRIEF_DIRECT_BYTES_PER_PAGE", str(256 * 1024)))
+    BRIEF_MIN_CHARS_PER_PAGE = int(os.getenv("BRIEF_MIN_CHARS_PER_PAGE", "200"))
+
+    # Brief text compaction before analysis: normalization, duplicate removal and an input token budget
+    BRIEF_COMPACTION_ENABLED = os.getenv("BRIEF_COMPACTION_ENABLED", "true").lower() == "true"
+    BRIEF_MAX_INPUT_TOKENS = int(os.getenv("BRIEF_MAX_INPUT_TOKENS", "32000"))
+
+    # Chunked (map-reduce) analysis of long briefs: briefs above the threshold are split into chunks whose fields are
+    # extracted concurrently on the chunk model, then merged in one call (0 disables). Chunked briefs are compacted
+    # to BRIEF_CHUNK_TOKENS * BRIEF_MAX_CHUNKS instead of BRIEF_MAX_INPUT_TOKENS.
+    BRIEF_CHUNKED_THRESHOLD_TOKENS = int(os.getenv("BRIEF_CHUNKED_THRESHOLD_TOKENS", "24000"))
+    BRIEF_CHUNK_TOKENS = int(os.getenv("BRIEF_CHUNK_TOKENS", "8000"))
+    BRIEF_MAX_CHUNKS = int(os.getenv("BRIEF_MAX_CHUNKS", "16"))
+    BRIEF_CHUNK_MODEL = os.getenv("BRIEF_CHUNK_MODEL", "gemini-2.5-flash")
+
+    # Background jobs (video generation): store is "memory" or "sqlite"
+    JOB_STORE = os.getenv("JOB_STORE", "memory").lower()
+    JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "jobs.db")
+    JOB_MAX_CONCURRENT = int(os.getenv("JOB_MAX_CONCURRENT", "200"))
+    JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "86400"))
+    JOB_LONG_POLL_MAX = float(os.getenv("JOB_LONG_POLL_MAX", "30"))
+    # Seconds a worker's hold on its active jobs lasts without a heartbeat; jobs whose lease
+    # lapses (owner crashed or stopped) are failed by whichever worker notices first
+    JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+    # Assets stored or touched within this many seconds are never garbage collected, so images of live
+    # edit sessions and results of retained jobs stay servable; defaults to the longer of both lifetimes
+    ASSET_STORE_MIN_AGE = float(
+        os.getenv("ASSET_STORE_MIN_AGE", str(max(EDIT_SESSION_IDLE_SECONDS, JOB_RETENTION_SECONDS)))
+    )
+
     # API Configuration
     API_TITLE = "Brandstreams API"
     API_DESCRIPTION = "Creative brief analysis and ad creative evaluation API"
@@ -66,7 +236,7 @@ class Config:
     @classmethod
     def is_configured(cls) -> bool:
         """Check if required configuration is available"""
-        return bool(cls.PROJECT_ID)
+        return cls.MODEL_BACKEND == "fake" or bool(cls.PROJECT_ID)
 
 
 # Initialize Vertex AI on module import
@@ -124,17 +124,26 @@ class GeneratedImage(BaseModel):
     """Generated image data"""
     model_config = ConfigDict(frozen=False)
 
-    image_base64: str = Field(..., description="Base64 encoded image data")
+    asset_id: str = Field(..., description="Asset ID of the generated image")
+    image_url: str = Field(..., description="URL of the generated image")
     variation_number: int = Field(..., description="Variation number (1-based)")
     mime_type: str = Field(default="image/png", description="MIME type of the image")
 
 
+class VariationError(BaseModel):
+    """A generation variation that failed"""
+    model_config = ConfigDict(frozen=False)
+
+    variation_number: int = Field(..., description="Variation number (1-based)")
+    error: str = Field(..., description="Why the variation could not be generated")
+
+
 class GeneratedVideo(BaseModel):
     """Generated video data"""
     model_config = ConfigDict(frozen=False)
 
-    video_base64: Optional[str] = Field(None, description="Base64 encoded video data")
-    video_url: Optional[str] = Field(None, description="URL to the video (e.g., GCS signed URL)")
+    video_url: str = Field(..., description="URL to the video (asset endpoint or GCS signed URL)")
+    asset_id: Optional[str] = Field(None, description="Asset store ID when the video is served by this API")
     mime_type: str = Field(default="video/mp4", description="MIME type of the video")
     duration_seconds: Optional[float] = Field(None, description="Video duration in seconds")
 
@@ -174,5 +183,6 @@ class AssetGenerationResponse(BaseModel):
     model_config = ConfigDict(frozen=False)
 
     images: Optional[List[GeneratedImage]] = None
+    image_errors: Optional[List[VariationError]] = None
     video: Optional[GeneratedVideo] = None
     copy_variations: Optional[List[GeneratedCopy]] = None
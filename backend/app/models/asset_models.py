@@ -0,0 +1,14 @@
+"""
+Pydantic models for stored assets
+"""
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class AssetResponse(BaseModel):
+    """A stored asset"""
+    model_config = ConfigDict(frozen=False)
+
+    asset_id: str = Field(..., description="SHA-256 of the asset content")
+    url: str = Field(..., description="URL serving the asset")
+    mime_type: str = Field(..., description="MIME type of the asset")
+    size: int = Field(..., description="Size in bytes")
@@ -0,0 +1,48 @@
+"""
+Pydantic models for server-side image editing sessions
+"""
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from app.models.image_processing_models import ImageInput
+
+
+class EditSessionCreateRequest(ImageInput):
+    """Request model for starting an editing session from an image"""
+
+
+class SessionFilterRequest(BaseModel):
+    """Request model for applying a filter within a session"""
+    filter_prompt: str = Field(..., description="Text prompt describing the desired filter effect")
+    parent_version: Optional[int] = Field(None, ge=0, description="Version to edit (defaults to the session head)")
+
+
+class SessionAdjustmentRequest(BaseModel):
+    """Request model for applying an adjustment within a session"""
+    adjustment_prompt: str = Field(..., description="Text prompt describing the desired adjustment")
+    parent_version: Optional[int] = Field(None, ge=0, description="Version to edit (defaults to the session head)")
+
+
+class SessionCheckoutRequest(BaseModel):
+    """Request model for moving a session's head (undo, redo, switching branches)"""
+    version: int = Field(..., ge=0, description="Version to make current")
+
+
+class EditVersionResponse(BaseModel):
+    """One version in a session's history"""
+    version: int = Field(..., description="Version number (0 is the original image)")
+    parent: Optional[int] = Field(None, description="Version this one was derived from")
+    asset_id: str = Field(..., description="Asset ID of the version's image")
+    image_url: str = Field(..., description="URL of the version's image")
+    mime_type: str = Field(..., description="MIME type of the version's image")
+    operation: str = Field(..., description="original, filter or adjustment")
+    prompt: Optional[str] = Field(None, description="Prompt of the edit that produced this version")
+    engine: Optional[str] = Field(None, description="Engine that produced the image: local or model")
+    created_at: float = Field(..., description="Creation time (Unix seconds)")
+
+
+class EditSessionResponse(BaseModel):
+    """An editing session with its full version history"""
+    session_id: str = Field(..., description="Session identifier")
+    head: int = Field(..., description="Version currently shown")
+    versions: List[EditVersionResponse] = Field(..., description="All versions, in creation order")
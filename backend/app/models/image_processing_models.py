@@ -1,36 +1,51 @@
 """
 Pydantic models for image processing API
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional
 
 
-class ImageFilterRequest(BaseModel):
+class ImageInput(BaseModel):
+    """An input image given either inline as base64 or by asset ID"""
+    image_base64: Optional[str] = Field(None, description="Base64 encoded image data")
+    image_asset_id: Optional[str] = Field(None, description="Asset ID of a stored image (instead of image_base64)")
+    mime_type: Optional[str] = Field(None, description="MIME type of the image (required with image_base64)")
+
+    @model_validator(mode="after")
+    def check_image_source(self):
+        if bool(self.image_base64) == bool(self.image_asset_id):
+            raise ValueError("Provide exactly one of image_base64 or image_asset_id")
+        if self.image_base64 and not self.mime_type:
+            raise ValueError("mime_type is required with image_base64")
+        return self
+
+
+class ImageFilterRequest(ImageInput):
     """Request model for image filter endpoint"""
-    image_base64: str = Field(..., description="Base64 encoded image data")
-    mime_type: str = Field(..., description="MIME type of the image")
     filter_prompt: str = Field(..., description="Text prompt describing the desired filter effect")
 
 
 class ImageFilterResponse(BaseModel):
     """Response model for image filter endpoint"""
-    filtered_image_base64: str = Field(..., description="Base64 encoded filtered image")
+    asset_id: str = Field(..., description="Asset ID of the filtered image")
+    image_url: str = Field(..., description="URL of the filtered image")
     mime_type: str = Field(..., description="MIME type of the filtered image")
     filter_applied: str = Field(..., description="Description of the filter that was applied")
+    engine: str = Field("model", description="Engine that produced the image: local or model")
 
 
-class ImageAdjustmentRequest(BaseModel):
+class ImageAdjustmentRequest(ImageInput):
     """Request model for image adjustment endpoint"""
-    image_base64: str = Field(..., description="Base64 encoded image data")
-    mime_type: str = Field(..., description="MIME type of the image")
     adjustment_prompt: str = Field(..., description="Text prompt describing the desired adjustment")
 
 
 class ImageAdjustmentResponse(BaseModel):
     """Response model for image adjustment endpoint"""
-    adjusted_image_base64: str = Field(..., description="Base64 encoded adjusted image")
+    asset_id: str = Field(..., description="Asset ID of the adjusted image")
+    image_url: str = Field(..., description="URL of the adjusted image")
     mime_type: str = Field(..., description="MIME type of the adjusted image")
     adjustment_applied: str = Field(..., description="Description of the adjustment that was applied")
+    engine: str = Field("model", description="Engine that produced the image: local or model")
 
 
 class ImageProcessingError(BaseModel):
@@ -0,0 +1,30 @@
+"""
+Pydantic models for background job status and submission
+"""
+from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class JobStatusResponse(BaseModel):
+    """Current state of a background job"""
+    model_config = ConfigDict(frozen=False)
+
+    job_id: str = Field(..., description="Job identifier")
+    kind: str = Field(..., description="Job type, e.g. video")
+    status: str = Field(..., description="queued, running, succeeded, failed or cancelled")
+    version: int = Field(..., description="Incremented on every state change; pass it back to long-poll for newer states")
+    created_at: float = Field(..., description="Submission time (Unix seconds)")
+    updated_at: float = Field(..., description="Time of the last state change (Unix seconds)")
+    progress: Optional[str] = Field(None, description="Current stage reported by the job")
+    error: Optional[str] = Field(None, description="Failure reason when the job failed or was cancelled")
+
+
+class JobSubmitResponse(BaseModel):
+    """Response returned as soon as a job is accepted"""
+    model_config = ConfigDict(frozen=False)
+
+    job_id: str = Field(..., description="Job identifier")
+    status: str = Field(..., description="Initial job status")
+    status_url: str = Field(..., description="Endpoint reporting the job status")
+    result_url: str = Field(..., description="Endpoint returning the job result once it succeeds")
+    events_url: str = Field(..., description="Server-Sent Events stream of status changes")
@@ -1,7 +1,8 @@
 """
 Pydantic models for translation service
 """
-from pydantic import BaseModel, Field
+from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
 
 
 class CopyInput(BaseModel):
@@ -15,6 +16,7 @@ class TranslationRequest(BaseModel):
     """Request model for translation"""
     copy_text: CopyInput = Field(..., description="Structured copy text to be translated")
     target_language: str = Field(..., description="Target language for translation (e.g., 'Spanish', 'French', 'German')")
+    brand: Optional[str] = Field(None, description="Brand the copy belongs to; scopes translation memory reuse")
 
 
 class TranslatedCopy(BaseModel):
@@ -28,3 +30,66 @@ class TranslationResponse(BaseModel):
     """Response model for translation"""
     translated_copy: TranslatedCopy = Field(..., description="The translated copy with structure maintained")
     translated_to: str = Field(..., description="The language the text was translated to")
+
+
+class CopyVariationInput(CopyInput):
+    """Copy variation to translate, matching the GeneratedCopy structure"""
+    variation_number: Optional[int] = Field(None, ge=1, description="Variation number (1-based); defaults to the position in copy_variations")
+
+
+class BatchTranslationRequest(BaseModel):
+    """Request model for translating several copy variations into several languages"""
+    copy_variations: List[CopyVariationInput] = Field(..., min_length=1, max_length=10, description="Copy variations to translate")
+    target_languages: List[str] = Field(..., min_length=1, max_length=30, description="Target languages (e.g., ['Spanish', 'French'])")
+    brand: Optional[str] = Field(None, description="Brand the copy belongs to; scopes translation memory reuse")
+
+    @model_validator(mode="after")
+    def number_variations(self):
+        for position, variation in enumerate(self.copy_variations, start=1):
+            if variation.variation_number is None:
+                variation.variation_number = position
+        numbers = [variation.variation_number for variation in self.copy_variations]
+        if len(set(numbers)) != len(numbers):
+            raise ValueError("variation_number must be unique across copy_variations")
+        return self
+
+
+class BatchTranslationItem(BaseModel):
+    """Translation of one copy variation into one language"""
+    variation_number: int = Field(..., description="Variation number of the source copy")
+    translated_to: str = Field(..., description="The language the copy was translated to")
+    translated_copy: Optional[TranslatedCopy] = Field(None, description="The translated copy, if translation succeeded")
+    error: Optional[str] = Field(None, description="Error message, if translation failed")
+
+
+class BatchTranslationResponse(BaseModel):
+    """Response model for batch translation"""
+    translations: List[BatchTranslationItem] = Field(..., description="One entry per variation and target language")
+
+
+class PackedTranslation(BaseModel):
+    """One language entry of a multi-language translation response from the model"""
+    translated_to: str
+    translated_copy: TranslatedCopy
+
+
+class PackedTranslationResponse(BaseModel):
+    """Model output for a multi-language translation prompt"""
+    translations: List[PackedTranslation]
+
+
+class SegmentTranslation(BaseModel):
+    """Translation of one numbered copy segment"""
+    id: int
+    translation: str
+
+
+class SegmentTranslationEntry(BaseModel):
+    """Segment translations for one language of a segment translation response"""
+    translated_to: str
+    segments: List[SegmentTranslation]
+
+
+class SegmentTranslationResponse(BaseModel):
+    """Model output for a segment translation prompt"""
+    translations: List[SegmentTranslationEntry]
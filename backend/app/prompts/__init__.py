@@ -1,6 +1,7 @@
 """
 Prompt management utilities
 """
+import hashlib
 from pathlib import Path
 from typing import Dict
 
@@ -23,7 +24,13 @@ class PromptLoader:
         Returns:
             Formatted prompt string
         """
-        # Load from cache or file
+        # Format the prompt with provided variables
+        template = cls._template(prompt_name)
+        return template.format(**kwargs)
+
+    @classmethod
+    def _template(cls, prompt_name: str) -> str:
+        """Load a raw prompt template from cache or file"""
         if prompt_name not in cls._cache:
             prompt_path = cls._prompts_dir / f"{prompt_name}.txt"
             if not prompt_path.exists():
@@ -32,9 +39,23 @@ class PromptLoader:
             with open(prompt_path, 'r', encoding='utf-8') as f:
                 cls._cache[prompt_name] = f.read()
 
-        # Format the prompt with provided variables
-        template = cls._cache[prompt_name]
-        return template.format(**kwargs)
+        return cls._cache[prompt_name]
+
+    @classmethod
+    def version(cls, prompt_name: str) -> str:
+        """
+        Get a version identifier of a prompt template
+
+        The version is a hash of the template text, so it changes whenever
+        the template is edited (used to key cached model responses).
+
+        Args:
+            prompt_name: Name of the prompt file (without .txt extension)
+
+        Returns:
+            Short hex digest of the template
+        """
+        return hashlib.sha256(cls._template(prompt_name).encode('utf-8')).hexdigest()[:16]
 
     @classmethod
     def clear_cache(cls):
@@ -1,10 +1,14 @@
 """
 API route handlers
 """
-from app.routers import brief_router, ad_creative_router, image_processing_router
+from app.routers import brief_router, ad_creative_router, translation_router, image_processing_router, edit_session_router, job_router, asset_router
 
 __all__ = [
     "brief_router",
     "ad_creative_router",
+    "translation_router",
     "image_processing_router",
+    "edit_session_router",
+    "job_router",
+    "asset_router",
 ]
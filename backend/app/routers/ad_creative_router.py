@@ -1,7 +1,9 @@
 """
 API routes for ad creative evaluation and generation
 """
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends, Request
 from fastapi.responses import JSONResponse
 
 from app.models.ad_creative_models import (
@@ -14,37 +16,109 @@ from app.models.ad_creative_models import (
     AssetGenerationResponse,
     GeneratedImage
 )
+from app.models.job_models import JobSubmitResponse
 from app.services.ad_creative_service import AdCreativeService
 from app.services.asset_generation_service import AssetGenerationService
+from app.services.job_manager import JobManager
+from app.routers.asset_router import load_asset
+from app.routers.job_router import get_job_manager
+from app.utils.sse import event_stream_response
 from app.config import Config
 
 
 router = APIRouter(prefix="/api", tags=["ad-creative"])
 
+# Copy model display names accepted by the form fields
+COPY_MODEL_MAPPING = {
+    "Gemini 2.5 pro": "gemini-2.5-pro",
+    "Gemini 3 Pro Preview": "gemini-3-pro-preview"
+}
+
+# Video model display names accepted by the form fields
+VIDEO_MODEL_MAPPING = {
+    "Veo 3": "veo-3.0-generate-001",
+    "Veo 2": "veo-2.0-generate-001"
+}
+
+# Accepted image types for evaluated creatives and product SKU images
+EVALUATION_IMAGE_TYPES = ["image/jpeg", "image/jpg", "image/png", "image/webp", "image/gif"]
+SKU_IMAGE_TYPES = ["image/jpeg", "image/jpg", "image/png", "image/webp"]
+
+
+async def _read_image(
+    request: Request,
+    upload: Optional[UploadFile],
+    asset_id: Optional[str],
+    supported_types: list,
+    supported_label: str,
+    name: str
+) -> Tuple[bytes, str]:
+    """
+    Read an image given either as an upload or as an asset ID
+
+    Args:
+        request: Incoming request (for the asset store)
+        upload: Uploaded file, if any
+        asset_id: Asset ID, if any
+        supported_types: Accepted MIME types
+        supported_label: Human-readable list of accepted types for error messages
+        name: Name of the image in error messages
+
+    Returns:
+        (image bytes, MIME type)
+
+    Raises:
+        HTTPException: If neither or both sources are given, or the image is invalid
+    """
+    if (upload is None) == (not asset_id):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Provide either an uploaded {name} or its asset ID"
+        )
+
+    if asset_id:
+        return await load_asset(request, asset_id, supported_types)
+
+    if upload.content_type not in supported_types:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported image type: {upload.content_type}. Supported types: {supported_label}"
+        )
 
-def get_ad_creative_service() -> AdCreativeService:
+    data = await upload.read()
+    if not data:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{name[0].upper()}{name[1:]} file is empty"
+        )
+    return data, upload.content_type
+
+
+def get_ad_creative_service(request: Request) -> AdCreativeService:
     """Dependency to get AdCreativeService instance"""
     if not Config.is_configured():
         raise HTTPException(
             status_code=500,
             detail="Vertex AI not configured. Please set SERVICE_ACCOUNT_JSON and PROJECT_ID environment variables."
         )
-    return AdCreativeService()
+    return request.app.state.ad_creative_service
 
 
-def get_asset_generation_service() -> AssetGenerationService:
+def get_asset_generation_service(request: Request) -> AssetGenerationService:
     """Dependency to get AssetGenerationService instance"""
     if not Config.is_configured():
         raise HTTPException(
             status_code=500,
             detail="Vertex AI not configured. Please set SERVICE_ACCOUNT_JSON and PROJECT_ID environment variables."
         )
-    return AssetGenerationService()
+    return request.app.state.asset_generation_service
 
 
 @router.post("/evaluate-ad-creative", response_model=AdCreativeEvaluationResponse)
 async def evaluate_ad_creative(
-    image: UploadFile = File(..., description="The generated ad creative image to evaluate"),
+    request: Request,
+    image: UploadFile = File(None, description="The generated ad creative image to evaluate"),
+    image_asset_id: str = Form(None, description="Asset ID of the image to evaluate (instead of uploading it)"),
     image_prompt: str = Form(..., description="The prompt used to generate this image"),
     ad_creative_service: AdCreativeService = Depends(get_ad_creative_service)
 ):
@@ -52,13 +126,15 @@ async def evaluate_ad_creative(
     Evaluate a generated ad creative image using Gemini 2.5 Pro.
 
     Accepts:
-    - A generated image file (the ad creative)
+    - A generated image file (the ad creative), or the asset ID of a stored image
     - The prompt that was used to generate the image
 
     Returns scores for conversion, retention, traffic, and engagement (0-10 scale).
 
     Args:
+        request: Incoming request (for the asset store)
         image: The generated ad creative image file
+        image_asset_id: Asset ID of a stored image, used instead of `image`
         image_prompt: The prompt used to generate this image
         ad_creative_service: Injected AdCreativeService
 
@@ -68,35 +144,16 @@ async def evaluate_ad_creative(
     Raises:
         HTTPException: If processing fails
     """
-    # Validate image file
-    supported_image_types = [
-        "image/jpeg",
-        "image/jpg",
-        "image/png",
-        "image/webp",
-        "image/gif"
-    ]
-
-    if image.content_type not in supported_image_types:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported image type: {image.content_type}. Supported types: JPEG, PNG, WebP, GIF"
-        )
+    # Read and validate the image (upload or stored asset)
+    image_data, image_mime_type = await _read_image(
+        request, image, image_asset_id, EVALUATION_IMAGE_TYPES, "JPEG, PNG, WebP, GIF", "image"
+    )
 
     try:
-        # Read the image file
-        image_data = await image.read()
-
-        if not image_data:
-            raise HTTPException(
-                status_code=400,
-                detail="Image file is empty"
-            )
-
         # Evaluate the ad creative using the service
         evaluation_result = await ad_creative_service.evaluate_generated_image(
             image_data=image_data,
-            image_mime_type=image.content_type,
+            image_mime_type=image_mime_type,
             image_prompt=image_prompt
         )
 
@@ -166,7 +223,9 @@ async def generate_creative_prompts(
 
 @router.post("/generate-assets", response_model=AssetGenerationResponse)
 async def generate_assets(
-    product_sku: UploadFile = File(..., description="Product SKU image"),
+    request: Request,
+    product_sku: UploadFile = File(None, description="Product SKU image"),
+    product_sku_asset_id: str = Form(None, description="Asset ID of the product SKU image (instead of uploading it)"),
     # Image generation parameters
     image_prompt: str = Form(None, description="Image generation prompt"),
     image_variations: int = Form(None, ge=1, le=5, description="Number of image variations"),
@@ -191,13 +250,15 @@ async def generate_assets(
     - Image generation using Imagen 3
 
     Accepts:
-    - Product SKU image (required)
+    - Product SKU image (required), uploaded or as an asset ID
     - Image generation prompt and settings (optional)
 
     Returns generated asset URLs.
 
     Args:
+        request: Incoming request (for the asset store)
         product_sku: Product SKU image file
+        product_sku_asset_id: Asset ID of a stored SKU image, used instead of `product_sku`
         image_prompt: Prompt for image generation
         image_variations: Number of image variations to generate (1-5)
         creativity_level: Creativity level for generation
@@ -209,30 +270,12 @@ async def generate_assets(
     Raises:
         HTTPException: If generation fails
     """
-    # Validate product SKU image
-    supported_image_types = [
-        "image/jpeg",
-        "image/jpg",
-        "image/png",
-        "image/webp"
-    ]
-
-    if product_sku.content_type not in supported_image_types:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported image type: {product_sku.content_type}. Supported types: JPEG, PNG, WebP"
-        )
+    # Read and validate the product SKU image (upload or stored asset)
+    sku_image_data, _ = await _read_image(
+        request, product_sku, product_sku_asset_id, SKU_IMAGE_TYPES, "JPEG, PNG, WebP", "product SKU image"
+    )
 
     try:
-        # Read the product SKU image
-        sku_image_data = await product_sku.read()
-
-        if not sku_image_data:
-            raise HTTPException(
-                status_code=400,
-                detail="Product SKU image file is empty"
-            )
-
         # Prepare configs for generation
         img_config = None
         vid_config = None
@@ -256,11 +299,7 @@ async def generate_assets(
 
         # Video generation config
         if video_prompt and creativity_level:
-            video_model_mapping = {
-                "Veo 3": "veo-3.0-generate-001",
-                "Veo 2": "veo-2.0-generate-001"
-            }
-            vid_model_name = video_model_mapping.get(video_model, "veo-3.0-generate-001")
+            vid_model_name = VIDEO_MODEL_MAPPING.get(video_model, "veo-3.0-generate-001")
 
             print("using video generation model:", vid_model_name)
 
@@ -273,11 +312,7 @@ async def generate_assets(
 
         # Copy generation config
         if copy_prompt and copy_variations and creativity_level:
-            copy_model_mapping = {
-                "Gemini 2.5 pro": "gemini-2.5-pro",
-                "Gemini 3 Pro Preview": "gemini-3-pro-preview"
-            }
-            cp_model_name = copy_model_mapping.get(copy_model, "gemini-2.5-pro")
+            cp_model_name = COPY_MODEL_MAPPING.get(copy_model, "gemini-2.5-pro")
             print("using copy generation model:", cp_model_name)
 
             cp_config = CopyGenerationConfig(
@@ -312,3 +347,106 @@ async def generate_assets(
             status_code=500,
             detail=f"Error generating assets: {str(e)}"
         )
+
+
+@router.post("/generate-copy/stream")
+async def generate_copy_stream(
+    copy_prompt: str = Form(..., description="Copy generation prompt"),
+    copy_variations: int = Form(..., ge=1, le=5, description="Number of copy variations"),
+    copy_model: str = Form("Gemini 2.5 pro", description="Copy model: Gemini 2.5 pro or Gemini 3 Pro Preview"),
+    creativity_level: str = Form(..., description="Creativity level: conservative, balanced, creative, experimental"),
+    brief_context: str = Form(..., description="Brief context for copy generation"),
+    asset_generation_service: AssetGenerationService = Depends(get_asset_generation_service)
+):
+    """
+    Generate ad copy variations and stream them as Server-Sent Events.
+
+    Streaming counterpart of the copy branch of /api/generate-assets. Emits:
+    - one `variation` event per GeneratedCopy as soon as it is complete
+    - one `complete` event with the full list of GeneratedCopy
+    - an `error` event instead of `complete` if generation fails
+
+    Args:
+        copy_prompt: Prompt for copy generation
+        copy_variations: Number of copy variations to generate (1-5)
+        copy_model: Copy model display name
+        creativity_level: Creativity level for generation
+        brief_context: Brief context for copy generation
+        asset_generation_service: Injected AssetGenerationService
+
+    Returns:
+        StreamingResponse: text/event-stream of copy events
+    """
+    cp_config = CopyGenerationConfig(
+        prompt=copy_prompt,
+        num_variations=copy_variations,
+        creativity_level=creativity_level,
+        model_name=COPY_MODEL_MAPPING.get(copy_model, "gemini-2.5-pro")
+    )
+    return event_stream_response(asset_generation_service.stream_copy(cp_config, brief_context))
+
+
+@router.post("/generate-video", response_model=JobSubmitResponse, status_code=202)
+async def submit_video_job(
+    request: Request,
+    product_sku: UploadFile = File(None, description="Product SKU image"),
+    product_sku_asset_id: str = Form(None, description="Asset ID of the product SKU image (instead of uploading it)"),
+    video_prompt: str = Form(..., description="Video generation prompt"),
+    video_model: str = Form("Veo 3", description="Video model: Veo 3 or Veo 2"),
+    video_duration: int = Form(5, ge=3, le=8, description="Video duration in seconds"),
+    creativity_level: str = Form(..., description="Creativity level: conservative, balanced, creative, experimental"),
+    asset_generation_service: AssetGenerationService = Depends(get_asset_generation_service),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """
+    Start video generation as a background job and return immediately.
+
+    Asynchronous counterpart of the video branch of /api/generate-assets,
+    which holds the request open for the whole Veo operation. The job keeps
+    running if the client disconnects; follow it with:
+    - GET /api/jobs/{job_id} (optionally long-polling with `wait` and `version`)
+    - GET /api/jobs/{job_id}/events (Server-Sent Events)
+    - GET /api/jobs/{job_id}/result once it succeeds (GeneratedVideo)
+
+    Args:
+        request: Incoming request (for the asset store)
+        product_sku: Product SKU image file
+        product_sku_asset_id: Asset ID of a stored SKU image, used instead of `product_sku`
+        video_prompt: Prompt for video generation
+        video_model: Video model display name
+        video_duration: Video duration in seconds
+        creativity_level: Creativity level for generation
+        asset_generation_service: Injected AssetGenerationService
+        job_manager: Injected JobManager
+
+    Returns:
+        JobSubmitResponse: Job ID and the URLs to follow it
+
+    Raises:
+        HTTPException: If the product SKU image is invalid
+    """
+    sku_image_data, _ = await _read_image(
+        request, product_sku, product_sku_asset_id, SKU_IMAGE_TYPES, "JPEG, PNG, WebP", "product SKU image"
+    )
+
+    vid_config = VideoGenerationConfig(
+        prompt=video_prompt,
+        creativity_level=creativity_level,
+        model_name=VIDEO_MODEL_MAPPING.get(video_model, "veo-3.0-generate-001"),
+        duration_seconds=video_duration
+    )
+
+    async def work(report):
+        video = await asset_generation_service.generate_video(vid_config, sku_image_data, on_progress=report)
+        return video.model_dump(mode='json')
+
+    job = await job_manager.submit("video", work)
+
+    validated = JobSubmitResponse(
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/api/jobs/{job.id}",
+        result_url=f"/api/jobs/{job.id}/result",
+        events_url=f"/api/jobs/{job.id}/events"
+    )
+    return JSONResponse(status_code=202, content=validated.model_dump(mode='json'))
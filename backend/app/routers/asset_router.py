@@ -0,0 +1,240 @@
+"""
+API routes serving stored media with HTTP range and conditional request support
+"""
+from typing import Iterable, Optional, Tuple
+
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from app.config import Config
+from app.models.asset_models import AssetResponse
+from app.services.asset_store import CHUNK_SIZE, MEDIA_TYPES, SNIFF_BYTES, AssetStore, sniff_media_type
+from app.services.model_executor import ModelExecutor
+
+
+router = APIRouter(prefix="/api/assets", tags=["assets"])
+
+# Assets are content-addressed, so a URL always refers to the same bytes
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def get_asset_store(request: Request) -> AssetStore:
+    """Dependency to get the AssetStore instance"""
+    return request.app.state.asset_store
+
+
+async def load_asset(
+    request: Request,
+    asset_id: str,
+    supported_types: Optional[Iterable[str]] = None
+) -> Tuple[bytes, str]:
+    """
+    Load a stored asset for an endpoint that accepts asset IDs in place of uploads
+
+    Args:
+        request: Incoming request (for the app's asset store and executor)
+        asset_id: Asset identifier supplied by the client
+        supported_types: MIME types the endpoint accepts (None accepts any)
+
+    Returns:
+        (data, mime type)
+
+    Raises:
+        HTTPException: 404 if the asset does not exist, 400 if its type is not supported
+    """
+    asset_store: AssetStore = request.app.state.asset_store
+    executor: ModelExecutor = request.app.state.model_executor
+    loaded = await executor.run_blocking(ModelExecutor.IO, asset_store.get_bytes, asset_id)
+    if loaded is None:
+        raise HTTPException(status_code=404, detail=f"Asset {asset_id} not found")
+
+    data, mime_type = loaded
+    if supported_types is not None and mime_type not in supported_types:
+        raise HTTPException(status_code=400, detail=f"Unsupported asset type: {mime_type}")
+    return data, mime_type
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range `Range: bytes=...` header
+
+    Returns:
+        Inclusive (start, end) byte positions, or None if the header should be
+        ignored (not a bytes range, several ranges, or malformed such as
+        a last position before the first)
+
+    Raises:
+        HTTPException: 416 if the range cannot be satisfied
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            start, end = max(0, size - length), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+            if start < 0 or end < start:
+                raise ValueError
+            end = min(end, size - 1)
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+def _sniff_upload(upload: UploadFile) -> Optional[str]:
+    """Media type of an uploaded file detected from its content (runs on a worker thread)"""
+    upload.file.seek(0)
+    return sniff_media_type(upload.file.read(SNIFF_BYTES))
+
+
+def _read_upload(upload: UploadFile, max_bytes: int):
+    """Yield an uploaded file in chunks, stopping at max_bytes (runs on a worker thread)"""
+    upload.file.seek(0)
+    size = 0
+    while True:
+        chunk = upload.file.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail="Uploaded file is too large")
+        yield chunk
+
+
+@router.post("", response_model=AssetResponse, status_code=201)
+async def upload_asset(
+    request: Request,
+    file: UploadFile = File(..., description="Media file to store"),
+    asset_store: AssetStore = Depends(get_asset_store)
+):
+    """
+    Store an uploaded file and return its asset ID.
+
+    The ID can be passed to any endpoint that accepts asset IDs (e.g. the
+    product SKU of /api/generate-assets or /api/evaluate-ad-creative), so
+    the same bytes are uploaded once and referenced afterwards.
+
+    Args:
+        request: Incoming request
+        file: Uploaded media file
+        asset_store: Injected AssetStore
+
+    Returns:
+        AssetResponse: Asset ID, URL, MIME type and size
+
+    Only images and videos are accepted. The stored type is detected from
+    the file content, not taken from the client's Content-Type, so an
+    upload can never be served back as HTML or script.
+
+    Raises:
+        HTTPException: 400 if the file is empty, 413 if it is larger than
+            MAX_IMAGE_UPLOAD_BYTES, 415 if it is not a supported image or video
+    """
+    if file.size is not None and file.size > Config.MAX_IMAGE_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Uploaded file is too large")
+
+    executor: ModelExecutor = request.app.state.model_executor
+    mime_type = await executor.run_blocking(ModelExecutor.IO, _sniff_upload, file)
+    if mime_type is None:
+        if file.size == 0:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty")
+        raise HTTPException(status_code=415, detail="Only image and video files can be stored")
+
+    asset = await executor.run_blocking(
+        ModelExecutor.IO, lambda: asset_store.put_chunks(_read_upload(file, Config.MAX_IMAGE_UPLOAD_BYTES), mime_type)
+    )
+
+    validated = AssetResponse(
+        asset_id=asset.asset_id,
+        url=asset_store.url(asset.asset_id),
+        mime_type=asset.mime_type,
+        size=asset.size
+    )
+    return JSONResponse(status_code=201, content=validated.model_dump(mode='json'))
+
+
+@router.api_route("/{asset_id}", methods=["GET", "HEAD"])
+async def get_asset(
+    asset_id: str,
+    request: Request,
+    asset_store: AssetStore = Depends(get_asset_store)
+):
+    """
+    Serve a stored asset.
+
+    Supports:
+    - `Range: bytes=start-end` (single range) with 206 Partial Content, so
+      video players can start playback immediately and seek
+    - `If-None-Match` with the asset's strong ETag (304 Not Modified)
+    - HEAD requests for size and type without the body
+
+    The body is streamed from the store in fixed-size chunks, so memory use
+    does not depend on the asset size.
+
+    Args:
+        asset_id: SHA-256 asset identifier
+        request: Incoming request (for Range and conditional headers)
+        asset_store: Injected AssetStore
+
+    Returns:
+        The asset bytes (full or partial)
+
+    Raises:
+        HTTPException: 404 if the asset does not exist, 416 for unsatisfiable ranges
+    """
+    executor: ModelExecutor = request.app.state.model_executor
+    asset = await executor.run_blocking(ModelExecutor.IO, asset_store.stat, asset_id)
+    if asset is None:
+        raise HTTPException(status_code=404, detail=f"Asset {asset_id} not found")
+
+    headers = {
+        "ETag": asset.etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "X-Content-Type-Options": "nosniff",
+    }
+    if asset.mime_type not in MEDIA_TYPES:
+        # Stored before uploads were type-checked: never let the browser render it in our origin
+        headers["Content-Disposition"] = f'attachment; filename="{asset.asset_id}"'
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or asset.etag in if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    start, end = 0, asset.size - 1
+    status_code = 200
+    range_header = request.headers.get("range")
+    # If-Range: only honour the range when the client's copy is still current
+    if range_header and asset.size > 0 and request.headers.get("if-range", asset.etag) == asset.etag:
+        requested = _parse_range(range_header, asset.size)
+        if requested is not None:
+            start, end = requested
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{asset.size}"
+
+    headers["Content-Length"] = str(max(0, end - start + 1))
+
+    if request.method == "HEAD" or asset.size == 0:
+        return Response(status_code=status_code, headers=headers, media_type=asset.mime_type)
+
+    return StreamingResponse(
+        asset_store.read_range(asset_id, start, end),  # blocking reads run in the threadpool
+        status_code=status_code,
+        headers=headers,
+        media_type=asset.mime_type
+    )
@@ -2,12 +2,13 @@
 API routes for creative brief analysis
 """
 from typing import Optional, Union
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
+from fastapi import APIRouter, File, UploadFile, Form, Header, HTTPException, Depends, Request
 from fastapi.responses import JSONResponse
 
 from app.models.brief_models import BriefAnalysisResponse
+from app.services.brief_ingestion import BriefIngestionPolicy, BriefInput
 from app.services.gemini_service import GeminiService
-from app.utils.file_extractor import FileExtractor
+from app.utils.sse import event_stream_response
 from app.config import Config
 
 
@@ -17,21 +18,29 @@ router = APIRouter(prefix="/api", tags=["brief-analysis"])
 MIN_TEXT_LENGTH = 100
 
 
-def get_gemini_service() -> GeminiService:
+def get_gemini_service(request: Request) -> GeminiService:
     """Dependency to get Gemini service instance"""
     if not Config.is_configured():
         raise HTTPException(
             status_code=500,
             detail="Vertex AI not configured. Please set SERVICE_ACCOUNT_JSON and PROJECT_ID environment variables."
         )
-    return GeminiService()
+    return request.app.state.gemini_service
+
+
+def get_brief_ingestion(request: Request) -> BriefIngestionPolicy:
+    """Dependency to get the BriefIngestionPolicy instance"""
+    return request.app.state.brief_ingestion
 
 
 @router.post("/analyze-brief", response_model=BriefAnalysisResponse)
 async def analyze_brief(
     file: Union[UploadFile, str, None] = File(None, description="Creative brief file (PDF or DOCX)"),
     text: Optional[str] = Form(None, description="Creative brief as plain text"),
-    gemini_service: GeminiService = Depends(get_gemini_service)
+    refresh: bool = Form(False, description="Bypass the analysis cache and re-run the model"),
+    cache_control: Optional[str] = Header(None, description="'no-cache' bypasses the analysis cache"),
+    gemini_service: GeminiService = Depends(get_gemini_service),
+    brief_ingestion: BriefIngestionPolicy = Depends(get_brief_ingestion)
 ):
     """
     Analyze a creative brief and return structured information.
@@ -41,11 +50,17 @@ async def analyze_brief(
     - Plain text via form data (minimum 100 characters)
 
     Returns structured brief analysis with extracted and auto-generated fields.
+    Scanned or image-heavy PDFs are read by the model directly instead of
+    through text extraction. Results are cached by brief content; set `refresh` or send
+    `Cache-Control: no-cache` to force a new analysis.
 
     Args:
         file: Optional file upload (PDF or DOCX)
         text: Optional plain text brief (minimum 100 characters)
+        refresh: Bypass the analysis cache
+        cache_control: Cache-Control request header
         gemini_service: Injected Gemini service
+        brief_ingestion: Injected BriefIngestionPolicy
 
     Returns:
         BriefAnalysisResponse: Structured brief analysis
@@ -53,6 +68,104 @@ async def analyze_brief(
     Raises:
         HTTPException: If neither file nor text is provided, text is too short, or if processing fails
     """
+    brief = await _resolve_brief(file, text, brief_ingestion)
+
+    try:
+        # Analyze the brief using Gemini
+        analysis_result = await gemini_service.analyze_creative_brief(
+            brief.text,
+            refresh=_wants_refresh(refresh, cache_control),
+            document=brief.document,
+            document_pages=brief.pages
+        )
+
+        # Validate the response structure
+        validated = BriefAnalysisResponse(**analysis_result)
+
+        # Return as plain JSON dict to ensure mutability on frontend
+        return JSONResponse(content=validated.model_dump(mode='json'))
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error processing creative brief: {str(e)}"
+        )
+
+
+
+@router.post("/analyze-brief/stream")
+async def analyze_brief_stream(
+    file: Union[UploadFile, str, None] = File(None, description="Creative brief file (PDF or DOCX)"),
+    text: Optional[str] = Form(None, description="Creative brief as plain text"),
+    refresh: bool = Form(False, description="Bypass the analysis cache and re-run the model"),
+    cache_control: Optional[str] = Header(None, description="'no-cache' bypasses the analysis cache"),
+    gemini_service: GeminiService = Depends(get_gemini_service),
+    brief_ingestion: BriefIngestionPolicy = Depends(get_brief_ingestion)
+):
+    """
+    Analyze a creative brief and stream the result as Server-Sent Events.
+
+    Accepts the same inputs as /api/analyze-brief. Emits:
+    - `field` events as each field is completed, e.g.
+      {"field": "target_audience.demographics", "value": {"value": ..., "source": ...}}
+    - one `complete` event with the fully validated BriefAnalysisResponse
+    - an `error` event instead of `complete` if analysis fails
+
+    Args:
+        file: Optional file upload (PDF or DOCX)
+        text: Optional plain text brief (minimum 100 characters)
+        refresh: Bypass the analysis cache
+        cache_control: Cache-Control request header
+        gemini_service: Injected Gemini service
+        brief_ingestion: Injected BriefIngestionPolicy
+
+    Returns:
+        StreamingResponse: text/event-stream of analysis events
+
+    Raises:
+        HTTPException: If neither file nor text is provided or the text is too short
+    """
+    brief = await _resolve_brief(file, text, brief_ingestion)
+    return event_stream_response(
+        gemini_service.stream_creative_brief_analysis(
+            brief.text,
+            refresh=_wants_refresh(refresh, cache_control),
+            document=brief.document,
+            document_pages=brief.pages
+        )
+    )
+
+
+def _wants_refresh(refresh: bool, cache_control: Optional[str]) -> bool:
+    """Whether the client asked to bypass the analysis cache"""
+    directives = [d.strip().lower() for d in (cache_control or "").split(",")]
+    return refresh or "no-cache" in directives or "no-store" in directives
+
+
+async def _resolve_brief(
+    file: Union[UploadFile, str, None],
+    text: Optional[str],
+    brief_ingestion: BriefIngestionPolicy
+) -> BriefInput:
+    """
+    Validate the brief inputs and return the brief from the file or form field
+
+    Args:
+        file: Optional file upload (PDF or DOCX)
+        text: Optional plain text brief
+        brief_ingestion: Policy turning uploaded files into text or a document part
+
+    Returns:
+        Brief text content, or the uploaded document for the model to read
+
+    Raises:
+        HTTPException: If the inputs are missing, conflicting, too short or unreadable
+    """
     # Handle case where file is sent as empty string
     if isinstance(file, str):
         if not file.strip():
@@ -91,62 +204,38 @@ async def analyze_brief(
             detail=f"Text input must be at least {MIN_TEXT_LENGTH} characters. Current length: {len(text.strip())} characters."
         )
 
-    try:
-        # Extract text from file or use provided text
-        if file:
-            brief_text = await _extract_text_from_file(file)
-        else:
-            brief_text = text
-
-        # Validate brief text
-        if not brief_text or not brief_text.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Brief text is empty or could not be extracted"
-            )
-
-        # Analyze the brief using Gemini
-        analysis_result = await gemini_service.analyze_creative_brief(brief_text)
-
-        # Validate the response structure
-        validated = BriefAnalysisResponse(**analysis_result)
-
-        # Return as plain JSON dict to ensure mutability on frontend
-        return JSONResponse(content=validated.model_dump(mode='json'))
+    # Read the brief from the file or use provided text
+    if file:
+        brief = await _ingest_file(file, brief_ingestion)
+    else:
+        brief = BriefInput(text=text)
 
-    except ValueError as e:
+    # Validate brief text
+    if brief.document is None and (not brief.text or not brief.text.strip()):
         raise HTTPException(
-            status_code=422,
-            detail=str(e)
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error processing creative brief: {str(e)}"
+            status_code=400,
+            detail="Brief text is empty or could not be extracted"
         )
 
+    return brief
 
-async def _extract_text_from_file(file: UploadFile) -> str:
+
+async def _ingest_file(file: UploadFile, brief_ingestion: BriefIngestionPolicy) -> BriefInput:
     """
-    Extract text from uploaded file
+    Read an uploaded brief file as extracted text or as a document for the model
 
     Args:
         file: Uploaded file
+        brief_ingestion: Policy choosing between local extraction and direct upload
 
     Returns:
-        Extracted text content
+        The brief as text or document
 
     Raises:
         HTTPException: If file type is not supported
     """
     # Validate file type
-    supported_types = [
-        "application/pdf",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        "application/msword"
-    ]
-
-    if file.content_type not in supported_types:
+    if file.content_type not in brief_ingestion.supported_types:
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported file type: {file.content_type}. Supported types: PDF, DOCX"
@@ -161,9 +250,9 @@ async def _extract_text_from_file(file: UploadFile) -> str:
             detail="File is empty"
         )
 
-    # Extract text
+    # Extract text or hand the file to the model
     try:
-        return await FileExtractor.extract_text(file_content, file.content_type)
+        return await brief_ingestion.ingest(file_content, file.content_type)
     except ValueError as e:
         raise HTTPException(
             status_code=422,
@@ -0,0 +1,249 @@
+"""
+API routes for server-side image editing sessions
+"""
+from typing import Awaitable, Callable, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import JSONResponse
+
+from app.models.edit_session_models import (
+    EditSessionCreateRequest,
+    EditSessionResponse,
+    EditVersionResponse,
+    SessionAdjustmentRequest,
+    SessionCheckoutRequest,
+    SessionFilterRequest
+)
+from app.routers.image_processing_router import resolve_image, get_image_processing_service
+from app.services.edit_session_manager import EditSession, EditSessionManager, EditVersion
+from app.services.image_processing_service import ImageProcessingService
+from app.services.model_backend import InlineData
+
+# ImageProcessingService.render_filter / render_adjustment
+EditRenderer = Callable[[bytes, str, str], Awaitable[Tuple[InlineData, str]]]
+
+
+router = APIRouter(prefix="/api/image/sessions", tags=["image-sessions"])
+
+
+def get_edit_session_manager(request: Request) -> EditSessionManager:
+    """Dependency to get the EditSessionManager instance"""
+    return request.app.state.edit_session_manager
+
+
+def _require_session(manager: EditSessionManager, session_id: str) -> EditSession:
+    session = manager.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Editing session {session_id} not found or expired")
+    return session
+
+
+def _version_response(manager: EditSessionManager, version: EditVersion) -> EditVersionResponse:
+    return EditVersionResponse(
+        version=version.number,
+        parent=version.parent,
+        asset_id=version.asset_id,
+        image_url=manager.assets.url(version.asset_id),
+        mime_type=version.mime_type,
+        operation=version.operation,
+        prompt=version.prompt,
+        engine=version.engine,
+        created_at=version.created_at
+    )
+
+
+def _session_response(manager: EditSessionManager, session: EditSession, status_code: int = 200) -> JSONResponse:
+    validated = EditSessionResponse(
+        session_id=session.id,
+        head=session.head,
+        versions=[_version_response(manager, version) for version in session.versions]
+    )
+    return JSONResponse(status_code=status_code, content=validated.model_dump(mode='json'))
+
+
+@router.post("", response_model=EditSessionResponse, status_code=201)
+async def create_session(
+    raw_request: Request,
+    request: EditSessionCreateRequest,
+    manager: EditSessionManager = Depends(get_edit_session_manager)
+):
+    """
+    Start an editing session.
+
+    The image is sent once, as base64 or (cheaper) as the asset ID of an
+    image already stored, and becomes version 0. Later edits reference the
+    session and a version instead of carrying pixels.
+
+    Args:
+        raw_request: Incoming request (for the asset store)
+        request: EditSessionCreateRequest with the image
+        manager: Injected EditSessionManager
+
+    Returns:
+        EditSessionResponse: The new session
+
+    Raises:
+        HTTPException: If the image cannot be loaded
+    """
+    image_data, mime_type = await resolve_image(raw_request, request)
+    session = await manager.create(image_data, mime_type)
+    return _session_response(manager, session, status_code=201)
+
+
+@router.get("/{session_id}", response_model=EditSessionResponse)
+async def get_session(
+    session_id: str,
+    manager: EditSessionManager = Depends(get_edit_session_manager)
+):
+    """
+    Return a session's version history and current head.
+
+    Args:
+        session_id: Session identifier
+        manager: Injected EditSessionManager
+
+    Returns:
+        EditSessionResponse: The session
+
+    Raises:
+        HTTPException: If the session does not exist or expired
+    """
+    return _session_response(manager, _require_session(manager, session_id))
+
+
+async def _edit(
+    manager: EditSessionManager,
+    session_id: str,
+    parent_version: Optional[int],
+    operation: str,
+    prompt: str,
+    render: EditRenderer
+) -> JSONResponse:
+    """Render an edit of a session version and append the result as the new head"""
+    session = _require_session(manager, session_id)
+    try:
+        parent, image_data = await manager.image(session, parent_version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+    try:
+        output, engine = await render(image_data, parent.mime_type, prompt)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Validation error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error applying {operation}: {str(e)}")
+
+    version = await manager.add_version(
+        session, parent.number, output.data, output.mime_type or parent.mime_type, operation, prompt, engine
+    )
+    return JSONResponse(content=_version_response(manager, version).model_dump(mode='json'))
+
+
+@router.post("/{session_id}/filter", response_model=EditVersionResponse)
+async def apply_session_filter(
+    session_id: str,
+    request: SessionFilterRequest,
+    manager: EditSessionManager = Depends(get_edit_session_manager),
+    image_processing_service: ImageProcessingService = Depends(get_image_processing_service)
+):
+    """
+    Apply a filter to a session version.
+
+    Edits `parent_version` (the head by default) and appends the result as
+    a new version, which becomes the head. Editing an older version starts
+    a branch; existing versions are never changed.
+
+    Args:
+        session_id: Session identifier
+        request: SessionFilterRequest with the prompt and optional parent version
+        manager: Injected EditSessionManager
+        image_processing_service: Injected ImageProcessingService
+
+    Returns:
+        EditVersionResponse: The new version
+
+    Raises:
+        HTTPException: 404 if the session or version does not exist, 422/500 if processing fails
+    """
+    return await _edit(
+        manager, session_id, request.parent_version, "filter", request.filter_prompt,
+        image_processing_service.render_filter
+    )
+
+
+@router.post("/{session_id}/adjust", response_model=EditVersionResponse)
+async def apply_session_adjustment(
+    session_id: str,
+    request: SessionAdjustmentRequest,
+    manager: EditSessionManager = Depends(get_edit_session_manager),
+    image_processing_service: ImageProcessingService = Depends(get_image_processing_service)
+):
+    """
+    Apply an adjustment to a session version.
+
+    Works like the session filter endpoint: the result is appended as a new
+    head version derived from `parent_version` (the head by default).
+
+    Args:
+        session_id: Session identifier
+        request: SessionAdjustmentRequest with the prompt and optional parent version
+        manager: Injected EditSessionManager
+        image_processing_service: Injected ImageProcessingService
+
+    Returns:
+        EditVersionResponse: The new version
+
+    Raises:
+        HTTPException: 404 if the session or version does not exist, 422/500 if processing fails
+    """
+    return await _edit(
+        manager, session_id, request.parent_version, "adjustment", request.adjustment_prompt,
+        image_processing_service.render_adjustment
+    )
+
+
+@router.post("/{session_id}/head", response_model=EditSessionResponse)
+async def checkout_version(
+    session_id: str,
+    request: SessionCheckoutRequest,
+    manager: EditSessionManager = Depends(get_edit_session_manager)
+):
+    """
+    Make an existing version current (undo, redo or switching branches).
+
+    Args:
+        session_id: Session identifier
+        request: SessionCheckoutRequest with the version number
+        manager: Injected EditSessionManager
+
+    Returns:
+        EditSessionResponse: The session with its new head
+
+    Raises:
+        HTTPException: If the session or version does not exist
+    """
+    session = _require_session(manager, session_id)
+    try:
+        manager.checkout(session, request.version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    return _session_response(manager, session)
+
+
+@router.delete("/{session_id}", status_code=204)
+async def delete_session(
+    session_id: str,
+    manager: EditSessionManager = Depends(get_edit_session_manager)
+):
+    """
+    End a session and release its cached images (stored assets remain).
+
+    Args:
+        session_id: Session identifier
+        manager: Injected EditSessionManager
+
+    Raises:
+        HTTPException: If the session does not exist
+    """
+    if not manager.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Editing session {session_id} not found or expired")
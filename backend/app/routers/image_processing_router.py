@@ -1,34 +1,150 @@
 """
 API routes for AI-powered image processing (filters and adjustments)
 """
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse
+import base64
+import binascii
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.datastructures import UploadFile
 
 from app.models.image_processing_models import (
+    ImageInput,
     ImageFilterRequest,
     ImageFilterResponse,
     ImageAdjustmentRequest,
     ImageAdjustmentResponse
 )
+from app.routers.asset_router import load_asset
+from app.services.asset_store import AssetStore
 from app.services.image_processing_service import ImageProcessingService
+from app.services.model_executor import ModelExecutor
 from app.config import Config
 
 
 router = APIRouter(prefix="/api/image", tags=["image-processing"])
 
 
-def get_image_processing_service() -> ImageProcessingService:
+def get_image_processing_service(request: Request) -> ImageProcessingService:
     """Dependency to get ImageProcessingService instance"""
     if not Config.is_configured():
         raise HTTPException(
             status_code=500,
             detail="Vertex AI not configured. Please set SERVICE_ACCOUNT_JSON and PROJECT_ID environment variables."
         )
-    return ImageProcessingService()
+    if Config.MODEL_BACKEND != "fake" and not Config.GEMINI_API_KEY:
+        raise HTTPException(
+            status_code=500,
+            detail="GEMINI_API_KEY not configured. Please set GEMINI_API_KEY environment variable."
+        )
+    return request.app.state.image_processing_service
+
+
+async def resolve_image(raw_request: Request, image: ImageInput) -> Tuple[bytes, str]:
+    """Load the input image from the asset store or decode it from base64"""
+    if image.image_asset_id:
+        return await load_asset(raw_request, image.image_asset_id)
+
+    executor: ModelExecutor = raw_request.app.state.model_executor
+    try:
+        data = await executor.run_blocking(
+            ModelExecutor.IO, base64.b64decode, image.image_base64, validate=True
+        )
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="image_base64 is not valid base64")
+    return data, image.mime_type
+
+
+def _read_form_file(upload: UploadFile) -> bytes:
+    """Read a multipart file the form parser has already spooled (runs on a worker thread)"""
+    upload.file.seek(0)
+    return upload.file.read()
+
+
+async def _read_binary_upload(request: Request, prompt_field: str, prompt: Optional[str]) -> Tuple[bytes, str, str]:
+    """
+    Read the image and prompt of a binary upload without base64 or JSON parsing
+
+    Accepts either multipart/form-data with an `image` file part (and the
+    prompt as a form field or query parameter), or a raw request body with
+    an image Content-Type and the prompt as a query parameter. Both are
+    read into memory exactly once, with MAX_IMAGE_UPLOAD_BYTES enforced
+    while reading, since the preprocessor and model need the whole image.
+
+    Returns:
+        (image bytes, MIME type, prompt)
+
+    Raises:
+        HTTPException: If the image or prompt is missing, or the upload is too large
+    """
+    executor: ModelExecutor = request.app.state.model_executor
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type == "multipart/form-data":
+        form = await request.form(max_files=1)
+        image = form.get("image")
+        if not isinstance(image, UploadFile):
+            raise HTTPException(status_code=400, detail="Multipart upload requires an 'image' file part")
+        if image.size is not None and image.size > Config.MAX_IMAGE_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Image upload is too large")
+        prompt = prompt or form.get(prompt_field)
+        mime_type = image.content_type or "application/octet-stream"
+        data = await executor.run_blocking(ModelExecutor.IO, _read_form_file, image)
+
+    elif content_type.startswith("image/"):
+        mime_type = content_type
+        declared = request.headers.get("content-length", "")
+        if declared.isdigit() and int(declared) > Config.MAX_IMAGE_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Image upload is too large")
+        chunks = []
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > Config.MAX_IMAGE_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="Image upload is too large")
+            chunks.append(chunk)
+        data = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail="Send multipart/form-data with an 'image' part, or a raw body with an image Content-Type"
+        )
+
+    if not data:
+        raise HTTPException(status_code=400, detail="Image data is required")
+    if not prompt or not str(prompt).strip():
+        raise HTTPException(status_code=400, detail=f"{prompt_field} is required")
+    return data, mime_type, str(prompt)
+
+
+def _wants_binary(request: Request, response_format: str) -> bool:
+    """Whether the client asked for the processed image as raw bytes rather than JSON"""
+    if response_format == "binary":
+        return True
+    return response_format == "auto" and request.headers.get("accept", "").startswith("image/")
+
+
+def _binary_response(request: Request, result: Dict[str, Any], description_header: str, description: str):
+    """Stream a processed image from the asset store with its Content-Type"""
+    asset_store: AssetStore = request.app.state.asset_store
+    return StreamingResponse(
+        asset_store.read_range(result["asset_id"], 0, result["size"] - 1),
+        media_type=result["mime_type"],
+        headers={
+            "Content-Length": str(result["size"]),
+            "X-Asset-Id": result["asset_id"],
+            "X-Asset-Url": result["image_url"],
+            "X-Image-Engine": result["engine"],
+            description_header: description.encode("ascii", "replace").decode("ascii"),
+        }
+    )
 
 
 @router.post("/filter", response_model=ImageFilterResponse)
 async def apply_filter(
+    raw_request: Request,
     request: ImageFilterRequest,
     image_processing_service: ImageProcessingService = Depends(get_image_processing_service)
 ):
@@ -39,18 +155,21 @@ async def apply_filter(
     Examples: "sepia", "vintage", "black and white", "warm tones", "cool blues", etc.
     
     Args:
-        request: ImageFilterRequest containing image data and filter prompt
+        raw_request: Incoming request (for the asset store)
+        request: ImageFilterRequest with the image (base64 or asset ID) and filter prompt
         image_processing_service: Injected ImageProcessingService
         
     Returns:
-        ImageFilterResponse: Filtered image data with metadata
+        ImageFilterResponse: Asset ID and URL of the filtered image
         
     Raises:
         HTTPException: If processing fails
     """
+    image_data, mime_type = await resolve_image(raw_request, request)
+
     try:
         # Validate input
-        if not request.image_base64:
+        if not image_data:
             raise HTTPException(
                 status_code=400,
                 detail="Image data is required"
@@ -64,8 +183,8 @@ async def apply_filter(
         
         # Apply filter using the service
         filter_result = await image_processing_service.apply_filter(
-            image_base64=request.image_base64,
-            mime_type=request.mime_type,
+            image_data=image_data,
+            mime_type=mime_type,
             filter_prompt=request.filter_prompt
         )
         
@@ -94,6 +213,7 @@ async def apply_filter(
 
 @router.post("/adjust", response_model=ImageAdjustmentResponse)
 async def apply_adjustment(
+    raw_request: Request,
     request: ImageAdjustmentRequest,
     image_processing_service: ImageProcessingService = Depends(get_image_processing_service)
 ):
@@ -104,18 +224,21 @@ async def apply_adjustment(
     Examples: "make brighter", "increase contrast", "warmer colors", "more vibrant", etc.
     
     Args:
-        request: ImageAdjustmentRequest containing image data and adjustment prompt
+        raw_request: Incoming request (for the asset store)
+        request: ImageAdjustmentRequest with the image (base64 or asset ID) and adjustment prompt
         image_processing_service: Injected ImageProcessingService
         
     Returns:
-        ImageAdjustmentResponse: Adjusted image data with metadata
+        ImageAdjustmentResponse: Asset ID and URL of the adjusted image
         
     Raises:
         HTTPException: If processing fails
     """
+    image_data, mime_type = await resolve_image(raw_request, request)
+
     try:
         # Validate input
-        if not request.image_base64:
+        if not image_data:
             raise HTTPException(
                 status_code=400,
                 detail="Image data is required"
@@ -129,8 +252,8 @@ async def apply_adjustment(
         
         # Apply adjustment using the service
         adjustment_result = await image_processing_service.apply_adjustment(
-            image_base64=request.image_base64,
-            mime_type=request.mime_type,
+            image_data=image_data,
+            mime_type=mime_type,
             adjustment_prompt=request.adjustment_prompt
         )
         
@@ -158,8 +281,109 @@ async def apply_adjustment(
 
 
 
+@router.post("/filter/binary", response_model=ImageFilterResponse)
+async def apply_filter_binary(
+    request: Request,
+    filter_prompt: Optional[str] = Query(None, description="Filter prompt (may also be sent as a multipart field)"),
+    response_format: str = Query("auto", pattern="^(auto|json|binary)$", description="json, binary, or auto (binary when Accept is image/*)"),
+    image_processing_service: ImageProcessingService = Depends(get_image_processing_service)
+):
+    """
+    Apply an AI-powered filter to an image uploaded as binary.
+
+    Binary counterpart of /api/image/filter that avoids base64 inflation and
+    JSON parsing of the image. Send either:
+    - multipart/form-data with an `image` file part and a `filter_prompt` field
+    - a raw body with the image's Content-Type and `?filter_prompt=...`
+
+    The response is an ImageFilterResponse, or the filtered image bytes with
+    their Content-Type (plus X-Asset-Id, X-Asset-Url and X-Image-Engine headers) when
+    `response_format=binary` or the Accept header asks for an image.
+
+    Args:
+        request: Incoming request carrying the image
+        filter_prompt: Text prompt describing the desired filter effect
+        response_format: Response representation
+        image_processing_service: Injected ImageProcessingService
+
+    Returns:
+        ImageFilterResponse or the filtered image bytes
+
+    Raises:
+        HTTPException: If the upload is invalid or processing fails
+    """
+    image_data, mime_type, prompt = await _read_binary_upload(request, "filter_prompt", filter_prompt)
+
+    try:
+        filter_result = await image_processing_service.apply_filter(
+            image_data=image_data,
+            mime_type=mime_type,
+            filter_prompt=prompt
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Validation error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error applying filter: {str(e)}")
+
+    if _wants_binary(request, response_format):
+        return _binary_response(request, filter_result, "X-Filter-Applied", prompt)
+
+    validated = ImageFilterResponse(**filter_result)
+    return JSONResponse(content=validated.model_dump(mode='json'))
+
+
+@router.post("/adjust/binary", response_model=ImageAdjustmentResponse)
+async def apply_adjustment_binary(
+    request: Request,
+    adjustment_prompt: Optional[str] = Query(None, description="Adjustment prompt (may also be sent as a multipart field)"),
+    response_format: str = Query("auto", pattern="^(auto|json|binary)$", description="json, binary, or auto (binary when Accept is image/*)"),
+    image_processing_service: ImageProcessingService = Depends(get_image_processing_service)
+):
+    """
+    Apply AI-powered adjustments to an image uploaded as binary.
+
+    Binary counterpart of /api/image/adjust. Send either:
+    - multipart/form-data with an `image` file part and an `adjustment_prompt` field
+    - a raw body with the image's Content-Type and `?adjustment_prompt=...`
+
+    The response is an ImageAdjustmentResponse, or the adjusted image bytes
+    with their Content-Type (plus X-Asset-Id, X-Asset-Url and X-Image-Engine headers) when
+    `response_format=binary` or the Accept header asks for an image.
+
+    Args:
+        request: Incoming request carrying the image
+        adjustment_prompt: Text prompt describing the desired adjustment
+        response_format: Response representation
+        image_processing_service: Injected ImageProcessingService
+
+    Returns:
+        ImageAdjustmentResponse or the adjusted image bytes
+
+    Raises:
+        HTTPException: If the upload is invalid or processing fails
+    """
+    image_data, mime_type, prompt = await _read_binary_upload(request, "adjustment_prompt", adjustment_prompt)
+
+    try:
+        adjustment_result = await image_processing_service.apply_adjustment(
+            image_data=image_data,
+            mime_type=mime_type,
+            adjustment_prompt=prompt
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Validation error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error applying adjustment: {str(e)}")
+
+    if _wants_binary(request, response_format):
+        return _binary_response(request, adjustment_result, "X-Adjustment-Applied", prompt)
+
+    validated = ImageAdjustmentResponse(**adjustment_result)
+    return JSONResponse(content=validated.model_dump(mode='json'))
+
+
 @router.get("/health")
-async def image_processing_health_check():
+async def image_processing_health_check(request: Request):
     """Health check endpoint for image processing service"""
     try:
         # Check if Vertex AI is configured
@@ -172,12 +396,12 @@ async def image_processing_health_check():
                 "vertex_ai_configured": False
             }
         
-        # Try to initialize the service
-        service = ImageProcessingService()
+        # Report which model backend serves the image service
+        backend = request.app.state.image_processing_service.backend
         
         return {
             "status": "healthy",
-            "message": "Image processing service is ready",
+            "message": f"Image processing service is ready ({backend.name} backend)",
             "vertex_ai_configured": True
         }
         
@@ -0,0 +1,142 @@
+"""
+API routes for background job status, results and change notifications
+"""
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import JSONResponse
+
+from app.models.job_models import JobStatusResponse
+from app.services.job_manager import JobManager
+from app.services.job_store import Job
+from app.utils.sse import event_stream_response
+from app.config import Config
+
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def get_job_manager(request: Request) -> JobManager:
+    """Dependency to get the JobManager instance"""
+    return request.app.state.job_manager
+
+
+async def _require_job(job_manager: JobManager, job_id: str) -> Job:
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to wait for a state newer than `version` (long-poll)"),
+    version: int = Query(-1, description="Job version the client already has"),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """
+    Report the state of a background job.
+
+    Without `wait` the current state is returned immediately. With `wait`,
+    the request is held until the job's version exceeds `version`, the job
+    finishes, or `wait` seconds pass (capped at JOB_LONG_POLL_MAX), so a
+    client can follow a job with one open request at a time.
+
+    Args:
+        job_id: Job identifier
+        wait: Long-poll timeout in seconds
+        version: Last version seen by the client
+        job_manager: Injected JobManager
+
+    Returns:
+        JobStatusResponse: Current job state
+
+    Raises:
+        HTTPException: If the job does not exist
+    """
+    if wait > 0:
+        job = await job_manager.wait_for_change(job_id, version, min(wait, Config.JOB_LONG_POLL_MAX))
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    else:
+        job = await _require_job(job_manager, job_id)
+
+    return JSONResponse(content=JobStatusResponse(**job.to_dict()).model_dump(mode='json'))
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(
+    job_id: str,
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """
+    Return the result of a finished job.
+
+    Args:
+        job_id: Job identifier
+        job_manager: Injected JobManager
+
+    Returns:
+        The job result (e.g. GeneratedVideo for video jobs)
+
+    Raises:
+        HTTPException: 404 if the job does not exist, 409 if it has not
+            succeeded yet or was cancelled, 422 if it failed
+    """
+    job = await _require_job(job_manager, job_id)
+
+    if job.status == Job.SUCCEEDED:
+        return JSONResponse(content=job.result)
+    if job.status == Job.FAILED:
+        raise HTTPException(status_code=422, detail=job.error)
+    raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}")
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """
+    Follow a job as Server-Sent Events.
+
+    Emits a `status` event (JobStatusResponse) on every state change and a
+    final `complete` event once the job succeeds, fails or is cancelled.
+
+    Args:
+        job_id: Job identifier
+        job_manager: Injected JobManager
+
+    Returns:
+        StreamingResponse: text/event-stream of job status events
+
+    Raises:
+        HTTPException: If the job does not exist
+    """
+    await _require_job(job_manager, job_id)
+    return event_stream_response(job_manager.events(job_id))
+
+
+@router.delete("/{job_id}", response_model=JobStatusResponse)
+async def cancel_job(
+    job_id: str,
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """
+    Cancel a queued or running job.
+
+    Args:
+        job_id: Job identifier
+        job_manager: Injected JobManager
+
+    Returns:
+        JobStatusResponse: Job state after cancellation
+
+    Raises:
+        HTTPException: 404 if the job does not exist, 409 if it already finished
+    """
+    job = await _require_job(job_manager, job_id)
+    if job.done or not await job_manager.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}")
+
+    job = await _require_job(job_manager, job_id)
+    return JSONResponse(content=JobStatusResponse(**job.to_dict()).model_dump(mode='json'))
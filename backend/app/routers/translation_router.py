@@ -4,22 +4,28 @@ API routes for copy translation
 from fastapi import APIRouter, HTTPException, Depends, Request
 from fastapi.responses import JSONResponse
 
-from app.models.translation_models import TranslationRequest, TranslationResponse
+from app.models.translation_models import (
+    TranslationRequest,
+    TranslationResponse,
+    BatchTranslationRequest,
+    BatchTranslationResponse
+)
 from app.services.translation_service import TranslationService
+from app.utils.sse import event_stream_response
 from app.config import Config
 
 
 router = APIRouter(prefix="/api", tags=["translation"])
 
 
-def get_translation_service() -> TranslationService:
+def get_translation_service(request: Request) -> TranslationService:
     """Dependency to get Translation service instance"""
     if not Config.is_configured():
         raise HTTPException(
             status_code=500,
             detail="Vertex AI not configured. Please set SERVICE_ACCOUNT_JSON and PROJECT_ID environment variables."
         )
-    return TranslationService()
+    return request.app.state.translation_service
 
 
 @router.post("/translate", response_model=TranslationResponse)
@@ -33,6 +39,8 @@ async def translate_copy(
     Accepts a JSON payload with:
     - copy_text: Object containing headline, body_text, and call_to_action
     - target_language: The target language (e.g., 'Spanish', 'French', 'German')
+    - brand: Optional brand name; previously translated segments of the same
+      brand and language are reused from the translation memory
 
     Returns structured translation with all components translated.
 
@@ -81,7 +89,8 @@ async def translate_copy(
             headline=request.copy_text.headline,
             body_text=request.copy_text.body_text,
             call_to_action=request.copy_text.call_to_action,
-            target_language=request.target_language
+            target_language=request.target_language,
+            brand=request.brand
         )
 
         # Validate the response structure
@@ -100,3 +109,90 @@ async def translate_copy(
             status_code=500,
             detail=f"Error translating copy: {str(e)}"
         )
+
+
+def _validate_batch_request(request: BatchTranslationRequest):
+    """Reject batch requests with empty copy fields or no usable target language"""
+    for variation in request.copy_variations:
+        for field in ("headline", "body_text", "call_to_action"):
+            if not getattr(variation, field).strip():
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{field} cannot be empty (variation {variation.variation_number})"
+                )
+
+    if not any(language.strip() for language in request.target_languages):
+        raise HTTPException(
+            status_code=400,
+            detail="target_languages must contain at least one language"
+        )
+
+
+@router.post("/translate/batch", response_model=BatchTranslationResponse)
+async def translate_batch(
+    request: BatchTranslationRequest,
+    translation_service: TranslationService = Depends(get_translation_service)
+):
+    """
+    Translate several copy variations into several languages in one request.
+
+    Languages are packed into shared prompts where the output budget allows
+    and the prompts run concurrently under the model rate limits, so a full
+    localization takes about as long as a single translation call.
+
+    Accepts a JSON payload with:
+    - copy_variations: List of copy objects (headline, body_text, call_to_action, variation_number)
+    - target_languages: List of target languages
+    - brand: Optional brand name scoping translation memory reuse
+
+    Args:
+        request: Batch translation request
+        translation_service: Injected Translation service
+
+    Returns:
+        BatchTranslationResponse: One entry per variation and language; failed
+        entries carry an error message instead of translated_copy
+
+    Raises:
+        HTTPException: If validation fails
+    """
+    _validate_batch_request(request)
+
+    try:
+        result = await translation_service.translate_batch(
+            request.copy_variations, request.target_languages, request.brand
+        )
+        validated = BatchTranslationResponse(**result)
+        return JSONResponse(content=validated.model_dump(mode='json'))
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error translating copy: {str(e)}"
+        )
+
+
+@router.post("/translate/batch/stream")
+async def translate_batch_stream(
+    request: BatchTranslationRequest,
+    translation_service: TranslationService = Depends(get_translation_service)
+):
+    """
+    Batch translation streamed as Server-Sent Events.
+
+    Emits one `translation` event per variation and language as soon as its
+    prompt completes, then a `complete` event with the full BatchTranslationResponse.
+
+    Args:
+        request: Batch translation request
+        translation_service: Injected Translation service
+
+    Returns:
+        StreamingResponse: text/event-stream of translation events
+    """
+    _validate_batch_request(request)
+    return event_stream_response(
+        translation_service.stream_batch_translation(
+            request.copy_variations, request.target_languages, request.brand
+        )
+    )
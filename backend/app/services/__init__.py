@@ -1,10 +1,49 @@
 """
 Business logic and external service integrations
 """
+from app.services.client_registry import ClientRegistry
+from app.services.model_backend import ModelBackend, create_model_backend
+from app.services.model_scheduler import ModelScheduler
+from app.services.resilience import ResiliencePolicy
+from app.services.model_executor import ModelExecutor
+from app.services.translation_memory import TranslationMemory
+from app.services.operation_poller import OperationPoller
+from app.services.asset_store import AssetStore, create_asset_store
+from app.services.image_preprocessor import ImagePreprocessor
+from app.services.local_image_engine import LocalImageEngine
+from app.services.job_store import JobStore, create_job_store
+from app.services.job_manager import JobManager
+from app.services.edit_session_manager import EditSessionManager
+from app.services.brief_compactor import BriefCompactor
+from app.services.brief_ingestion import BriefIngestionPolicy
 from app.services.gemini_service import GeminiService
+from app.services.translation_service import TranslationService
 from app.services.ad_creative_service import AdCreativeService
+from app.services.asset_generation_service import AssetGenerationService
+from app.services.image_processing_service import ImageProcessingService
 
 __all__ = [
+    "ClientRegistry",
+    "ModelBackend",
+    "create_model_backend",
+    "ModelScheduler",
+    "ResiliencePolicy",
+    "ModelExecutor",
+    "TranslationMemory",
+    "OperationPoller",
+    "AssetStore",
+    "create_asset_store",
+    "ImagePreprocessor",
+    "LocalImageEngine",
+    "JobStore",
+    "create_job_store",
+    "JobManager",
+    "EditSessionManager",
+    "BriefCompactor",
+    "BriefIngestionPolicy",
     "GeminiService",
+    "TranslationService",
     "AdCreativeService",
+    "AssetGenerationService",
+    "ImageProcessingService",
 ]
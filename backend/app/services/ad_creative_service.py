@@ -2,10 +2,13 @@
 Service for ad creative evaluation and generation using Gemini AI
 """
 import json
-from typing import Dict, Any
-from vertexai.generative_models import GenerativeModel, Part
+from typing import Dict, Any, Optional
 
 from app.prompts import PromptLoader
+from app.services.image_preprocessor import ImagePreprocessor
+from app.services.model_backend import ModelBackend
+from app.services.model_executor import ModelExecutor
+from app.services.model_scheduler import estimate_tokens
 from app.models.ad_creative_models import (
     AdCreativeEvaluationResponse,
     CreativeGenerationResponse,
@@ -16,15 +19,11 @@ from app.models.ad_creative_models import (
 class AdCreativeService:
     """Service for evaluating and generating ad creatives using Gemini AI"""
 
-    def __init__(self):
+    def __init__(self, backend: ModelBackend, executor: ModelExecutor, preprocessor: Optional[ImagePreprocessor] = None):
         self.model_name = 'gemini-2.5-pro'
-        self.model = None
-
-    def _get_model(self) -> GenerativeModel:
-        """Lazy load the model when needed"""
-        if self.model is None:
-            self.model = GenerativeModel(self.model_name)
-        return self.model
+        self.backend = backend
+        self.executor = executor
+        self.preprocessor = preprocessor or ImagePreprocessor()
 
     def _get_creativity_label(self, level: int) -> str:
         """Convert creativity level to label"""
@@ -37,6 +36,35 @@ class AdCreativeService:
         else:
             return "Experimental"
 
+    def _parse_evaluation(self, response) -> Dict[str, Any]:
+        """Parse and validate evaluation scores from a model response"""
+        evaluation_result = json.loads(response.text)
+
+        # Validate the result has the required fields
+        required_fields = ["conversion_score", "retention_score", "traffic_score", "engagement_score"]
+        if not all(key in evaluation_result for key in required_fields):
+            raise ValueError(f"Generated response missing required fields. Got: {list(evaluation_result.keys())}")
+
+        # Ensure scores are floats and within range (1.0 to 10.0)
+        for field in required_fields:
+            score = evaluation_result[field]
+            if not isinstance(score, (int, float)):
+                raise ValueError(f"{field} must be a number")
+            # Clamp between 1.0 and 10.0, round to 1 decimal place
+            evaluation_result[field] = round(min(10.0, max(1.0, float(score))), 1)
+
+        return evaluation_result
+
+    def _parse_creative_prompts(self, response) -> Dict[str, Any]:
+        """Parse and validate generated creative prompts from a model response"""
+        generation_result = json.loads(response.text)
+
+        # Validate the result has the required fields
+        if not all(key in generation_result for key in ["image_prompt", "copy_prompt", "video_prompt"]):
+            raise ValueError(f"Generated response missing required fields. Got: {list(generation_result.keys())}")
+
+        return generation_result
+
     async def evaluate_generated_image(
         self,
         image_data: bytes,
@@ -97,37 +125,25 @@ Return ONLY a JSON object with these exact fields (scores must be decimal number
 }}"""
 
         try:
-            model = self._get_model()
-
-            # Prepare the image part
-            image_part = Part.from_data(data=image_data, mime_type=image_mime_type)
-
-            # Generate evaluation using Gemini 2.5 Pro
-            response = model.generate_content(
-                [evaluation_prompt, image_part],
-                generation_config={
-                    "response_mime_type": "application/json",
-                    "temperature": 0.2  # Lower temperature for consistent scoring
-                }
+            # Downscale to the resolution the evaluator sees and prepare the image part
+            image_part = await self.executor.run_blocking(
+                ModelExecutor.IMAGE, self.preprocessor.prepare, image_data, "evaluation", image_mime_type
             )
 
-            # Parse and validate the response
-            evaluation_result = json.loads(response.text)
-
-            # Validate the result has the required fields
-            required_fields = ["conversion_score", "retention_score", "traffic_score", "engagement_score"]
-            if not all(key in evaluation_result for key in required_fields):
-                raise ValueError(f"Generated response missing required fields. Got: {list(evaluation_result.keys())}")
-
-            # Ensure scores are floats and within range (1.0 to 10.0)
-            for field in required_fields:
-                score = evaluation_result[field]
-                if not isinstance(score, (int, float)):
-                    raise ValueError(f"{field} must be a number")
-                # Clamp between 1.0 and 10.0, round to 1 decimal place
-                evaluation_result[field] = round(min(10.0, max(1.0, float(score))), 1)
-
-            return evaluation_result
+            # Generate evaluation using Gemini 2.5 Pro (idempotent, so it may be hedged)
+            return await self.executor.call_model(
+                self.model_name,
+                lambda: self.backend.generate_content(
+                    self.model_name,
+                    [evaluation_prompt, image_part],
+                    response_mime_type="application/json",
+                    temperature=0.2,  # Lower temperature for consistent scoring
+                    task="evaluation"
+                ),
+                estimated_tokens=estimate_tokens([evaluation_prompt, image_part]),
+                parse=self._parse_evaluation,
+                hedge=True
+            )
 
         except Exception as e:
             raise ValueError(f"Error evaluating ad creative: {str(e)}")
@@ -186,26 +202,19 @@ Return ONLY a JSON object with these exact fields (scores must be decimal number
        
 
         try:
-            model = self._get_model()
-    
-
             # Let Gemini generate free-form JSON based on prompt instructions
             # The prompt already specifies the exact JSON format needed
-            response = model.generate_content(
-                prompt,
-                generation_config={
-                    "response_mime_type": "application/json"
-                }
+            return await self.executor.call_model(
+                self.model_name,
+                lambda: self.backend.generate_content(
+                    self.model_name,
+                    prompt,
+                    response_mime_type="application/json",
+                    task="creative_prompts"
+                ),
+                estimated_tokens=estimate_tokens(prompt),
+                parse=self._parse_creative_prompts
             )
 
-            # Parse and validate the response
-            generation_result = json.loads(response.text)
-
-            # Validate the result has the required fields
-            if not all(key in generation_result for key in ["image_prompt", "copy_prompt", "video_prompt"]):
-                raise ValueError(f"Generated response missing required fields. Got: {list(generation_result.keys())}")
-
-            return generation_result
-
         except Exception as e:
             raise ValueError(f"Error generating creative prompts: {str(e)}")
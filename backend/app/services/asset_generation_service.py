@@ -1,20 +1,9 @@
 """
 Service for generating creative assets using Google AI models
 """
-import base64
 import asyncio
-import time
-import tempfile
-import io
-from typing import List, Dict, Any
-import vertexai
-from vertexai.preview.vision_models import ImageGenerationModel, Image as VertexImage
-from vertexai.generative_models import GenerativeModel
-from google import genai
-from google.genai.types import GenerateVideosConfig
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 import json
-import google.generativeai as genai_sdk
-from PIL import Image as PILImage
 
 from app.models.ad_creative_models import (
     ImageGenerationConfig,
@@ -22,17 +11,35 @@ from app.models.ad_creative_models import (
     VideoGenerationConfig,
     GeneratedVideo,
     CopyGenerationConfig,
-    GeneratedCopy
+    GeneratedCopy,
+    VariationError
 )
 from app.config import Config
+from app.services.model_backend import ContentPart, ModelBackend
+from app.services.model_executor import ModelExecutor
+from app.services.model_scheduler import estimate_tokens
+from app.services.operation_poller import OperationPoller
+from app.services.asset_store import AssetStore, create_asset_store
+from app.services.image_preprocessor import ImagePreprocessor
+from app.utils.json_stream import JsonStreamParser
 
 
 class AssetGenerationService:
     """Service for generating creative assets using Google AI"""
 
-    def __init__(self):
-        self.imagen_models = {}  # Cache for different model versions
-        self.gemini_models = {}  # Cache for Gemini models
+    def __init__(
+        self,
+        backend: ModelBackend,
+        executor: ModelExecutor,
+        poller: Optional[OperationPoller] = None,
+        assets: Optional[AssetStore] = None,
+        preprocessor: Optional[ImagePreprocessor] = None
+    ):
+        self.backend = backend
+        self.executor = executor
+        self.poller = poller or OperationPoller(backend, executor)
+        self.assets = assets or create_asset_store()
+        self.preprocessor = preprocessor or ImagePreprocessor()
 
     def _map_creativity_to_temperature(self, creativity_level: str) -> float:
         """Map creativity level to temperature parameter"""
@@ -44,251 +51,181 @@ class AssetGenerationService:
         }
         return mapping.get(creativity_level.lower(), 0.4)
 
-    def _get_imagen_model(self, model_name: str):
-        """Get or create Imagen model instance"""
-        if model_name not in self.imagen_models:
-            self.imagen_models[model_name] = model_name
-        return self.imagen_models[model_name]
+    async def _generate_image_variation(
+        self,
+        config: ImageGenerationConfig,
+        product_image: ContentPart,
+        variation_number: int
+    ) -> GeneratedImage:
+        """Generate one image variation with the product image as reference"""
+        model_name = 'gemini-2.5-flash-image'
+
+        # Create prompt that includes reference to the product image
+        generation_prompt = f"""Generate a creative advertising image based on this product image and the following prompt:
 
-    def _get_gemini_model(self, model_name: str) -> GenerativeModel:
-        """Get or create Gemini model instance"""
-        if model_name not in self.gemini_models:
-            self.gemini_models[model_name] = GenerativeModel(model_name)
-        return self.gemini_models[model_name]
+{config.prompt}
 
-    def _bytes_to_base64(self, data_bytes: bytes) -> str:
-        """Convert bytes to base64 string"""
-        return base64.b64encode(data_bytes).decode('utf-8')
+Make sure to incorporate the product from the reference image into the creative scene. Create variation {variation_number} with unique styling while maintaining the product's appearance."""
+
+        # Generate image with reference
+        response = await self.executor.call_model(
+            model_name,
+            lambda: self.backend.generate_content(
+                model_name,
+                [generation_prompt, product_image],
+                temperature=self._map_creativity_to_temperature(config.creativity_level),
+                task="image_generation"
+            ),
+            workload=ModelExecutor.IMAGE,
+            estimated_tokens=estimate_tokens([generation_prompt, product_image])
+        )
+
+        # Extract generated image from response
+        if not response.images:
+            reason = f" (finish reason: {response.finish_reason})" if response.finish_reason else ""
+            raise ValueError(f"The model returned no image{reason}")
+
+        image = response.images[0]
+        mime_type = image.mime_type or "image/png"
+        asset = await self.executor.run_blocking(
+            ModelExecutor.IO, self.assets.put_bytes, image.data, mime_type
+        )
+        return GeneratedImage(
+            asset_id=asset.asset_id,
+            image_url=self.assets.url(asset.asset_id),
+            variation_number=variation_number,
+            mime_type=mime_type
+        )
 
     async def generate_images(
         self,
         config: ImageGenerationConfig,
         product_sku_image: bytes
-    ) -> List[GeneratedImage]:
-        """Generate images using Gemini 2.5 Flash with image preview capability"""
-        try:
-
-            # Configure Gemini API
-            genai_sdk.configure(api_key=Config.GEMINI_API_KEY)
-            model = genai_sdk.GenerativeModel('gemini-2.5-flash-image')
-
-            # Convert product SKU image bytes to PIL Image
-            product_image = PILImage.open(io.BytesIO(product_sku_image))
-
-            generated_images = []
+    ) -> Tuple[List[GeneratedImage], List[VariationError]]:
+        """
+        Generate image variations concurrently using Gemini 2.5 Flash Image
 
-            # Generate images one at a time with the reference image
-            for i in range(config.num_variations):
+        At most IMAGE_VARIATION_CONCURRENCY variations of one request are in
+        flight at a time; the model's scheduler limits apply on top of that.
 
-                # Create prompt that includes reference to the product image
-                generation_prompt = f"""Generate a creative advertising image based on this product image and the following prompt:
+        Returns:
+            (images, errors): generated images and failed variations, each
+            ordered by variation_number
+        """
+        try:
+            # Prepare the product SKU image once; every variation shares the part
+            product_image = await self.executor.run_blocking(
+                ModelExecutor.IMAGE, self.preprocessor.prepare, product_sku_image, "reference"
+            )
+        except Exception as e:
+            raise ValueError(f"Error generating images: {str(e)}")
 
-{config.prompt}
+        fan_out = asyncio.Semaphore(max(1, Config.IMAGE_VARIATION_CONCURRENCY))
 
-Make sure to incorporate the product from the reference image into the creative scene. Create variation {i + 1} with unique styling while maintaining the product's appearance."""
+        async def bounded(variation_number: int) -> GeneratedImage:
+            async with fan_out:
+                return await self._generate_image_variation(config, product_image, variation_number)
 
-                # Generate image with reference
-                response = model.generate_content(
-                    [generation_prompt, product_image],
-                    generation_config={
-                        "temperature": self._map_creativity_to_temperature(config.creativity_level),
-                    }
-                )
+        variation_numbers = range(1, config.num_variations + 1)
+        results = await asyncio.gather(
+            *(bounded(variation_number) for variation_number in variation_numbers),
+            return_exceptions=True
+        )
 
-                # Extract generated image from response
-                if response.candidates and len(response.candidates) > 0:
-                    candidate = response.candidates[0]
-                    if candidate.content and candidate.content.parts:
-                        for part in candidate.content.parts:
-                            if hasattr(part, 'inline_data') and part.inline_data:
-                                # Get image bytes from inline data
-                                image_bytes = part.inline_data.data
-                                image_base64 = self._bytes_to_base64(image_bytes)
-
-                                generated_images.append(
-                                    GeneratedImage(
-                                        image_base64=image_base64,
-                                        variation_number=i + 1,
-                                        mime_type=part.inline_data.mime_type or "image/png"
-                                    )
-                                )
-                                break
-
-            if not generated_images:
-                raise ValueError("No images were generated")
-
-            return generated_images
+        generated_images = []
+        errors = []
+        for variation_number, result in zip(variation_numbers, results):
+            if isinstance(result, Exception):
+                print(f"Image variation {variation_number} failed: {result}")
+                errors.append(VariationError(variation_number=variation_number, error=str(result)))
+            else:
+                generated_images.append(result)
 
-        except Exception as e:
-            raise ValueError(f"Error generating images: {str(e)}")
+        return generated_images, errors
 
     async def generate_video(
         self,
         config: VideoGenerationConfig,
-        product_sku_image: bytes
+        product_sku_image: bytes,
+        on_progress: Optional[Callable[[str], Awaitable[None]]] = None
     ) -> GeneratedVideo:
-        """Generate video using Veo with Google GenAI SDK"""
+        """
+        Generate video using Veo through the model backend
+
+        Args:
+            config: Video generation configuration
+            product_sku_image: Product SKU image bytes
+            on_progress: Optional coroutine called with a short stage description
+                (used by background jobs to publish progress)
+        """
+        async def progress(stage: str):
+            if on_progress is not None:
+                await on_progress(stage)
 
         try:
-            # Initialize Google GenAI client
-            client = genai.Client(
-                vertexai=True,
-                project=Config.PROJECT_ID,
-                location="us-central1"
+            await progress("submitting")
+            product_image = await self.executor.run_blocking(
+                ModelExecutor.IMAGE, self.preprocessor.prepare, product_sku_image, "video"
             )
 
-
             # Start video generation operation - pass image bytes with MIME type
-            # Note: Not using output_gcs_uri so the API returns video_bytes directly
-            operation = client.models.generate_videos(
-                model=config.model_name,  # Use model from config (Veo 2 or Veo 3)
-                prompt=config.prompt,  # Use user's prompt directly
-                image=genai.types.Image(
-                    image_bytes=product_sku_image,
-                    mime_type="image/png"  # Specify MIME type
-                ),
-                config=GenerateVideosConfig(
+            operation = await self.executor.call_model(
+                config.model_name,
+                lambda: self.backend.start_video(
+                    config.model_name,  # Use model from config (Veo 2 or Veo 3)
+                    config.prompt,  # Use user's prompt directly
+                    image=product_image,
                     aspect_ratio="16:9",
+                    duration_seconds=config.duration_seconds
                 ),
+                workload=ModelExecutor.VIDEO,
+                idempotent=False  # a timed-out submit may still have started an operation
             )
+            await progress("rendering")
 
+            operation = await self.poller.wait(config.model_name, operation, config.duration_seconds)
 
-            max_wait_time = 600  # 10 minutes timeout
-            start_time = time.time()
+            if operation.error:
+                raise ValueError(f"Video generation failed: {operation.error}")
 
-            # Handle operation - it might be a string (operation name) or an operation object
-            try:
-                if isinstance(operation, str):
-                    operation_name = operation
-                else:
-                    operation_name = str(operation.name) if hasattr(operation, 'name') else str(operation)
-            except Exception as e:
-                raise ValueError(f"Failed to get operation name: {str(e)}")
-
-            # Poll for completion using the operation object
-            while True:
-                try:
-                    if time.time() - start_time > max_wait_time:
-                        raise ValueError("Video generation timed out after 10 minutes")
-
-                    # Get the current operation status - pass the operation object, not the string
-                    current_operation = client.operations.get(operation)
-
-                    # Safely check status
-                    try:
-                        status = current_operation.metadata if hasattr(current_operation, 'metadata') else 'polling...'
-                    except:
-                        pass
-
-                    # Check if done
-                    try:
-                        is_done = current_operation.done if hasattr(current_operation, 'done') else False
-                        if is_done:
-                            operation = current_operation
-                            break
-                    except:
-                        pass
-
-                    # Update operation for next iteration
-                    operation = current_operation
-
-                    await asyncio.sleep(15)  # Wait 15 seconds between polls
-                except Exception as e:
-                    raise
-
-            # Check if we have a response
-            try:
-
-                # Try to get the result
-                if hasattr(operation, 'result') and operation.result:
-                    result = operation.result
-
-                    # Check for generated_videos
-                    if hasattr(result, 'generated_videos') and result.generated_videos:
-                        video_result = result.generated_videos[0]
-
-                        # Check if we have video object
-                        if hasattr(video_result, 'video') and video_result.video:
-                            video_obj = video_result.video
-
-                            # Try to get video URI first
-                            video_uri = None
-                            if hasattr(video_obj, 'uri') and video_obj.uri:
-                                video_uri = video_obj.uri
-                            elif hasattr(video_obj, 'url') and video_obj.url:
-                                video_uri = video_obj.url
-
-
-                            # If we have a URI, process it
-                            if video_uri:
-                                # Check if it's a GCS URI or HTTP URL
-                                if video_uri.startswith('gs://'):
-                                    # Download video from GCS and convert to base64
-                                    from google.cloud import storage
-                                    storage_client = storage.Client()
-
-                                    # Parse GCS URI (gs://bucket/path)
-                                    uri_parts = video_uri.replace("gs://", "").split("/", 1)
-                                    bucket_name = uri_parts[0]
-                                    blob_path = uri_parts[1]
-
-                                    bucket = storage_client.bucket(bucket_name)
-                                    blob = bucket.blob(blob_path)
-
-                                    # Generate a signed URL (valid for 1 hour)
-                                    from datetime import timedelta
-                                    video_url = blob.generate_signed_url(
-                                        version="v4",
-                                        expiration=timedelta(hours=1),
-                                        method="GET"
-                                    )
-
-                                    return GeneratedVideo(
-                                        video_url=video_url,
-                                        mime_type="video/mp4",
-                                        duration_seconds=float(config.duration_seconds)
-                                    )
-                                elif video_uri.startswith('http'):
-                                    # It's already a URL, return it directly
-                                    return GeneratedVideo(
-                                        video_url=video_uri,
-                                        mime_type="video/mp4",
-                                        duration_seconds=float(config.duration_seconds)
-                                    )
-
-                            # If no URI, check for video_bytes
-                            if hasattr(video_obj, 'video_bytes') and video_obj.video_bytes:
-                                video_bytes = video_obj.video_bytes
-                                video_base64 = self._bytes_to_base64(video_bytes)
-
-                                return GeneratedVideo(
-                                    video_base64=video_base64,
-                                    mime_type="video/mp4",
-                                    duration_seconds=float(config.duration_seconds)
-                                )
-
-                # If we get here, we couldn't find the video
-                raise ValueError(f"Video generation completed but no video found. Operation: {operation}")
-
-            except Exception as e:
-                import traceback
-                raise ValueError(f"Failed to process video result: {str(e)}")
+            # Prefer a URI (GCS or HTTP), otherwise fall back to the returned bytes
+            if operation.video_uri:
+                video_url = operation.video_uri
+                if video_url.startswith('gs://'):
+                    # Generate a signed URL (valid for 1 hour)
+                    video_url = await self.executor.run_blocking(
+                        ModelExecutor.IO, self.backend.signed_url, video_url, 3600
+                    )
+                if video_url.startswith('http'):
+                    return GeneratedVideo(
+                        video_url=video_url,
+                        mime_type="video/mp4",
+                        duration_seconds=float(config.duration_seconds)
+                    )
+
+            if operation.video_bytes:
+                # Spool to the asset store and hand out a URL instead of inlining base64 in the JSON
+                asset = await self.executor.run_blocking(
+                    ModelExecutor.IO, self.assets.put_bytes, operation.video_bytes, "video/mp4"
+                )
+
+                return GeneratedVideo(
+                    video_url=self.assets.url(asset.asset_id),
+                    asset_id=asset.asset_id,
+                    mime_type="video/mp4",
+                    duration_seconds=float(config.duration_seconds)
+                )
+
+            # If we get here, we couldn't find the video
+            raise ValueError(f"Video generation completed but no video found. Operation: {operation.name}")
 
         except Exception as e:
-            import traceback
             raise ValueError(f"Error generating video: {str(e)}")
 
-    async def generate_copy(
-        self,
-        config: CopyGenerationConfig,
-        brief_context: str
-    ) -> List[GeneratedCopy]:
-        """Generate ad copy using Gemini"""
-        try:
-            temperature = self._map_creativity_to_temperature(config.creativity_level)
-
-            # Enhanced prompt for copy generation
-            generation_prompt = f"""{config.prompt}
+    def _copy_prompt(self, config: CopyGenerationConfig, brief_context: str) -> str:
+        """Build the copy generation prompt"""
+        # Enhanced prompt for copy generation
+        return f"""{config.prompt}
 
 Generate {config.num_variations} different advertising copy variations.
 
@@ -309,57 +246,101 @@ Return the response as a JSON array with this structure:
 Brief Context:
 {brief_context}"""
 
-            # Use GenAI SDK for Gemini 3 Pro Preview (requires global region)
-            if config.model_name == "gemini-3-pro-preview":
-                client = genai.Client(
-                    vertexai=True,
-                    project=Config.PROJECT_ID,
-                    location="global"  # Gemini 3 requires global region
-                )
+    def _to_generated_copy(self, copy_item: Dict[str, Any], index: int) -> GeneratedCopy:
+        """Convert one copy variation from the model into a GeneratedCopy"""
+        return GeneratedCopy(
+            headline=copy_item.get("headline", ""),
+            body_text=copy_item.get("body_text", ""),
+            call_to_action=copy_item.get("call_to_action", ""),
+            variation_number=index + 1
+        )
 
-                response = client.models.generate_content(
-                    model=config.model_name,
-                    contents=generation_prompt,
-                    config=genai.types.GenerateContentConfig(
-                        temperature=temperature,
-                        response_mime_type="application/json"
-                    )
-                )
+    async def generate_copy(
+        self,
+        config: CopyGenerationConfig,
+        brief_context: str
+    ) -> List[GeneratedCopy]:
+        """Generate ad copy using Gemini"""
+        try:
+            temperature = self._map_creativity_to_temperature(config.creativity_level)
+            generation_prompt = self._copy_prompt(config, brief_context)
 
-                response_text = response.text
-            else:
-                # Use Vertex AI GenerativeModel for other Gemini models
-                model = self._get_gemini_model(config.model_name)
-                response = model.generate_content(
+            # The backend routes Gemini 3 models to the global region
+            copy_data = await self.executor.call_model(
+                config.model_name,
+                lambda: self.backend.generate_content(
+                    config.model_name,
                     generation_prompt,
-                    generation_config={
-                        "temperature": temperature,
-                        "response_mime_type": "application/json"
-                    }
-                )
-                response_text = response.text
-
-            # Parse JSON response
-            copy_data = json.loads(response_text)
-        
-
-            generated_copies = []
-            for i, copy_item in enumerate(copy_data[:config.num_variations]):
-                generated_copies.append(
-                    GeneratedCopy(
-                        headline=copy_item.get("headline", ""),
-                        body_text=copy_item.get("body_text", ""),
-                        call_to_action=copy_item.get("call_to_action", ""),
-                        variation_number=i + 1
-                    )
-                )
+                    temperature=temperature,
+                    response_mime_type="application/json",
+                    task="copy_generation"
+                ),
+                estimated_tokens=estimate_tokens(generation_prompt),
+                parse=lambda response: json.loads(response.text)
+            )
 
-            return generated_copies
+            return [
+                self._to_generated_copy(copy_item, i)
+                for i, copy_item in enumerate(copy_data[:config.num_variations])
+            ]
 
         except Exception as e:
             print("Error generating copy:", e)
             raise ValueError(f"Error generating copy: {str(e)}")
-            
+
+    async def stream_copy(
+        self,
+        config: CopyGenerationConfig,
+        brief_context: str
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Generate ad copy, yielding each variation as soon as the model has written it
+
+        Args:
+            config: Copy generation configuration
+            brief_context: Brief context for copy generation
+
+        Yields:
+            ("variation", GeneratedCopy) for every completed variation, then
+            ("complete", [GeneratedCopy, ...]) with the full list
+
+        Raises:
+            ValueError: If the stream fails or the final document does not validate
+        """
+        temperature = self._map_creativity_to_temperature(config.creativity_level)
+        generation_prompt = self._copy_prompt(config, brief_context)
+        parser = JsonStreamParser(max_depth=1)
+        generated_copies = []
+
+        try:
+            chunks = self.executor.stream_model(
+                config.model_name,
+                lambda: self.backend.stream_content(
+                    config.model_name,
+                    generation_prompt,
+                    temperature=temperature,
+                    response_mime_type="application/json",
+                    task="copy_generation"
+                ),
+                estimated_tokens=estimate_tokens(generation_prompt)
+            )
+            async for chunk in chunks:
+                for path, value in parser.feed(chunk.text or ""):
+                    # Array elements complete at path (index,); the array itself at ()
+                    if len(path) != 1 or len(generated_copies) >= config.num_variations:
+                        continue
+                    generated_copy = self._to_generated_copy(value, path[0])
+                    generated_copies.append(generated_copy)
+                    yield "variation", generated_copy.model_dump(mode='json')
+
+            if not isinstance(parser.result(), list):
+                raise ValueError("Expected a JSON array of copy variations")
+
+        except Exception as e:
+            print("Error generating copy:", e)
+            raise ValueError(f"Error generating copy: {str(e)}")
+
+        yield "complete", [generated_copy.model_dump(mode='json') for generated_copy in generated_copies]
 
     async def generate_assets(
         self,
@@ -408,6 +389,11 @@ Brief Context:
                 if isinstance(task_result, Exception):
                     # Continue with other tasks even if one fails
                     pass
+                elif task_type == 'images':
+                    images, image_errors = task_result
+                    result['images'] = images
+                    if image_errors:
+                        result['image_errors'] = image_errors
                 else:
                     result[task_type] = task_result
 
@@ -0,0 +1,387 @@
+"""
+Content-addressed storage for generated media
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, Optional, Tuple
+
+from app.config import Config
+from app.utils.metrics import metrics
+
+# Chunk size used when spooling to and streaming from the store
+CHUNK_SIZE = 256 * 1024
+
+_ASSET_ID = re.compile(r"^[0-9a-f]{64}$")
+
+# Bytes of a file needed to recognise its media type
+SNIFF_BYTES = 32
+
+# ISO base media brands (bytes 8..12 of an `ftyp` box) that are images rather than video
+_IMAGE_BRANDS = {b"avif": "image/avif", b"avis": "image/avif", b"heic": "image/heic", b"heix": "image/heic", b"mif1": "image/heic"}
+
+# Types served inline; anything else is served as a download so browsers never render it as a page
+MEDIA_TYPES = {
+    "image/png", "image/jpeg", "image/gif", "image/webp", "image/avif", "image/heic",
+    "video/mp4", "video/quicktime", "video/webm",
+}
+
+
+def is_asset_id(value: str) -> bool:
+    """Whether a string has the shape of an asset ID (lower-case hex SHA-256)"""
+    return bool(_ASSET_ID.match(value))
+
+
+def sniff_media_type(head: bytes) -> Optional[str]:
+    """
+    Recognise an image or video from its leading bytes (at least SNIFF_BYTES)
+
+    Returns:
+        One of MEDIA_TYPES, or None if the bytes are not a supported image or video
+    """
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "video/webm"
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand in _IMAGE_BRANDS:
+            return _IMAGE_BRANDS[brand]
+        return "video/quicktime" if brand == b"qt  " else "video/mp4"
+    return None
+
+
+class StoredAsset:
+    """Metadata of a stored asset"""
+
+    def __init__(self, asset_id: str, mime_type: str, size: int, created_at: Optional[float] = None):
+        self.asset_id = asset_id
+        self.mime_type = mime_type
+        self.size = size
+        self.created_at = created_at or time.time()
+
+    @property
+    def etag(self) -> str:
+        # Content-addressed, so the ID is a strong validator
+        return f'"{self.asset_id}"'
+
+
+class AssetStore(ABC):
+    """
+    Stores media by the SHA-256 of its content.
+
+    Identical bytes always map to the same asset ID, so storing an asset
+    twice is free and IDs never go stale. Methods are blocking; async
+    callers run them on the IO pool.
+    """
+
+    def __init__(self, base_url: str = Config.ASSET_BASE_URL):
+        """
+        Args:
+            base_url: Public prefix for asset URLs (empty for paths relative to this API)
+        """
+        self.base_url = base_url.rstrip("/")
+
+    def url(self, asset_id: str) -> str:
+        """URL under which the asset endpoint serves an asset"""
+        return f"{self.base_url}/api/assets/{asset_id}"
+
+    def put_bytes(self, data: bytes, mime_type: str) -> StoredAsset:
+        """Store an in-memory payload without copying it"""
+        view = memoryview(data)
+        return self.put_chunks((view[i:i + CHUNK_SIZE] for i in range(0, len(view), CHUNK_SIZE)), mime_type)
+
+    @abstractmethod
+    def put_chunks(self, chunks: Iterator[bytes], mime_type: str) -> StoredAsset:
+        """Spool a payload chunk by chunk, hashing it on the way"""
+
+    @abstractmethod
+    def stat(self, asset_id: str) -> Optional[StoredAsset]:
+        """Metadata of an asset, or None if it does not exist"""
+
+    @abstractmethod
+    def read_range(self, asset_id: str, start: int, end: int) -> Iterator[bytes]:
+        """Yield bytes start..end (inclusive) of an asset in chunks"""
+
+    def touch(self, asset_ids: Iterable[str]):
+        """
+        Mark assets as still in use so garbage collection keeps them
+
+        Stores without garbage collection (lifecycle rules, if any, are
+        configured on the bucket) have nothing to do.
+        """
+
+    def get_bytes(self, asset_id: str) -> Optional[Tuple[bytes, str]]:
+        """Load a whole asset (for small media such as images); returns (data, mime type) or None"""
+        asset = self.stat(asset_id)
+        if asset is None:
+            return None
+        if asset.size == 0:
+            return b"", asset.mime_type
+        return b"".join(self.read_range(asset_id, 0, asset.size - 1)), asset.mime_type
+
+
+class LocalAssetStore(AssetStore):
+    """
+    Keeps assets as files under `directory/<id[:2]>/<id>` with a JSON metadata sidecar.
+
+    Storing or touching an asset again refreshes its file time. At most
+    every GC_INTERVAL seconds a write scans the directory, deletes assets
+    not used again within `ttl` and then the least recently used ones
+    until the directory fits in `max_bytes`. The scan covers files
+    written by every process sharing the directory.
+
+    Assets used within `min_age` are never deleted, whatever the limits:
+    edit sessions touch their versions' images while they live, and job
+    results are stored when the job finishes, so a `min_age` of at least
+    the session idle timeout and the job retention keeps every asset they
+    hand out servable. `max_bytes` may be exceeded while the recent
+    assets alone are larger.
+    """
+
+    GC_INTERVAL = 60
+
+    def __init__(
+        self,
+        directory: str,
+        base_url: str = Config.ASSET_BASE_URL,
+        ttl: float = Config.ASSET_STORE_TTL,
+        max_bytes: int = Config.ASSET_STORE_MAX_BYTES,
+        min_age: float = Config.ASSET_STORE_MIN_AGE
+    ):
+        """
+        Args:
+            directory: Root directory of the store
+            base_url: Public prefix for asset URLs
+            ttl: Seconds an asset is kept after it was last stored or touched (0 = no expiry)
+            max_bytes: Size limit of the store in bytes (0 = unlimited)
+            min_age: Seconds after its last use during which an asset is never deleted
+        """
+        super().__init__(base_url)
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.min_age = min_age
+        self._last_gc = 0.0
+        self._gc_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, asset_id: str) -> str:
+        return os.path.join(self.directory, asset_id[:2], asset_id)
+
+    def put_chunks(self, chunks: Iterator[bytes], mime_type: str) -> StoredAsset:
+        digest = hashlib.sha256()
+        size = 0
+
+        # Spool to a temporary file first; the final name is only known once the content is hashed
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+
+            asset_id = digest.hexdigest()
+            path = self._path(asset_id)
+            if os.path.exists(path):
+                os.remove(temp_path)
+                os.utime(path)  # Keeps a re-used asset from expiring
+                metrics.increment("asset_store_writes_total", result="duplicate")
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(f"{path}.json.tmp", "w", encoding="utf-8") as meta:
+                    json.dump({"mime_type": mime_type, "size": size, "created_at": time.time()}, meta)
+                os.replace(f"{path}.json.tmp", f"{path}.json")
+                os.replace(temp_path, path)
+                metrics.increment("asset_store_writes_total", result="stored")
+                metrics.increment("asset_store_bytes_written_total", value=size)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        if time.monotonic() - self._last_gc >= self.GC_INTERVAL:
+            self.collect_garbage()
+        return StoredAsset(asset_id, mime_type, size)
+
+    def collect_garbage(self) -> int:
+        """
+        Delete expired assets, then the least recently used ones until the store fits in max_bytes
+
+        Returns:
+            The number of assets removed
+        """
+        if not self._gc_lock.acquire(blocking=False):
+            return 0  # Another thread is already collecting
+        try:
+            self._last_gc = time.monotonic()
+            if self.ttl <= 0 and self.max_bytes <= 0:
+                return 0
+
+            assets = []  # (mtime, bytes including the sidecar, asset ID)
+            for root, _, files in os.walk(self.directory):
+                for file_name in files:
+                    if not is_asset_id(file_name):
+                        continue
+                    try:
+                        stat = os.stat(os.path.join(root, file_name))
+                        sidecar = os.path.getsize(os.path.join(root, f"{file_name}.json"))
+                    except OSError:
+                        continue  # Removed meanwhile, or still being written
+                    assets.append((stat.st_mtime, stat.st_size + sidecar, file_name))
+
+            now = time.time()
+            total = sum(size for _, size, _ in assets)
+            removed = 0
+            for mtime, size, asset_id in sorted(assets):
+                if now - mtime < self.min_age:
+                    break  # This and every later asset may still be referenced
+                if self.ttl > 0 and now - mtime > self.ttl:
+                    reason = "ttl"
+                elif self.max_bytes > 0 and total > self.max_bytes:
+                    reason = "size"
+                else:
+                    continue
+                self._remove(asset_id)
+                total -= size
+                removed += 1
+                metrics.increment("asset_store_evictions_total", reason=reason)
+            metrics.set_gauge("asset_store_bytes", total)
+            return removed
+        finally:
+            self._gc_lock.release()
+
+    def touch(self, asset_ids: Iterable[str]):
+        for asset_id in asset_ids:
+            if not is_asset_id(asset_id):
+                continue
+            try:
+                os.utime(self._path(asset_id))
+            except FileNotFoundError:
+                pass
+
+    def _remove(self, asset_id: str):
+        # The content goes first, so stat() stops seeing the asset before its metadata disappears
+        for path in (self._path(asset_id), f"{self._path(asset_id)}.json"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def stat(self, asset_id: str) -> Optional[StoredAsset]:
+        if not is_asset_id(asset_id):
+            return None
+        path = self._path(asset_id)
+        try:
+            with open(f"{path}.json", "r", encoding="utf-8") as meta:
+                info = json.load(meta)
+            size = os.path.getsize(path)
+        except (OSError, ValueError):
+            return None
+        return StoredAsset(asset_id, info.get("mime_type", "application/octet-stream"), size, info.get("created_at"))
+
+    def read_range(self, asset_id: str, start: int, end: int) -> Iterator[bytes]:
+        with open(self._path(asset_id), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+class GcsAssetStore(AssetStore):
+    """
+    Keeps assets as objects under `gs://bucket/prefix/<id>`.
+
+    Every worker pointing at the same bucket sees the same assets, so an
+    asset ID returned by one instance can be served or consumed by any other.
+    """
+
+    # Ranged downloads per request when streaming; larger than CHUNK_SIZE to amortise round trips
+    DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, bucket: str, prefix: str = "assets", base_url: str = Config.ASSET_BASE_URL):
+        super().__init__(base_url)
+        from google.cloud import storage
+        self._bucket = storage.Client().bucket(bucket)
+        self.prefix = prefix.strip("/")
+
+    def _blob_name(self, asset_id: str) -> str:
+        return f"{self.prefix}/{asset_id}" if self.prefix else asset_id
+
+    def put_chunks(self, chunks: Iterator[bytes], mime_type: str) -> StoredAsset:
+        from google.api_core.exceptions import PreconditionFailed
+
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.TemporaryFile() as f:
+            for chunk in chunks:
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+
+            asset_id = digest.hexdigest()
+            blob = self._bucket.blob(self._blob_name(asset_id))
+            try:
+                # Create-only upload: an existing object already holds these exact bytes
+                blob.upload_from_file(f, rewind=True, size=size, content_type=mime_type, if_generation_match=0)
+                metrics.increment("asset_store_writes_total", result="stored")
+                metrics.increment("asset_store_bytes_written_total", value=size)
+            except PreconditionFailed:
+                metrics.increment("asset_store_writes_total", result="duplicate")
+
+        return StoredAsset(asset_id, mime_type, size)
+
+    def stat(self, asset_id: str) -> Optional[StoredAsset]:
+        if not is_asset_id(asset_id):
+            return None
+        blob = self._bucket.get_blob(self._blob_name(asset_id))
+        if blob is None:
+            return None
+        created_at = blob.time_created.timestamp() if blob.time_created else None
+        return StoredAsset(asset_id, blob.content_type or "application/octet-stream", blob.size or 0, created_at)
+
+    def read_range(self, asset_id: str, start: int, end: int) -> Iterator[bytes]:
+        blob = self._bucket.blob(self._blob_name(asset_id))
+        position = start
+        while position <= end:
+            window_end = min(position + self.DOWNLOAD_CHUNK_SIZE - 1, end)
+            yield blob.download_as_bytes(start=position, end=window_end)  # end is inclusive
+            position = window_end + 1
+
+
+def create_asset_store(name: Optional[str] = None) -> AssetStore:
+    """
+    Build the asset store selected by configuration
+
+    Args:
+        name: Store name ("local" or "gcs"); defaults to Config.ASSET_STORE
+
+    Returns:
+        A ready-to-use AssetStore
+    """
+    name = (name or Config.ASSET_STORE).lower()
+
+    if name == "local":
+        return LocalAssetStore(Config.ASSET_STORE_DIR)
+    if name == "gcs":
+        if not Config.ASSET_GCS_BUCKET:
+            raise ValueError("ASSET_STORE=gcs requires ASSET_GCS_BUCKET")
+        return GcsAssetStore(Config.ASSET_GCS_BUCKET, Config.ASSET_GCS_PREFIX)
+
+    raise ValueError(f"Unknown ASSET_STORE '{name}'. Supported stores: local, gcs")
@@ -0,0 +1,231 @@
+"""
+Compaction of brief text before it is placed in the analysis prompt
+"""
+import re
+import unicodedata
+from typing import List, Optional, Set, Tuple
+
+from app.config import Config
+from app.services.model_scheduler import estimate_tokens
+from app.utils.metrics import metrics
+
+# Zero-width and other invisible characters left by copy/paste and PDF text layers
+_INVISIBLE = re.compile("[\u200b\u200c\u200d\u2060\ufeff\u00ad]")
+_HORIZONTAL_SPACE = re.compile(r"[^\S\n]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+# Unambiguous page furniture: "Page 3", "Page 3 of 12"
+_PAGE_LABEL = re.compile(r"^page\s+\d+(?:\s+of\s+\d+)?$", re.IGNORECASE)
+
+# Lines that may be page numbers ("3", "- 3 -", "3 / 12", "3 of 12") but may just as well be
+# values ("4", "4/5"); the captured number is the candidate page number
+_PAGE_NUMBER = re.compile(r"^[-–—]?\s*(\d{1,4})\s*(?:(?:/|of)\s*\d{1,4})?\s*[-–—]?$", re.IGNORECASE)
+
+# Page-number-like lines are only dropped as part of a run of at least this many consecutive numbers
+MIN_PAGE_RUN = 3
+
+# Lines shorter than this are never dropped as duplicates ("Yes", "N/A", "TBC" carry meaning in context)
+MIN_DUPLICATE_LINE = 12
+
+TRUNCATION_MARK = " […]"
+
+# Characters per token assumed by estimate_tokens
+CHARS_PER_TOKEN = 4
+
+
+class BriefCompactor:
+    """
+    Shrinks extracted brief text to what the analysis actually needs.
+
+    Compaction runs in three passes:
+
+    1. Normalization: Unicode NFKC, invisible characters removed, runs of
+       spaces and blank lines collapsed.
+    2. Boilerplate and duplicates, judged at page and table boundaries
+       only. Blocks separated by a blank line are the pages (PDF) or
+       paragraphs and tables (DOCX); the first and last lines of blocks
+       of several lines, and the first row of every table, are boundary
+       lines. "Page N" lines are dropped anywhere. Bare numbers and
+       "N / M" or "N of M" lines are dropped only at block edges and only
+       when they count up block by block in a run of at least
+       MIN_PAGE_RUN, so values such as "4" or an aspect ratio "4/5"
+       survive. A boundary line of at least MIN_DUPLICATE_LINE characters
+       that already appeared at a boundary is removed, which covers
+       running headers and footers and table header rows repeated after
+       page breaks; repeated lines inside the body are kept. Cells
+       repeated by merged table cells ("a | a | b") are collapsed.
+    3. Budget: if the estimated token count is still above `max_tokens`,
+       long paragraphs are trimmed at a word boundary. Short paragraphs and
+       headings are kept whole, and the longest ones give up text first
+       (water-filling), so the result always fits the budget and every
+       section stays represented.
+
+    The result is deterministic, so analysis cache keys stay stable.
+    """
+
+    def __init__(self, max_tokens: int = Config.BRIEF_MAX_INPUT_TOKENS, enabled: bool = Config.BRIEF_COMPACTION_ENABLED):
+        """
+        Args:
+            max_tokens: Upper bound on the estimated tokens of the brief text (0 disables trimming)
+            enabled: When False, text is passed through unchanged
+        """
+        self.max_tokens = max_tokens
+        self.enabled = enabled
+
+    def compact(self, text: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Compact brief text
+
+        Args:
+            text: Brief text as extracted or submitted
+            max_tokens: Token budget overriding the default (e.g. for chunked analysis)
+
+        Returns:
+            Normalized, de-duplicated text within the token budget
+        """
+        if not self.enabled or not text:
+            return text
+
+        budget = self.max_tokens if max_tokens is None else max_tokens
+        tokens_in = estimate_tokens(text)
+        compacted = self._deduplicate(self._normalize(text))
+        if budget and estimate_tokens(compacted) > budget:
+            compacted = self._fit(compacted, budget * CHARS_PER_TOKEN)
+            metrics.increment("brief_compaction_trimmed_total")
+
+        tokens_out = estimate_tokens(compacted)
+        metrics.increment("brief_compaction_tokens_in_total", value=tokens_in)
+        metrics.increment("brief_compaction_tokens_saved_total", value=tokens_in - tokens_out)
+        return compacted
+
+    def _normalize(self, text: str) -> str:
+        text = _INVISIBLE.sub("", unicodedata.normalize("NFKC", text))
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        lines = [_HORIZONTAL_SPACE.sub(" ", line).strip() for line in text.split("\n")]
+        return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+    def _deduplicate(self, text: str) -> str:
+        blocks = [[line for line in block.split("\n") if not _PAGE_LABEL.match(line)] for block in text.split("\n\n")]
+        page_numbers = self._page_numbers(blocks)
+
+        seen = set()
+        kept_blocks = []
+        for block_index, block in enumerate(blocks):
+            lines = [line for index, line in enumerate(block) if (block_index, index) not in page_numbers]
+            kept = []
+            for index, line in enumerate(lines):
+                table_row = " | " in line
+                if table_row:
+                    line = self._collapse_cells(line)
+                # A one-line block is a paragraph, not a page with a header or footer
+                page_edge = len(lines) > 1 and index in (0, len(lines) - 1)
+                table_start = table_row and (index == 0 or " | " not in lines[index - 1])
+                if (page_edge or table_start) and len(line) >= MIN_DUPLICATE_LINE:
+                    key = line.casefold()
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                kept.append(line)
+            kept_blocks.append("\n".join(kept))
+        return _BLANK_LINES.sub("\n\n", "\n\n".join(kept_blocks)).strip()
+
+    def _page_numbers(self, blocks: List[List[str]]) -> Set[Tuple[int, int]]:
+        """(block, line) positions of page numbers: boundary lines counting up across blocks"""
+        candidates = []
+        for block_index, block in enumerate(blocks):
+            for index in sorted({0, len(block) - 1}):
+                match = _PAGE_NUMBER.match(block[index]) if block else None
+                if match:
+                    candidates.append((block_index, index, int(match.group(1))))
+
+        runs: List[List[Tuple[int, int, int]]] = []
+        for candidate in candidates:
+            if runs and candidate[0] > runs[-1][-1][0] and candidate[2] == runs[-1][-1][2] + 1:
+                runs[-1].append(candidate)
+            elif not runs or candidate[0] != runs[-1][-1][0]:
+                runs.append([candidate])
+        return {(block, line) for run in runs if len(run) >= MIN_PAGE_RUN for block, line, _ in run}
+
+    def _collapse_cells(self, row: str) -> str:
+        """Drop consecutive repeats of a table cell (merged cells)"""
+        cells: List[str] = []
+        for cell in row.split(" | "):
+            if not cells or cell.casefold() != cells[-1].casefold():
+                cells.append(cell)
+        return " | ".join(cells)
+
+    def _fit(self, text: str, max_chars: int) -> str:
+        """Trim the longest paragraphs so the text fits in max_chars"""
+        paragraphs = text.split("\n\n")
+        # Separators and truncation marks are paid for up front
+        budget = max_chars - 2 * (len(paragraphs) - 1) - len(TRUNCATION_MARK) * len(paragraphs)
+        if budget <= 0:
+            return self._trim(text, max_chars - len(TRUNCATION_MARK))
+
+        # Largest per-paragraph cap for which all paragraphs fit the budget
+        lengths = sorted(len(paragraph) for paragraph in paragraphs)
+        cap = lengths[-1]
+        remaining = budget
+        for index, length in enumerate(lengths):
+            share = remaining // (len(lengths) - index)
+            if length > share:
+                cap = share
+                break
+            remaining -= length
+
+        return "\n\n".join(
+            paragraph if len(paragraph) <= cap else self._trim(paragraph, cap) for paragraph in paragraphs
+        )
+
+    def _trim(self, paragraph: str, limit: int) -> str:
+        if limit <= 0:
+            return TRUNCATION_MARK.strip()
+        cut = paragraph[:limit]
+        # Prefer ending on a word boundary unless that would discard most of the kept text
+        boundary = cut.rfind(" ")
+        if boundary > limit // 2:
+            cut = cut[:boundary]
+        return cut.rstrip() + TRUNCATION_MARK
+
+
+def split_sections(text: str, max_tokens: int) -> List[str]:
+    """
+    Split text into consecutive chunks of at most max_tokens estimated tokens
+
+    Paragraphs are packed greedily in document order and only split
+    (at line, then word boundaries) when a single paragraph exceeds the
+    chunk size, so chunks follow the document's own structure.
+
+    Args:
+        text: Text to split
+        max_tokens: Estimated tokens per chunk
+
+    Returns:
+        Chunks in document order
+    """
+    max_chars = max(1, max_tokens * CHARS_PER_TOKEN)
+    pieces: List[str] = []
+    for paragraph in text.split("\n\n"):
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for line in paragraph.split("\n"):
+            while len(line) > max_chars:
+                cut = line.rfind(" ", 0, max_chars)
+                cut = cut if cut > max_chars // 2 else max_chars
+                pieces.append(line[:cut])
+                line = line[cut:].lstrip()
+            pieces.append(line)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for piece in pieces:
+        if current and size + 2 + len(piece) > max_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece) + (2 if size else 0)
+    if current:
+        chunks.append("\n\n".join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
@@ -0,0 +1,130 @@
+"""
+Choice between local text extraction and direct document upload for brief files
+"""
+import re
+from typing import List, Optional
+
+from app.config import Config
+from app.services.model_backend import ContentPart
+from app.services.model_executor import ModelExecutor
+from app.utils.file_extractor import FileExtractor, PDF_TYPE, UnreadableDocumentError
+from app.utils.metrics import metrics
+
+# Page objects in an uncompressed PDF cross-reference ("/Type /Pages" is the page tree, not a page)
+_PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+
+
+def count_pdf_pages(file_content: bytes) -> int:
+    """
+    Approximate page count of a PDF without parsing it
+
+    Returns:
+        The number of page objects, or 0 if they are not visible (e.g.
+        stored in compressed object streams)
+    """
+    return len(_PAGE_OBJECT.findall(file_content))
+
+
+class BriefInput:
+    """A brief ready for analysis: extracted text, or the original document for the model to read"""
+
+    def __init__(self, text: Optional[str] = None, document: Optional[ContentPart] = None, pages: int = 0):
+        self.text = text
+        self.document = document
+        self.pages = pages
+
+    @property
+    def mode(self) -> str:
+        return "document" if self.document is not None else "text"
+
+
+class BriefIngestionPolicy:
+    """
+    Decides how an uploaded brief reaches the model.
+
+    Text-based briefs are extracted locally, which is cheaper in tokens
+    and cached. Scanned or image-heavy PDFs yield little or no text, so
+    they are sent to the model as the original PDF instead, which reads
+    the pages itself:
+
+    - PDFs whose size per page is at least `direct_bytes_per_page` are
+      uploaded without extracting at all (page objects are counted
+      straight from the bytes);
+    - PDFs whose extracted text has fewer than `min_chars_per_page`
+      characters per page, or that cannot be parsed, fall back to upload.
+      Exceeding the extraction page or time budget, or a failure of the
+      extraction pool itself, is not a parse error and is raised as-is.
+
+    Upload is only used up to `direct_max_bytes` (the model's inline
+    request limit); larger files and other formats always use extraction.
+    """
+
+    def __init__(
+        self,
+        extractor: FileExtractor,
+        executor: ModelExecutor,
+        enabled: bool = Config.BRIEF_DIRECT_UPLOAD_ENABLED,
+        direct_max_bytes: int = Config.BRIEF_DIRECT_UPLOAD_MAX_BYTES,
+        direct_bytes_per_page: int = Config.BRIEF_DIRECT_BYTES_PER_PAGE,
+        min_chars_per_page: int = Config.BRIEF_MIN_CHARS_PER_PAGE
+    ):
+        """
+        Args:
+            extractor: Extractor for local text extraction
+            executor: Model executor whose IO pool counts PDF pages
+            enabled: When False, every file is extracted locally
+            direct_max_bytes: Largest file sent to the model as a document
+            direct_bytes_per_page: Size per page from which a PDF is uploaded without extraction
+            min_chars_per_page: Extracted characters per page below which a PDF is uploaded instead
+        """
+        self.extractor = extractor
+        self.executor = executor
+        self.enabled = enabled
+        self.direct_max_bytes = direct_max_bytes
+        self.direct_bytes_per_page = direct_bytes_per_page
+        self.min_chars_per_page = min_chars_per_page
+
+    @property
+    def supported_types(self) -> List[str]:
+        """MIME types accepted for brief files"""
+        return self.extractor.supported_types
+
+    def _direct(self, file_content: bytes, pages: int, reason: str) -> BriefInput:
+        metrics.increment("brief_ingestion_total", mode="document", reason=reason)
+        return BriefInput(document=ContentPart(data=file_content, mime_type=PDF_TYPE), pages=pages)
+
+    async def ingest(self, file_content: bytes, content_type: str) -> BriefInput:
+        """
+        Prepare an uploaded brief for analysis
+
+        Args:
+            file_content: File content as bytes
+            content_type: MIME type of the file
+
+        Returns:
+            BriefInput with either the extracted text or the document to upload
+
+        Raises:
+            ValueError: If the file is not supported, cannot be read either way, or exceeds the
+                extraction page or time budget (ExtractionLimitExceeded)
+        """
+        uploadable = self.enabled and content_type == PDF_TYPE and len(file_content) <= self.direct_max_bytes
+
+        pages = await self.executor.run_blocking(ModelExecutor.IO, count_pdf_pages, file_content) if uploadable else 0
+        if pages and len(file_content) / pages >= self.direct_bytes_per_page:
+            return self._direct(file_content, pages, "bytes_per_page")
+
+        try:
+            extracted = await self.extractor.extract_document(file_content, content_type)
+        except UnreadableDocumentError:
+            if not uploadable:
+                raise
+            return self._direct(file_content, pages, "unparseable")
+
+        if uploadable:
+            pages = len(extracted.pages) or pages or 1
+            if len(extracted.text.strip()) / pages < self.min_chars_per_page:
+                return self._direct(file_content, pages, "sparse_text")
+
+        metrics.increment("brief_ingestion_total", mode="text", reason="extracted")
+        return BriefInput(text=extracted.text, pages=len(extracted.pages))
@@ -0,0 +1,113 @@
+"""
+Application-lifetime registry of reusable Google AI clients
+"""
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from vertexai.generative_models import GenerativeModel
+from google import genai
+import google.generativeai as genai_sdk
+
+from app.config import Config
+
+
+class ClientRegistry:
+    """
+    Shared pool of model and SDK clients, created once per process.
+
+    Building a GenerativeModel, a genai.Client or a storage.Client sets up
+    credentials and gRPC/HTTP channels, so services borrow them from here
+    instead of constructing their own on every request.
+    """
+
+    VERTEX_LOCATION = "us-central1"
+    GLOBAL_LOCATION = "global"  # Gemini 3 models are only served from the global endpoint
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vertex_models: Dict[str, GenerativeModel] = {}
+        self._genai_clients: Dict[str, genai.Client] = {}
+        self._api_key_models: Dict[Tuple[str, Tuple[Tuple[Any, Any], ...]], genai_sdk.GenerativeModel] = {}
+        self._storage_client = None
+        self._api_key_configured = False
+
+    def initialize(self):
+        """Configure process-wide SDK state once at startup"""
+        if Config.GEMINI_API_KEY and not self._api_key_configured:
+            genai_sdk.configure(api_key=Config.GEMINI_API_KEY)
+            self._api_key_configured = True
+
+    def vertex_model(self, model_name: str) -> GenerativeModel:
+        """Get the shared Vertex AI GenerativeModel for a model name"""
+        model = self._vertex_models.get(model_name)
+        if model is None:
+            with self._lock:
+                model = self._vertex_models.get(model_name)
+                if model is None:
+                    model = GenerativeModel(model_name)
+                    self._vertex_models[model_name] = model
+        return model
+
+    def genai_client(self, location: str = VERTEX_LOCATION) -> genai.Client:
+        """Get the shared Vertex-backed GenAI SDK client for a region"""
+        client = self._genai_clients.get(location)
+        if client is None:
+            with self._lock:
+                client = self._genai_clients.get(location)
+                if client is None:
+                    client = genai.Client(
+                        vertexai=True,
+                        project=Config.PROJECT_ID,
+                        location=location
+                    )
+                    self._genai_clients[location] = client
+        return client
+
+    def api_key_model(
+        self,
+        model_name: str,
+        safety_settings: Optional[Dict[Any, Any]] = None
+    ) -> genai_sdk.GenerativeModel:
+        """Get the shared API-key GenAI SDK model for a model name and safety profile"""
+        if not Config.GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY not configured. Please set GEMINI_API_KEY environment variable.")
+
+        key = (model_name, tuple(sorted((safety_settings or {}).items(), key=lambda item: str(item[0]))))
+        model = self._api_key_models.get(key)
+        if model is None:
+            with self._lock:
+                model = self._api_key_models.get(key)
+                if model is None:
+                    self.initialize()
+                    model = genai_sdk.GenerativeModel(model_name, safety_settings=safety_settings)
+                    self._api_key_models[key] = model
+        return model
+
+    def storage_client(self):
+        """Get the shared Cloud Storage client"""
+        if self._storage_client is None:
+            with self._lock:
+                if self._storage_client is None:
+                    from google.cloud import storage
+                    self._storage_client = storage.Client()
+        return self._storage_client
+
+    def close(self):
+        """Release pooled clients on shutdown"""
+        with self._lock:
+            for client in self._genai_clients.values():
+                close = getattr(client, "close", None)
+                if callable(close):
+                    try:
+                        close()
+                    except Exception as e:
+                        print(f"Error closing GenAI client: {str(e)}")
+            self._genai_clients.clear()
+            self._vertex_models.clear()
+            self._api_key_models.clear()
+
+            if self._storage_client is not None:
+                close = getattr(self._storage_client, "close", None)
+                if callable(close):
+                    close()
+                self._storage_client = None
@@ -0,0 +1,252 @@
+"""
+Server-side image editing sessions with an append-only version history
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.config import Config
+from app.services.asset_store import AssetStore
+from app.services.model_executor import ModelExecutor
+from app.utils.metrics import metrics
+
+
+class EditVersion:
+    """One image in a session's history and the edit that produced it"""
+
+    def __init__(
+        self,
+        number: int,
+        parent: Optional[int],
+        asset_id: str,
+        mime_type: str,
+        operation: str,
+        prompt: Optional[str] = None,
+        engine: Optional[str] = None
+    ):
+        self.number = number
+        self.parent = parent
+        self.asset_id = asset_id
+        self.mime_type = mime_type
+        self.operation = operation
+        self.prompt = prompt
+        self.engine = engine
+        self.created_at = time.time()
+
+
+class EditSession:
+    """An image being edited: its version chain and the version currently shown"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.versions: List[EditVersion] = []
+        self.head = 0
+        self.created_at = time.time()
+        self.last_used = time.monotonic()
+
+    def version(self, number: Optional[int] = None) -> EditVersion:
+        """A version by number (the head if None)
+
+        Raises:
+            KeyError: If the session has no such version
+        """
+        number = self.head if number is None else number
+        if not 0 <= number < len(self.versions):
+            raise KeyError(f"Version {number} does not exist")
+        return self.versions[number]
+
+
+class EditSessionManager:
+    """
+    Keeps editing sessions and their working images server-side.
+
+    Every version's image lives in the asset store, so a session's history
+    is a list of asset IDs and moving between versions (undo, redo or
+    branching from an older version) is a lookup. Recently used images are
+    also held in memory, in an LRU bounded by `max_bytes` across all
+    sessions, so consecutive edits skip the asset store; evicted images are
+    simply reloaded from it. Sessions idle for longer than `idle_timeout`
+    are dropped together with their cached images (the assets remain).
+    Every sweep touches the assets of live sessions, so the store's
+    garbage collection keeps them for as long as the session lives.
+    """
+
+    SWEEP_INTERVAL = 60
+
+    def __init__(
+        self,
+        assets: AssetStore,
+        executor: ModelExecutor,
+        idle_timeout: float = Config.EDIT_SESSION_IDLE_SECONDS,
+        max_bytes: int = Config.EDIT_SESSION_MAX_BYTES
+    ):
+        """
+        Args:
+            assets: Store holding every version's image
+            executor: Model executor whose IO pool runs asset store operations
+            idle_timeout: Seconds without use after which a session is dropped
+            max_bytes: Memory budget for cached working images across all sessions
+        """
+        self.assets = assets
+        self.executor = executor
+        self.idle_timeout = idle_timeout
+        self.max_bytes = max_bytes
+        self._sessions: Dict[str, EditSession] = {}
+        self._images: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()  # asset ID -> (data, mime type)
+        self._cached_bytes = 0
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the idle-session sweep loop"""
+        self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def shutdown(self):
+        """Stop the sweep loop"""
+        if self._sweeper:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+
+    async def create(self, image_data: bytes, mime_type: str) -> EditSession:
+        """
+        Start a session from an image
+
+        Args:
+            image_data: Image bytes
+            mime_type: MIME type of the image
+
+        Returns:
+            The new session, with the image as version 0
+        """
+        asset = await self.executor.run_blocking(ModelExecutor.IO, self.assets.put_bytes, image_data, mime_type)
+        session = EditSession()
+        session.versions.append(EditVersion(0, None, asset.asset_id, mime_type, "original"))
+        self._sessions[session.id] = session
+        self._cache(asset.asset_id, image_data, mime_type)
+        metrics.increment("edit_sessions_created_total")
+        self._publish()
+        return session
+
+    def get(self, session_id: str) -> Optional[EditSession]:
+        """A live session by ID (marks it as used), or None"""
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.last_used = time.monotonic()
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        """Drop a session; returns whether it existed"""
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        self._forget(session)
+        self._publish()
+        return True
+
+    async def image(self, session: EditSession, number: Optional[int] = None) -> Tuple[EditVersion, bytes]:
+        """
+        Load the image of a version, from memory when possible
+
+        Raises:
+            KeyError: If the version does not exist or its asset is gone
+        """
+        version = session.version(number)
+        cached = self._images.get(version.asset_id)
+        if cached is not None:
+            self._images.move_to_end(version.asset_id)
+            metrics.increment("edit_session_image_loads_total", source="memory")
+            return version, cached[0]
+
+        loaded = await self.executor.run_blocking(ModelExecutor.IO, self.assets.get_bytes, version.asset_id)
+        if loaded is None:
+            raise KeyError(f"Image of version {version.number} is no longer available")
+        metrics.increment("edit_session_image_loads_total", source="asset_store")
+        self._cache(version.asset_id, loaded[0], version.mime_type)
+        return version, loaded[0]
+
+    async def add_version(
+        self,
+        session: EditSession,
+        parent: int,
+        image_data: bytes,
+        mime_type: str,
+        operation: str,
+        prompt: str,
+        engine: str
+    ) -> EditVersion:
+        """
+        Append an edited image to a session and make it the head
+
+        Versions are never rewritten: editing an older version starts a new
+        branch whose parent is that version.
+
+        Returns:
+            The new version
+        """
+        asset = await self.executor.run_blocking(ModelExecutor.IO, self.assets.put_bytes, image_data, mime_type)
+        version = EditVersion(len(session.versions), parent, asset.asset_id, mime_type, operation, prompt, engine)
+        session.versions.append(version)
+        session.head = version.number
+        session.last_used = time.monotonic()
+        self._cache(asset.asset_id, image_data, mime_type)
+        metrics.increment("edit_session_versions_total", operation=operation)
+        return version
+
+    def checkout(self, session: EditSession, number: int) -> EditVersion:
+        """
+        Move the head to an existing version (undo, redo or switching branches)
+
+        Raises:
+            KeyError: If the version does not exist
+        """
+        version = session.version(number)
+        session.head = version.number
+        return version
+
+    def _cache(self, asset_id: str, data: bytes, mime_type: str):
+        if len(data) > self.max_bytes:
+            return
+        previous = self._images.pop(asset_id, None)
+        if previous is not None:
+            self._cached_bytes -= len(previous[0])
+        self._images[asset_id] = (data, mime_type)
+        self._cached_bytes += len(data)
+        while self._cached_bytes > self.max_bytes:
+            _, (evicted, _) = self._images.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+            metrics.increment("edit_session_image_evictions_total", reason="memory")
+        self._publish()
+
+    def _forget(self, session: EditSession):
+        """Drop cached images only this session refers to"""
+        in_use = {version.asset_id for other in self._sessions.values() for version in other.versions}
+        for version in session.versions:
+            if version.asset_id not in in_use:
+                cached = self._images.pop(version.asset_id, None)
+                if cached is not None:
+                    self._cached_bytes -= len(cached[0])
+
+    def _publish(self):
+        metrics.set_gauge("edit_sessions_active", len(self._sessions))
+        metrics.set_gauge("edit_session_cache_bytes", self._cached_bytes)
+
+    def sweep(self):
+        """Drop sessions idle for longer than the idle timeout"""
+        cutoff = time.monotonic() - self.idle_timeout
+        for session_id, session in list(self._sessions.items()):
+            if session.last_used < cutoff:
+                del self._sessions[session_id]
+                self._forget(session)
+                metrics.increment("edit_sessions_expired_total")
+        self._publish()
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(min(self.SWEEP_INTERVAL, self.idle_timeout))
+            self.sweep()
+            in_use = {version.asset_id for session in self._sessions.values() for version in session.versions}
+            try:
+                await self.executor.run_blocking(ModelExecutor.IO, self.assets.touch, in_use)
+            except Exception as e:
+                print(f"Touching edit session assets failed: {e}")
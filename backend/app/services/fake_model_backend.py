@@ -0,0 +1,396 @@
+"""
+In-process stand-in model backend for load testing and profiling without credentials
+"""
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import re
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from PIL import Image as PILImage
+
+from app.config import Config
+from app.services.model_backend import (
+    ContentPart,
+    Contents,
+    InlineData,
+    ModelBackend,
+    ModelResponse,
+    VideoOperation,
+)
+from app.services.model_scheduler import estimate_tokens
+
+
+class FakeModelError(Exception):
+    """Injected model error carrying an HTTP-style status code (e.g. 429, 503)"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class LatencyProfile:
+    """Log-normal latency distribution plus an injected error rate for one task"""
+
+    def __init__(
+        self,
+        median: float = 0.05,
+        p95: float = 0.2,
+        error_rate: float = 0.0,
+        error_codes: Tuple[int, ...] = (429, 503)
+    ):
+        self.median = median
+        self.p95 = max(p95, median)
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], base: Optional["LatencyProfile"] = None) -> "LatencyProfile":
+        base = base or cls()
+        return cls(
+            median=float(data.get("latency_median", base.median)),
+            p95=float(data.get("latency_p95", base.p95)),
+            error_rate=float(data.get("error_rate", base.error_rate)),
+            error_codes=tuple(data.get("error_codes", base.error_codes))
+        )
+
+    def sample_latency(self, rng: random.Random) -> float:
+        if self.median <= 0:
+            return 0.0
+        # p95 of a log-normal sits 1.645 sigma above the median in log space
+        sigma = math.log(self.p95 / self.median) / 1.645 if self.p95 > self.median else 0.0
+        return rng.lognormvariate(math.log(self.median), sigma)
+
+
+class FakeBackendProfile:
+    """
+    Latency, error and payload-size settings for the fake backend.
+
+    Example FAKE_BACKEND_PROFILE (inline JSON or path to a JSON file):
+        {
+            "default": {"latency_median": 0.05, "latency_p95": 0.2, "error_rate": 0.0},
+            "tasks": {
+                "brief_analysis": {"latency_median": 8, "latency_p95": 25, "error_rate": 0.02},
+                "image_generation": {"latency_median": 6, "latency_p95": 12}
+            },
+            "image_size": 1024,
+            "video_bytes": 2000000,
+            "video_seconds": 45,
+            "text_padding_chars": 0,
+            "stream_chunk_chars": 64,
+            "seed": 42
+        }
+    """
+
+    def __init__(
+        self,
+        default: Optional[LatencyProfile] = None,
+        tasks: Optional[Dict[str, LatencyProfile]] = None,
+        image_size: int = 1024,
+        video_bytes: int = 1_000_000,
+        video_seconds: float = 30.0,
+        text_padding_chars: int = 0,
+        stream_chunk_chars: int = 64,
+        seed: Optional[int] = None
+    ):
+        self.default = default or LatencyProfile()
+        self.tasks = tasks or {}
+        self.image_size = image_size
+        self.video_bytes = video_bytes
+        self.video_seconds = video_seconds
+        self.text_padding_chars = text_padding_chars
+        self.stream_chunk_chars = stream_chunk_chars
+        self.seed = seed
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FakeBackendProfile":
+        default = LatencyProfile.from_dict(data.get("default", {}))
+        return cls(
+            default=default,
+            tasks={
+                task: LatencyProfile.from_dict(settings, base=default)
+                for task, settings in data.get("tasks", {}).items()
+            },
+            image_size=int(data.get("image_size", 1024)),
+            video_bytes=int(data.get("video_bytes", 1_000_000)),
+            video_seconds=float(data.get("video_seconds", 30.0)),
+            text_padding_chars=int(data.get("text_padding_chars", 0)),
+            stream_chunk_chars=int(data.get("stream_chunk_chars", 64)),
+            seed=data.get("seed")
+        )
+
+    @classmethod
+    def from_config(cls) -> "FakeBackendProfile":
+        """Load the profile from FAKE_BACKEND_PROFILE (inline JSON or a file path)"""
+        raw = Config.FAKE_BACKEND_PROFILE.strip()
+        if not raw:
+            return cls()
+        if not raw.startswith("{"):
+            with open(raw, "r", encoding="utf-8") as f:
+                raw = f.read()
+        return cls.from_dict(json.loads(raw))
+
+    def for_task(self, task: str) -> LatencyProfile:
+        return self.tasks.get(task, self.default)
+
+
+class FakeModelBackend(ModelBackend):
+    """
+    Returns schema-valid payloads for every task the services issue,
+    after a sampled delay and with optional injected errors.
+    """
+
+    name = "fake"
+
+    def __init__(self, profile: FakeBackendProfile):
+        self.profile = profile
+        self.rng = random.Random(profile.seed)
+        self._png_cache: Dict[int, bytes] = {}
+        self._video_payload: Optional[bytes] = None
+
+    def _maybe_fail(self, task: str):
+        """Raise an injected error at the task's configured rate"""
+        latency_profile = self.profile.for_task(task)
+        if latency_profile.error_rate and self.rng.random() < latency_profile.error_rate:
+            code = self.rng.choice(latency_profile.error_codes)
+            raise FakeModelError(code, f"Injected {code} error for {task}")
+
+    async def _simulate(self, task: str):
+        """Sleep for a sampled latency and maybe raise an injected error"""
+        await asyncio.sleep(self.profile.for_task(task).sample_latency(self.rng))
+        self._maybe_fail(task)
+
+    def _padding(self) -> str:
+        return " " + "x" * self.profile.text_padding_chars if self.profile.text_padding_chars else ""
+
+    def _png(self) -> bytes:
+        size = self.profile.image_size
+        if size not in self._png_cache:
+            image = PILImage.new("RGB", (size, size))
+            pixels = image.load()
+            step = max(1, size // 64)
+            for x in range(0, size, step):
+                for y in range(0, size, step):
+                    pixels[x, y] = (x * 255 // size, y * 255 // size, 128)
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG")
+            self._png_cache[size] = buffer.getvalue()
+        return self._png_cache[size]
+
+    def _video(self) -> bytes:
+        if self._video_payload is None or len(self._video_payload) != self.profile.video_bytes:
+            header = b"\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom"
+            self._video_payload = header + os.urandom(max(0, self.profile.video_bytes - len(header)))
+        return self._video_payload
+
+    @staticmethod
+    def _prompt_text(contents: Contents) -> str:
+        parts = contents if isinstance(contents, (list, tuple)) else [contents]
+        return "\n".join(part for part in parts if isinstance(part, str))
+
+    @staticmethod
+    def _field(value: Any, source: str = "generated") -> Dict[str, Any]:
+        return {"value": value, "source": source}
+
+    def _brief_chunk(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "brand_name": {"value": "Fake Brand"},
+            "key_message": {"value": "Synthetic key message from one brief section"},
+            "channels": {"value": ["Instagram"]},
+        }
+
+    def _brief_analysis(self, prompt: str) -> Dict[str, Any]:
+        field = self._field
+        return {
+            "brand_name": field("Fake Brand", "extracted"),
+            "campaign_title": field("Fake Campaign", "extracted"),
+            "brief_summary": field("Synthetic brief summary produced by the fake backend." + self._padding()),
+            "project_objectives": {
+                "business_objective": field("Drive product trial"),
+                "marketing_objective": field("Grow social engagement"),
+                "communication_objective": field("Position the product as a seasonal treat"),
+                "key_metrics": field(["Reach", "Engagement", "CTR"]),
+                "key_indicators": field(["Engagement Rate", "Video Views"]),
+            },
+            "target_audience": {
+                "demographics": field("Ages 18-34, urban"),
+                "psychographics": field("Health-conscious, social-first"),
+                "needs_problems": field("Wants fun, healthy snacks"),
+                "decision_behaviour": field("Influencer-driven"),
+            },
+            "key_message": field("Get fit, have fun"),
+            "visual_style": field("Bold, playful, high contrast"),
+            "channels": field(["Instagram", "YouTube"]),
+            "usp": field("Limited edition flavour"),
+        }
+
+    @staticmethod
+    def _grab(prompt: str, label: str, default: str) -> str:
+        """Read a 'Label: value' line from the prompt"""
+        match = re.search(rf"^{label}:\s*(.+)$", prompt, re.MULTILINE)
+        return match.group(1).strip() if match else default
+
+    def _translated_copy(self, prompt: str, language: str) -> Dict[str, str]:
+        return {
+            "headline": f"[{language}] {self._grab(prompt, 'Headline', 'Headline')}",
+            "body_text": f"[{language}] {self._grab(prompt, 'Body Text', 'Body')}{self._padding()}",
+            "call_to_action": f"[{language}] {self._grab(prompt, 'Call to Action', 'CTA')}",
+        }
+
+    def _translation(self, prompt: str) -> Dict[str, Any]:
+        language = self._grab(prompt, "Target Language", "Target")
+        return {
+            "translated_copy": self._translated_copy(prompt, language),
+            "translated_to": language,
+        }
+
+    def _batch_translation(self, prompt: str) -> Dict[str, Any]:
+        languages = self._grab(prompt, "Target Languages", "Target").split(",")
+        return {
+            "translations": [
+                {"translated_to": language.strip(), "translated_copy": self._translated_copy(prompt, language.strip())}
+                for language in languages
+            ]
+        }
+
+    def _segment_translation(self, prompt: str) -> Dict[str, Any]:
+        segments = dict(re.findall(r"^\[(\d+)\] (.*)$", prompt, re.MULTILINE))
+        section = prompt.split("Segments to translate per target language:", 1)[-1].split("\n\n", 1)[0]
+        translations = []
+        for language, ids in re.findall(r"^(.+?): ([\d, ]+)$", section.strip(), re.MULTILINE):
+            translations.append({
+                "translated_to": language.strip(),
+                "segments": [
+                    {"id": int(i), "translation": f"[{language.strip()}] {segments.get(i.strip(), '')}"}
+                    for i in ids.split(",") if i.strip()
+                ],
+            })
+        return {"translations": translations}
+
+    def _scores(self) -> Dict[str, Any]:
+        return {
+            name: round(self.rng.uniform(5.0, 9.5), 1)
+            for name in ("conversion_score", "retention_score", "traffic_score", "engagement_score")
+        }
+
+    def _copy_variations(self, prompt: str) -> Any:
+        match = re.search(r"Generate (\d+) different", prompt)
+        count = int(match.group(1)) if match else 3
+        return [
+            {
+                "headline": f"Fake headline {i + 1}",
+                "body_text": f"Fake body text for variation {i + 1}.{self._padding()}",
+                "call_to_action": "Shop now",
+            }
+            for i in range(count)
+        ]
+
+    async def generate_content(
+        self,
+        model_name: str,
+        contents: Contents,
+        *,
+        temperature: Optional[float] = None,
+        response_mime_type: Optional[str] = None,
+        relaxed_safety: bool = False,
+        task: str = "generic"
+    ) -> ModelResponse:
+        await self._simulate(task)
+        return self._response(contents, task)
+
+    def _response(self, contents: Contents, task: str) -> ModelResponse:
+        """Build the canned response for a task"""
+        prompt = self._prompt_text(contents)
+
+        images = []
+        payload: Any = {}
+        if task == "brief_analysis":
+            payload = self._brief_analysis(prompt)
+        elif task == "brief_chunk_extraction":
+            payload = self._brief_chunk(prompt)
+        elif task == "translation":
+            payload = self._translation(prompt)
+        elif task == "batch_translation":
+            payload = self._batch_translation(prompt)
+        elif task == "segment_translation":
+            payload = self._segment_translation(prompt)
+        elif task == "evaluation":
+            payload = self._scores()
+        elif task == "creative_prompts":
+            payload = {
+                "image_prompt": "Fake image prompt",
+                "copy_prompt": "Fake copy prompt",
+                "video_prompt": "Fake video prompt",
+            }
+        elif task == "copy_generation":
+            payload = self._copy_variations(prompt)
+        elif task in ("image_generation", "image_edit"):
+            images = [InlineData(self._png(), "image/png")]
+            payload = None
+
+        text = json.dumps(payload) if payload is not None else None
+        return ModelResponse(
+            text=text,
+            images=images,
+            finish_reason="STOP",
+            usage_tokens=estimate_tokens(contents) + (len(text) // 4 if text else 0)
+        )
+
+    async def stream_content(
+        self,
+        model_name: str,
+        contents: Contents,
+        *,
+        temperature: Optional[float] = None,
+        response_mime_type: Optional[str] = None,
+        task: str = "generic"
+    ) -> AsyncIterator[ModelResponse]:
+        # The sampled latency is spread evenly over the chunks, so the first
+        # chunk arrives after a fraction of the full-response latency
+        response = self._response(contents, task)
+        text = response.text or ""
+        size = max(1, self.profile.stream_chunk_chars)
+        chunks = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+        interval = self.profile.for_task(task).sample_latency(self.rng) / len(chunks)
+
+        for index, chunk in enumerate(chunks):
+            await asyncio.sleep(interval)
+            if index == 0:
+                self._maybe_fail(task)
+            last = index == len(chunks) - 1
+            yield ModelResponse(
+                text=chunk,
+                finish_reason="STOP" if last else None,
+                usage_tokens=response.usage_tokens if last else None
+            )
+
+    async def start_video(
+        self,
+        model_name: str,
+        prompt: str,
+        image: Optional[ContentPart] = None,
+        aspect_ratio: str = "16:9",
+        duration_seconds: Optional[int] = None
+    ) -> VideoOperation:
+        await self._simulate("video_submit")
+        ready_at = time.monotonic() + self.profile.video_seconds
+        return VideoOperation(name=f"fake-operations/{uuid.uuid4().hex}", raw={"ready_at": ready_at})
+
+    async def get_video_operation(self, operation: VideoOperation) -> VideoOperation:
+        await self._simulate("video_status")
+        if time.monotonic() < operation.raw["ready_at"]:
+            return VideoOperation(name=operation.name, raw=operation.raw)
+        return VideoOperation(
+            name=operation.name,
+            done=True,
+            video_bytes=self._video(),
+            raw=operation.raw
+        )
+
+    def signed_url(self, uri: str, expiration_seconds: int = 3600) -> str:
+        return uri
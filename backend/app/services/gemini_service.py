@@ -1,34 +1,222 @@
 """
 Gemini AI service for creative brief analysis
 """
+import asyncio
+import hashlib
 import json
-from typing import Dict, Any
-from vertexai.generative_models import GenerativeModel
+import re
+import time
+import unicodedata
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
+from app.config import Config
 from app.prompts import PromptLoader
+from app.services.brief_compactor import BriefCompactor, split_sections
+from app.services.model_backend import ContentPart, ModelBackend
+from app.services.model_executor import ModelExecutor
+from app.services.model_scheduler import estimate_tokens
 from app.models.brief_models import BriefAnalysisResponse
+from app.utils.json_stream import JsonStreamParser, format_path
+from app.utils.metrics import metrics
+from app.utils.response_cache import ResponseCache
+
+# Stand-in for the brief text when the brief is attached as a document
+ATTACHED_BRIEF = "(The creative brief is the attached document. Read all of its pages, including text in images.)"
+
+# Input tokens the model bills per document page
+DOCUMENT_PAGE_TOKENS = 258
+
+# Share of max_chunks * chunk_tokens a long brief is compacted to, so paragraph packing still fits it in max_chunks
+CHUNK_PACKING_SLACK = 0.9
 
 
 class GeminiService:
-    """Service for interacting with Gemini AI models for brief analysis"""
+    """
+    Service for interacting with Gemini AI models for brief analysis
+
+    Briefs longer than `chunked_threshold_tokens` are analyzed map-reduce
+    style: the text is split into chunks of `chunk_tokens`, the fields
+    each chunk states are extracted concurrently on the faster chunk
+    model, and one call on the analysis model merges the partial results,
+    reconciles conflicts, sets the source flags and generates what no
+    chunk provides. Wall-clock time then follows the largest chunk plus a
+    merge over small JSON inputs, instead of the whole document. If a
+    chunk fails, the merge goes ahead without it, but that analysis is
+    not cached (counted in brief_partial_analyses_total).
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        backend: ModelBackend,
+        executor: ModelExecutor,
+        cache: Optional[ResponseCache] = None,
+        compactor: Optional[BriefCompactor] = None,
+        chunked_threshold_tokens: int = Config.BRIEF_CHUNKED_THRESHOLD_TOKENS,
+        chunk_tokens: int = Config.BRIEF_CHUNK_TOKENS,
+        max_chunks: int = Config.BRIEF_MAX_CHUNKS,
+        chunk_model_name: str = Config.BRIEF_CHUNK_MODEL
+    ):
         self.model_name = 'gemini-2.5-pro'
-        self.model = None
+        self.backend = backend
+        self.executor = executor
+        self.cache = cache
+        self.compactor = compactor
+        self.chunked_threshold_tokens = chunked_threshold_tokens
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.max_chunks = max(1, max_chunks)
+        self.chunk_model_name = chunk_model_name
+
+    async def _compact(self, brief_text: Optional[str], document: Optional[ContentPart]) -> Optional[str]:
+        """Compact brief text before it is keyed and placed in the prompt (documents go to the model as-is)"""
+        if self.compactor is None or document is not None or not brief_text:
+            return brief_text
+        # With chunked analysis available, long briefs may keep up to max_chunks chunks of text. The
+        # slack covers what greedy paragraph packing leaves unused at the end of each chunk
+        budget = int(self.chunk_tokens * self.max_chunks * CHUNK_PACKING_SLACK) if self.chunked_threshold_tokens else None
+        return await self.executor.run_blocking(ModelExecutor.IO, self.compactor.compact, brief_text, budget)
+
+    def _is_chunked(self, brief_text: Optional[str], document: Optional[ContentPart]) -> bool:
+        return (
+            document is None
+            and bool(self.chunked_threshold_tokens)
+            and estimate_tokens(brief_text) > self.chunked_threshold_tokens
+        )
+
+    def _cache_key(self, brief_text: Optional[str], document: Optional[ContentPart] = None) -> str:
+        """Key an analysis by normalized brief text (or document hash), prompt template versions and models"""
+        if document is not None:
+            content = "document:" + hashlib.sha256(document.data).hexdigest()
+        else:
+            content = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", brief_text)).strip()
+        parts = [content, PromptLoader.version("brief_analysis"), self.model_name]
+        if self._is_chunked(brief_text, document):
+            parts += [
+                PromptLoader.version("brief_chunk_extraction"),
+                PromptLoader.version("brief_merge"),
+                self.chunk_model_name,
+                str(self.chunk_tokens)
+            ]
+        return ResponseCache.make_key(*parts)
+
+    async def _brief_request(
+        self,
+        brief_text: Optional[str],
+        document: Optional[ContentPart],
+        document_pages: int
+    ) -> Tuple[Union[str, List[Union[str, ContentPart]]], int, bool]:
+        """
+        Prompt contents and estimated input tokens of an analysis of text or an attached document
+
+        For long briefs this runs the map step of chunked analysis and
+        returns the merge prompt.
+
+        Returns:
+            (contents, estimated tokens, whether every part of the brief made it into the prompt)
+        """
+        if document is not None:
+            prompt = PromptLoader.load("brief_analysis", brief_text=ATTACHED_BRIEF)
+            return [document, prompt], estimate_tokens(prompt) + DOCUMENT_PAGE_TOKENS * max(1, document_pages), True
+        if self._is_chunked(brief_text, document):
+            partials, section_count = await self._extract_chunks(brief_text)
+            prompt = PromptLoader.load(
+                "brief_merge",
+                section_count=section_count,
+                partials=json.dumps(partials, ensure_ascii=False, indent=1)
+            )
+            complete = len(partials) == section_count
+            if not complete:
+                metrics.increment("brief_partial_analyses_total")
+            return prompt, estimate_tokens(prompt), complete
+        prompt = PromptLoader.load("brief_analysis", brief_text=brief_text)
+        return prompt, estimate_tokens(prompt), True
+
+    async def _extract_chunks(self, brief_text: str) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Map step: extract the fields each chunk of a long brief states, all chunks concurrently
+
+        The whole brief is always covered: if it splits into more than
+        max_chunks chunks, the chunk size grows until it fits.
+
+        Returns:
+            ([{"section": n, "fields": {...}}] in document order for the chunks that
+            succeeded, total number of chunks)
+
+        Raises:
+            ValueError: If no chunk could be analyzed
+        """
+        chunk_tokens = self.chunk_tokens
+        chunks = split_sections(brief_text, chunk_tokens)
+        while len(chunks) > self.max_chunks:
+            chunk_tokens = int(chunk_tokens * 1.25) + 1
+            chunks = split_sections(brief_text, chunk_tokens)
+        started = time.monotonic()
+
+        def parse(response: Any) -> Dict[str, Any]:
+            fields = json.loads(response.text)
+            if not isinstance(fields, dict):
+                raise ValueError("Chunk extraction did not return a JSON object")
+            return fields
+
+        async def extract(number: int, chunk: str) -> Dict[str, Any]:
+            prompt = PromptLoader.load(
+                "brief_chunk_extraction", section_number=number, section_count=len(chunks), brief_text=chunk
+            )
+            return await self.executor.call_model(
+                self.chunk_model_name,
+                lambda: self.backend.generate_content(
+                    self.chunk_model_name,
+                    prompt,
+                    response_mime_type="application/json",
+                    task="brief_chunk_extraction"
+                ),
+                estimated_tokens=estimate_tokens(prompt),
+                parse=parse,
+                hedge=True
+            )
+
+        results = await asyncio.gather(
+            *(extract(number, chunk) for number, chunk in enumerate(chunks, start=1)), return_exceptions=True
+        )
+        partials = []
+        for number, result in enumerate(results, start=1):
+            if isinstance(result, BaseException):
+                # A lost chunk degrades the analysis (its fields may be generated instead) but does not fail it
+                metrics.increment("brief_chunks_total", result="error")
+                continue
+            metrics.increment("brief_chunks_total", result="ok")
+            partials.append({"section": number, "fields": result})
+
+        metrics.increment("brief_chunked_analyses_total")
+        metrics.observe("brief_chunk_map_seconds", time.monotonic() - started)
+        if not partials:
+            raise ValueError(f"None of the {len(chunks)} brief sections could be analyzed")
+        return partials, len(chunks)
 
-    def _get_model(self) -> GenerativeModel:
-        """Lazy load the model when needed"""
-        if self.model is None:
-            self.model = GenerativeModel(self.model_name)
-        return self.model
+    async def _cached_analysis(self, key: str, refresh: bool) -> Optional[Dict[str, Any]]:
+        """Look up a cached analysis unless caching is off or a refresh was requested"""
+        if self.cache is None or refresh:
+            return None
+        return await self.executor.run_blocking(ModelExecutor.IO, self.cache.get, key)
 
+    async def _store_analysis(self, key: str, analysis: Dict[str, Any]):
+        if self.cache is not None:
+            await self.executor.run_blocking(ModelExecutor.IO, self.cache.set, key, analysis)
 
-    async def analyze_creative_brief(self, brief_text: str) -> Dict[str, Any]:
+    async def analyze_creative_brief(
+        self,
+        brief_text: Optional[str],
+        refresh: bool = False,
+        document: Optional[ContentPart] = None,
+        document_pages: int = 0
+    ) -> Dict[str, Any]:
         """
         Analyze creative brief and extract/generate structured information
 
         Args:
-            brief_text: The creative brief text content
+            brief_text: The creative brief text content (ignored when a document is given)
+            refresh: Bypass the response cache and re-run the analysis
+            document: The original brief file (PDF), for the model to read directly
+            document_pages: Page count of the document (for token estimation)
 
         Returns:
             Structured brief analysis with extracted and generated fields
@@ -36,28 +224,108 @@ class GeminiService:
         Raises:
             ValueError: If analysis fails
         """
-        # Load prompt template
-        prompt = PromptLoader.load("brief_analysis", brief_text=brief_text)
+        brief_text = await self._compact(brief_text, document)
+        cache_key = self._cache_key(brief_text, document)
+        cached = await self._cached_analysis(cache_key, refresh)
+        if cached is not None:
+            return cached
+
+        # Build the prompt (for long briefs this runs the chunk extraction first)
+        contents, estimated_tokens, complete = await self._brief_request(brief_text, document, document_pages)
 
         try:
-            model = self._get_model()
-
-            # Option 1: Let Gemini generate free-form JSON, then validate with Pydantic
-            response = model.generate_content(
-                prompt,
-                generation_config={
-                    "response_mime_type": "application/json"
-                }
+            # Option 1: Let Gemini generate free-form JSON, then validate with Pydantic.
+            # Parsing happens inside the call so malformed JSON is retried; the call is
+            # idempotent, so a slow attempt may be hedged (not for documents, whose
+            # page tokens would be paid twice).
+            validated_response = await self.executor.call_model(
+                self.model_name,
+                lambda: self.backend.generate_content(
+                    self.model_name,
+                    contents,
+                    response_mime_type="application/json",
+                    task="brief_analysis"
+                ),
+                estimated_tokens=estimated_tokens,
+                parse=lambda response: BriefAnalysisResponse.model_validate(json.loads(response.text)),
+                hedge=document is None
             )
 
-            # Parse and validate the response using Pydantic
-            raw_result = json.loads(response.text)
+            # Return as dict for the API response with proper JSON serialization
+            analysis = validated_response.model_dump(mode='json', by_alias=False)
 
-            # Validate and convert to our Pydantic model
-            validated_response = BriefAnalysisResponse.model_validate(raw_result)
+        except Exception as e:
+            raise ValueError(f"Error analyzing creative brief: {str(e)}")
 
-            # Return as dict for the API response with proper JSON serialization
-            return validated_response.model_dump(mode='json', by_alias=False)
+        if complete:
+            # An analysis missing failed sections is served once but not cached, so a retry can complete it
+            await self._store_analysis(cache_key, analysis)
+        return analysis
+
+    async def stream_creative_brief_analysis(
+        self,
+        brief_text: Optional[str],
+        refresh: bool = False,
+        document: Optional[ContentPart] = None,
+        document_pages: int = 0
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Analyze a creative brief, yielding each field as soon as the model has written it
+
+        Fields are top-level values such as brand_name and nested ones such
+        as target_audience.demographics, each a {"value", "source"} pair.
+
+        Args:
+            brief_text: The creative brief text content (ignored when a document is given)
+            refresh: Bypass the response cache and re-run the analysis
+            document: The original brief file (PDF), for the model to read directly
+            document_pages: Page count of the document (for token estimation)
+
+        Yields:
+            ("field", {"field": path, "value": {...}}) for every completed field, then
+            ("complete", analysis) with the fully validated BriefAnalysisResponse
+
+        Raises:
+            ValueError: If the stream fails or the final document does not validate
+        """
+        brief_text = await self._compact(brief_text, document)
+        cache_key = self._cache_key(brief_text, document)
+        cached = await self._cached_analysis(cache_key, refresh)
+        if cached is not None:
+            # Replay the cached document as the same sequence of events
+            parser = JsonStreamParser(max_depth=2)
+            for path, value in parser.feed(json.dumps(cached)):
+                if path and isinstance(value, dict) and "value" in value:
+                    yield "field", {"field": format_path(path), "value": value}
+            yield "complete", cached
+            return
+
+        contents, estimated_tokens, complete = await self._brief_request(brief_text, document, document_pages)
+        parser = JsonStreamParser(max_depth=2)
+
+        try:
+            chunks = self.executor.stream_model(
+                self.model_name,
+                lambda: self.backend.stream_content(
+                    self.model_name,
+                    contents,
+                    response_mime_type="application/json",
+                    task="brief_analysis"
+                ),
+                estimated_tokens=estimated_tokens
+            )
+            async for chunk in chunks:
+                for path, value in parser.feed(chunk.text or ""):
+                    # Only {"value", "source"} leaves are fields; skip their parents and members
+                    if path and isinstance(value, dict) and "value" in value:
+                        yield "field", {"field": format_path(path), "value": value}
+
+            validated_response = BriefAnalysisResponse.model_validate(parser.result())
 
         except Exception as e:
             raise ValueError(f"Error analyzing creative brief: {str(e)}")
+
+        analysis = validated_response.model_dump(mode='json', by_alias=False)
+        if complete:
+            await self._store_analysis(cache_key, analysis)
+        yield "complete", analysis
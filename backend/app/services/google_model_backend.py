@@ -0,0 +1,284 @@
+"""
+Model backend backed by Vertex AI and the Google GenAI SDKs
+"""
+from datetime import timedelta
+from typing import Any, AsyncIterator, List, Optional
+
+from vertexai.generative_models import Part
+from google import genai
+from google.genai.types import GenerateVideosConfig
+from google.generativeai.types import HarmCategory, HarmBlockThreshold
+
+from app.services.client_registry import ClientRegistry
+from app.services.model_backend import (
+    ContentPart,
+    Contents,
+    InlineData,
+    ModelBackend,
+    ModelResponse,
+    VideoOperation,
+)
+
+
+# Relaxed safety settings for stylistic image edits
+RELAXED_SAFETY_SETTINGS = {
+    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_ONLY_HIGH,
+    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_ONLY_HIGH,
+}
+
+
+def _enum_name(value: Any) -> Optional[str]:
+    """Render an SDK enum (proto enum, IntEnum or str) as its name"""
+    if value is None:
+        return None
+    return getattr(value, "name", None) or str(value)
+
+
+class GoogleModelBackend(ModelBackend):
+    """
+    Routes model calls to the right Google SDK and region.
+
+    - gemini-3* models: Vertex GenAI SDK client on the global endpoint
+    - *-image models: API-key GenAI SDK
+    - everything else: Vertex AI GenerativeModel in us-central1
+    """
+
+    name = "google"
+
+    def __init__(self, registry: ClientRegistry):
+        self.registry = registry
+
+    @staticmethod
+    def _as_list(contents: Contents) -> List[Any]:
+        if isinstance(contents, (list, tuple)):
+            return list(contents)
+        return [contents]
+
+    def _normalize(self, response: Any) -> ModelResponse:
+        """Convert any of the three SDK response types into a ModelResponse"""
+        try:
+            text = response.text
+        except Exception:
+            text = None  # Image-only or blocked responses have no text accessor
+
+        images: List[InlineData] = []
+        finish_reason = None
+        candidates = getattr(response, "candidates", None) or []
+        if candidates:
+            candidate = candidates[0]
+            finish_reason = _enum_name(getattr(candidate, "finish_reason", None))
+            content = getattr(candidate, "content", None)
+            for part in (getattr(content, "parts", None) or []):
+                inline_data = getattr(part, "inline_data", None)
+                if inline_data and getattr(inline_data, "data", None):
+                    images.append(InlineData(inline_data.data, inline_data.mime_type or "image/png"))
+
+        block_reason = None
+        block_reason_message = None
+        prompt_feedback = getattr(response, "prompt_feedback", None)
+        if prompt_feedback is not None:
+            reason = _enum_name(getattr(prompt_feedback, "block_reason", None))
+            if reason and reason not in ("0", "BLOCK_REASON_UNSPECIFIED", "BLOCKED_REASON_UNSPECIFIED"):
+                block_reason = reason
+                block_reason_message = getattr(prompt_feedback, "block_reason_message", None)
+
+        usage = getattr(response, "usage_metadata", None)
+        usage_tokens = getattr(usage, "total_token_count", None) if usage is not None else None
+
+        return ModelResponse(
+            text=text,
+            images=images,
+            finish_reason=finish_reason,
+            block_reason=block_reason,
+            block_reason_message=block_reason_message,
+            usage_tokens=usage_tokens or None,
+            raw=response
+        )
+
+    @staticmethod
+    def _generation_config(temperature: Optional[float], response_mime_type: Optional[str]) -> dict:
+        generation_config = {}
+        if temperature is not None:
+            generation_config["temperature"] = temperature
+        if response_mime_type:
+            generation_config["response_mime_type"] = response_mime_type
+        return generation_config
+
+    @staticmethod
+    def _genai_parts(parts: List[Any]) -> List[Any]:
+        return [
+            genai.types.Part.from_bytes(data=part.data, mime_type=part.mime_type)
+            if isinstance(part, ContentPart) else part
+            for part in parts
+        ]
+
+    @staticmethod
+    def _api_key_parts(parts: List[Any]) -> List[Any]:
+        return [
+            {"mime_type": part.mime_type, "data": part.data}
+            if isinstance(part, ContentPart) else part
+            for part in parts
+        ]
+
+    @staticmethod
+    def _vertex_parts(parts: List[Any]) -> List[Any]:
+        return [
+            Part.from_data(data=part.data, mime_type=part.mime_type)
+            if isinstance(part, ContentPart) else part
+            for part in parts
+        ]
+
+    async def generate_content(
+        self,
+        model_name: str,
+        contents: Contents,
+        *,
+        temperature: Optional[float] = None,
+        response_mime_type: Optional[str] = None,
+        relaxed_safety: bool = False,
+        task: str = "generic"
+    ) -> ModelResponse:
+        parts = self._as_list(contents)
+
+        if model_name.startswith("gemini-3"):
+            client = self.registry.genai_client(ClientRegistry.GLOBAL_LOCATION)  # Gemini 3 requires global region
+            response = await client.aio.models.generate_content(
+                model=model_name,
+                contents=self._genai_parts(parts),
+                config=genai.types.GenerateContentConfig(
+                    temperature=temperature,
+                    response_mime_type=response_mime_type
+                )
+            )
+            return self._normalize(response)
+
+        generation_config = self._generation_config(temperature, response_mime_type)
+
+        if model_name.endswith("-image"):
+            model = self.registry.api_key_model(
+                model_name,
+                safety_settings=RELAXED_SAFETY_SETTINGS if relaxed_safety else None
+            )
+            response = await model.generate_content_async(
+                self._api_key_parts(parts),
+                generation_config=generation_config or None
+            )
+            return self._normalize(response)
+
+        model = self.registry.vertex_model(model_name)
+        response = await model.generate_content_async(
+            self._vertex_parts(parts),
+            generation_config=generation_config or None
+        )
+        return self._normalize(response)
+
+    async def stream_content(
+        self,
+        model_name: str,
+        contents: Contents,
+        *,
+        temperature: Optional[float] = None,
+        response_mime_type: Optional[str] = None,
+        task: str = "generic"
+    ) -> AsyncIterator[ModelResponse]:
+        parts = self._as_list(contents)
+
+        if model_name.startswith("gemini-3"):
+            client = self.registry.genai_client(ClientRegistry.GLOBAL_LOCATION)  # Gemini 3 requires global region
+            stream = await client.aio.models.generate_content_stream(
+                model=model_name,
+                contents=self._genai_parts(parts),
+                config=genai.types.GenerateContentConfig(
+                    temperature=temperature,
+                    response_mime_type=response_mime_type
+                )
+            )
+        elif model_name.endswith("-image"):
+            model = self.registry.api_key_model(model_name)
+            stream = await model.generate_content_async(
+                self._api_key_parts(parts),
+                generation_config=self._generation_config(temperature, response_mime_type) or None,
+                stream=True
+            )
+        else:
+            model = self.registry.vertex_model(model_name)
+            stream = await model.generate_content_async(
+                self._vertex_parts(parts),
+                generation_config=self._generation_config(temperature, response_mime_type) or None,
+                stream=True
+            )
+
+        async for chunk in stream:
+            yield self._normalize(chunk)
+
+    def _normalize_operation(self, operation: Any) -> VideoOperation:
+        """Convert a GenAI SDK video operation into a VideoOperation"""
+        if isinstance(operation, str):
+            return VideoOperation(name=operation, raw=operation)
+
+        video_uri = None
+        video_bytes = None
+        result = getattr(operation, "result", None) or getattr(operation, "response", None)
+        generated_videos = getattr(result, "generated_videos", None) if result is not None else None
+        if generated_videos:
+            video = getattr(generated_videos[0], "video", None)
+            if video is not None:
+                video_uri = getattr(video, "uri", None) or getattr(video, "url", None)
+                video_bytes = getattr(video, "video_bytes", None)
+
+        error = getattr(operation, "error", None)
+        return VideoOperation(
+            name=str(getattr(operation, "name", "") or ""),
+            done=bool(getattr(operation, "done", False)),
+            video_uri=video_uri,
+            video_bytes=video_bytes,
+            error=str(error) if error else None,
+            raw=operation
+        )
+
+    async def start_video(
+        self,
+        model_name: str,
+        prompt: str,
+        image: Optional[ContentPart] = None,
+        aspect_ratio: str = "16:9",
+        duration_seconds: Optional[int] = None
+    ) -> VideoOperation:
+        client = self.registry.genai_client(ClientRegistry.VERTEX_LOCATION)
+        # Note: Not using output_gcs_uri so the API returns video_bytes directly
+        operation = await client.aio.models.generate_videos(
+            model=model_name,
+            prompt=prompt,
+            image=genai.types.Image(
+                image_bytes=image.data,
+                mime_type=image.mime_type
+            ) if image is not None else None,
+            config=GenerateVideosConfig(
+                aspect_ratio=aspect_ratio,
+                duration_seconds=duration_seconds,
+            ),
+        )
+        return self._normalize_operation(operation)
+
+    async def get_video_operation(self, operation: VideoOperation) -> VideoOperation:
+        client = self.registry.genai_client(ClientRegistry.VERTEX_LOCATION)
+        current = await client.aio.operations.get(operation.raw)
+        return self._normalize_operation(current)
+
+    def signed_url(self, uri: str, expiration_seconds: int = 3600) -> str:
+        if not uri.startswith("gs://"):
+            return uri
+
+        # Parse GCS URI (gs://bucket/path)
+        bucket_name, blob_path = uri.replace("gs://", "").split("/", 1)
+        blob = self.registry.storage_client().bucket(bucket_name).blob(blob_path)
+        return blob.generate_signed_url(
+            version="v4",
+            expiration=timedelta(seconds=expiration_seconds),
+            method="GET"
+        )
+
+    def close(self):
+        self.registry.close()
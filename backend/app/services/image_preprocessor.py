@@ -0,0 +1,185 @@
+"""
+Preprocessing of user images before they are sent to a model
+"""
+import hashlib
+import io
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from PIL import Image as PILImage, ImageOps
+
+from app.config import Config
+from app.services.model_backend import ContentPart
+from app.utils.metrics import metrics
+
+# Formats the models accept inline; anything else is always re-encoded
+_MODEL_FORMATS = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+# Already-compressed formats that re-encoding would not meaningfully shrink
+_LOSSY_FORMATS = {"JPEG", "WEBP"}
+
+# EXIF tag holding the camera orientation
+_EXIF_ORIENTATION = 0x0112
+
+
+class PreprocessProfile:
+    """Target input resolution and encoding for one kind of model call"""
+
+    def __init__(self, name: str, max_edge: int, quality: int = Config.IMAGE_PREPROCESS_JPEG_QUALITY):
+        """
+        Args:
+            name: Profile name (used in cache keys and metric labels)
+            max_edge: Longest edge in pixels the model makes use of
+            quality: JPEG quality for re-encoded opaque images
+        """
+        self.name = name
+        self.max_edge = max_edge
+        self.quality = quality
+
+
+# Per-endpoint targets: image edits and generation references, evaluation, and Veo reference frames
+PROFILES: Dict[str, PreprocessProfile] = {
+    "edit": PreprocessProfile("edit", Config.IMAGE_PREPROCESS_EDIT_MAX_EDGE),
+    "reference": PreprocessProfile("reference", Config.IMAGE_PREPROCESS_REFERENCE_MAX_EDGE),
+    "evaluation": PreprocessProfile("evaluation", Config.IMAGE_PREPROCESS_EVALUATION_MAX_EDGE),
+    "video": PreprocessProfile("video", Config.IMAGE_PREPROCESS_VIDEO_MAX_EDGE),
+}
+
+
+class ImagePreprocessor:
+    """
+    Normalizes uploaded images to what a model actually uses.
+
+    Each image is rotated upright according to its EXIF orientation,
+    downscaled so its longest edge fits the profile's target and
+    re-encoded (JPEG for opaque images, PNG when there is transparency).
+    Images that need no transformation are passed through untouched:
+    JPEG and WebP without even being decoded, other formats unless
+    re-encoding makes them smaller. Already-compact uploads therefore do
+    not lose quality or pay for a decode/encode round trip.
+
+    Results are cached by the SHA-256 of the input and the profile in a
+    byte-bounded LRU, so the same product image sent to several
+    endpoints or variations is processed once. Methods are blocking;
+    async callers run them on the image pool.
+    """
+
+    def __init__(self, enabled: bool = Config.IMAGE_PREPROCESS_ENABLED, cache_bytes: int = Config.IMAGE_PREPROCESS_CACHE_BYTES):
+        """
+        Args:
+            enabled: When False, images are only wrapped with their detected MIME type
+            cache_bytes: Size limit of the result cache (0 disables it)
+        """
+        self.enabled = enabled
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[ContentPart, float]]" = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, data: bytes, profile: str, mime_type: Optional[str] = None) -> ContentPart:
+        """
+        Prepare an image for a model call
+
+        Args:
+            data: Image bytes as uploaded
+            profile: Name of the target profile (see PROFILES)
+            mime_type: MIME type claimed by the client (only used if detection fails)
+
+        Returns:
+            ContentPart with the bytes to send and their MIME type
+
+        Raises:
+            ValueError: If the data is not a readable image
+        """
+        target = PROFILES[profile]
+        if not self.enabled:
+            return ContentPart(data=data, mime_type=self._detect_mime_type(data, mime_type))
+
+        key = (hashlib.sha256(data).hexdigest(), target.name)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None:
+            part, seconds = cached
+            metrics.increment("image_preprocess_total", profile=target.name, result="cache_hit")
+            metrics.increment("image_preprocess_seconds_saved_total", value=seconds, profile=target.name)
+            return part
+
+        started = time.perf_counter()
+        part, transformed = self._process(data, target)
+        seconds = time.perf_counter() - started
+
+        metrics.increment("image_preprocess_total", profile=target.name, result="processed" if transformed else "passthrough")
+        metrics.observe("image_preprocess_seconds", seconds, profile=target.name)
+        metrics.increment("image_preprocess_bytes_in_total", value=len(data), profile=target.name)
+        metrics.increment("image_preprocess_bytes_saved_total", value=len(data) - len(part.data), profile=target.name)
+        if transformed:
+            # Passthroughs are cheap to redo; caching them would only pin the caller's upload in memory
+            self._remember(key, part, seconds)
+        return part
+
+    def _detect_mime_type(self, data: bytes, fallback: Optional[str]) -> str:
+        try:
+            with PILImage.open(io.BytesIO(data)) as image:
+                return PILImage.MIME.get(image.format, fallback or "image/png")
+        except Exception:
+            return fallback or "application/octet-stream"
+
+    def _process(self, data: bytes, target: PreprocessProfile) -> Tuple[ContentPart, bool]:
+        """Returns the prepared part and whether the pixels were transformed"""
+        try:
+            image = PILImage.open(io.BytesIO(data))
+            source_format = image.format
+            orientation = image.getexif().get(_EXIF_ORIENTATION, 1)
+            oversized = max(image.size) > target.max_edge
+            if not oversized and orientation == 1 and source_format in _LOSSY_FORMATS:
+                # Upright, small enough and already compressed: send the upload as-is without decoding it
+                return ContentPart(data=data, mime_type=_MODEL_FORMATS[source_format]), False
+            if oversized:
+                # Let the decoder skip resolution it would discard anyway (JPEG DCT scaling)
+                image.draft("RGB", (target.max_edge, target.max_edge))
+            image.load()
+        except Exception as e:
+            raise ValueError(f"Unreadable image: {str(e)}")
+
+        transformed = oversized or orientation != 1
+        if orientation != 1:
+            image = ImageOps.exif_transpose(image)
+        if max(image.size) > target.max_edge:
+            image.thumbnail((target.max_edge, target.max_edge), PILImage.LANCZOS)
+
+        encoded = self._encode(image, target)
+        if not transformed and source_format in _MODEL_FORMATS and len(encoded.data) >= len(data):
+            # Already upright, small enough and compact: keep the original bytes
+            return ContentPart(data=data, mime_type=_MODEL_FORMATS[source_format]), False
+        return encoded, True
+
+    def _encode(self, image: PILImage.Image, target: PreprocessProfile) -> ContentPart:
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+        output = io.BytesIO()
+        if has_alpha:
+            image.save(output, format="PNG", optimize=True)
+            return ContentPart(data=output.getvalue(), mime_type="image/png")
+
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(output, format="JPEG", quality=target.quality, optimize=True)
+        return ContentPart(data=output.getvalue(), mime_type="image/jpeg")
+
+    def _remember(self, key: Tuple[str, str], part: ContentPart, seconds: float):
+        size = len(part.data)
+        if size > self.cache_bytes:
+            return
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self._cached_bytes -= len(previous[0].data)
+            self._cache[key] = (part, seconds)
+            self._cached_bytes += size
+            while self._cached_bytes > self.cache_bytes:
+                _, (evicted, _) = self._cache.popitem(last=False)
+                self._cached_bytes -= len(evicted.data)
+            metrics.set_gauge("image_preprocess_cache_bytes", self._cached_bytes)
@@ -1,175 +1,197 @@
 """
 Image processing service using Google GenAI - matching reference implementation
 """
-import base64
-import asyncio
-import io
-from typing import Optional
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
-from PIL import Image as PILImage
+from typing import Optional, Tuple
+from app.services.asset_store import AssetStore, create_asset_store
 from app.config import Config
+from app.services.image_preprocessor import ImagePreprocessor
+from app.services.local_image_engine import LocalImageEngine
+from app.services.model_backend import ContentPart, InlineData, ModelBackend, ModelResponse
+from app.services.model_executor import ModelExecutor
+from app.services.model_scheduler import estimate_tokens
+from app.utils.metrics import metrics
 
 
 class ImageProcessingService:
     """Service for AI-powered image processing"""
     
-    def __init__(self):
-        """Initialize the service with Google GenAI API"""
-        if not hasattr(Config, 'GEMINI_API_KEY') or not Config.GEMINI_API_KEY:
-            raise ValueError("GEMINI_API_KEY not configured. Please set GEMINI_API_KEY environment variable.")
-        
-        # Configure Google GenAI
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-    
-    async def apply_filter(self, image_base64: str, mime_type: str, filter_prompt: str) -> dict:
+    def __init__(
+        self,
+        backend: ModelBackend,
+        executor: ModelExecutor,
+        assets: Optional[AssetStore] = None,
+        preprocessor: Optional[ImagePreprocessor] = None,
+        local_engine: Optional[LocalImageEngine] = None
+    ):
+        """Initialize the service with the shared model backend, executor, asset store and image preprocessor"""
+        self.model_name = "gemini-2.5-flash-image"
+        self.backend = backend
+        self.executor = executor
+        self.assets = assets or create_asset_store()
+        self.preprocessor = preprocessor or ImagePreprocessor()
+        # Deterministic engine for recognized common edits (None routes everything to the model)
+        self.local_engine = local_engine or (LocalImageEngine() if Config.IMAGE_LOCAL_ENGINE_ENABLED else None)
+
+    async def _store_result(self, image: InlineData, fallback_mime_type: str) -> dict:
+        """Save a processed image to the asset store and return its asset ID, URL and MIME type"""
+        output_mime_type = image.mime_type or fallback_mime_type
+        asset = await self.executor.run_blocking(
+            ModelExecutor.IO, self.assets.put_bytes, image.data, output_mime_type
+        )
+        return {
+            "asset_id": asset.asset_id,
+            "image_url": self.assets.url(asset.asset_id),
+            "mime_type": output_mime_type,
+            "size": asset.size
+        }
+
+    async def _edit_image(self, image_data: bytes, mime_type: str, instruction: str, prompt: str, context: str) -> Tuple[InlineData, str]:
         """
-        Apply AI-powered filter to an image - based on generateFilteredImage from reference
+        Edit an image locally when the instruction is a recognized common edit, otherwise with the model
+
+        Local edits run on the original upload at full resolution and keep
+        its format; only the model path preprocesses (downscales and
+        re-encodes) the image. The upload is passed to the model as a typed
+        inline part and the model's output bytes are returned as received,
+        so a request holds about one copy of the input and one of the output.
+
+        Args:
+            image_data: Uploaded image bytes
+            mime_type: MIME type of the upload
+            instruction: The user's filter or adjustment text (matched against local edits)
+            prompt: Full model prompt built around the instruction
+            context: "filter" or "adjustment", for error messages
+
+        Returns:
+            (edited image, engine that produced it: "local" or "model")
         """
-        try:
-            # Define relaxed safety settings
-            safety_settings = {
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_ONLY_HIGH,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_ONLY_HIGH,
-            }
-            
-            # Create model instance with relaxed safety settings
-            model = genai.GenerativeModel(
-                "gemini-2.5-flash-image",
-                safety_settings=safety_settings
+        edits = self.local_engine.match(instruction) if self.local_engine is not None else None
+        if edits:
+            output = await self.executor.run_blocking(
+                ModelExecutor.IMAGE, self.local_engine.apply, ContentPart(data=image_data, mime_type=mime_type), edits
             )
-            
-            # Convert base64 to PIL Image (following working pattern)
-            image_data = base64.b64decode(image_base64)
-            image = PILImage.open(io.BytesIO(image_data))
-            
-            # Use safer, more descriptive prompt to avoid safety blocks
-            prompt = f"""Apply a stylistic filter effect to this image. Make subtle adjustments to colors, lighting, and atmosphere to achieve: {filter_prompt}
+            metrics.increment("image_edits_total", engine="local", kind=context)
+            return output, "local"
+
+        # Normalize orientation, size and encoding for the model off the event loop
+        image: ContentPart = await self.executor.run_blocking(
+            ModelExecutor.IMAGE, self.preprocessor.prepare, image_data, "edit", mime_type
+        )
+
+        response = await self.executor.call_model(
+            self.model_name,
+            lambda: self.backend.generate_content(
+                self.model_name,
+                [prompt, image],
+                relaxed_safety=True,  # Relaxed safety settings for stylistic image edits
+                task="image_edit"
+            ),
+            workload=ModelExecutor.IMAGE,
+            estimated_tokens=estimate_tokens([prompt, image])
+        )
+
+        # Handle response using reference implementation logic
+        output = self._handle_api_response(response, context)
+        metrics.increment("image_edits_total", engine="model", kind=context)
+        return output, "model"
+
+    async def render_filter(self, image_data: bytes, mime_type: str, filter_prompt: str) -> Tuple[InlineData, str]:
+        """
+        Apply a filter and return the edited image without storing it
+
+        Returns:
+            (filtered image, engine that produced it)
+        """
+        # Use safer, more descriptive prompt to avoid safety blocks
+        prompt = f"""Apply a stylistic filter effect to this image. Make subtle adjustments to colors, lighting, and atmosphere to achieve: {filter_prompt}
 
 Keep the original composition, subjects, and content unchanged. Only modify the visual style, color grading, lighting effects, or artistic treatment.
 
 Return only the stylistically filtered image."""
-            
-            # Generate filtered image (following working asset generation pattern)
-            response = await asyncio.to_thread(
-                model.generate_content,
-                [prompt, image]
-            )
-            
-            # Handle response using reference implementation logic
-            filtered_image_data = self._handle_api_response(response, "filter")
-            
-            # Extract base64 data from data URL
-            if filtered_image_data.startswith('data:'):
-                mime_type_from_response, base64_data = filtered_image_data.split(',', 1)
-                output_mime_type = mime_type_from_response.split(';')[0].replace('data:', '')
-            else:
-                base64_data = filtered_image_data
-                output_mime_type = mime_type
-            
+
+        return await self._edit_image(image_data, mime_type, filter_prompt, prompt, "filter")
+
+    async def render_adjustment(self, image_data: bytes, mime_type: str, adjustment_prompt: str) -> Tuple[InlineData, str]:
+        """
+        Apply an adjustment and return the edited image without storing it
+
+        Returns:
+            (adjusted image, engine that produced it)
+        """
+        # Use safer, more descriptive prompt for adjustments
+        prompt = f"""Make natural photo adjustments to this image: {adjustment_prompt}
+
+Apply the requested changes while maintaining photorealism. Keep the original composition and subject matter unchanged.
+
+Return only the adjusted image."""
+
+        return await self._edit_image(image_data, mime_type, adjustment_prompt, prompt, "adjustment")
+
+    async def apply_filter(self, image_data: bytes, mime_type: str, filter_prompt: str) -> dict:
+        """
+        Apply AI-powered filter to an image - based on generateFilteredImage from reference
+
+        Common filters (black and white, sepia, vintage, ...) run on the local engine instead.
+        """
+        try:
+            output, engine = await self.render_filter(image_data, mime_type, filter_prompt)
+
+            # Store the result and reference it by asset ID
+            stored = await self._store_result(output, mime_type)
+
             return {
-                "filtered_image_base64": base64_data,
-                "mime_type": output_mime_type,
+                **stored,
+                "engine": engine,
                 "filter_applied": filter_prompt
             }
             
         except Exception as e:
             raise Exception(f"Filter application failed: {str(e)}")
     
-    async def apply_adjustment(self, image_base64: str, mime_type: str, adjustment_prompt: str) -> dict:
+    async def apply_adjustment(self, image_data: bytes, mime_type: str, adjustment_prompt: str) -> dict:
         """
         Apply AI-powered adjustments to an image - based on generateAdjustedImage from reference
+
+        Common adjustments (brightness, contrast, saturation, warmth, ...) run on the local engine instead.
         """
         try:
-            # Define relaxed safety settings
-            safety_settings = {
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_ONLY_HIGH,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_ONLY_HIGH,
-            }
-            
-            # Create model instance with relaxed safety settings
-            model = genai.GenerativeModel(
-                "gemini-2.5-flash-image",
-                safety_settings=safety_settings
-            )
-            
-            # Convert base64 to PIL Image (following working pattern)
-            image_data = base64.b64decode(image_base64)
-            image = PILImage.open(io.BytesIO(image_data))
-            
-            # Use safer, more descriptive prompt for adjustments
-            prompt = f"""Make natural photo adjustments to this image: {adjustment_prompt}
+            output, engine = await self.render_adjustment(image_data, mime_type, adjustment_prompt)
 
-Apply the requested changes while maintaining photorealism. Keep the original composition and subject matter unchanged.
+            # Store the result and reference it by asset ID
+            stored = await self._store_result(output, mime_type)
 
-Return only the adjusted image."""
-            
-            # Generate adjusted image (following working asset generation pattern)
-            response = await asyncio.to_thread(
-                model.generate_content,
-                [prompt, image]
-            )
-            
-            # Handle response using reference implementation logic
-            adjusted_image_data = self._handle_api_response(response, "adjustment")
-            
-            # Extract base64 data from data URL
-            if adjusted_image_data.startswith('data:'):
-                mime_type_from_response, base64_data = adjusted_image_data.split(',', 1)
-                output_mime_type = mime_type_from_response.split(';')[0].replace('data:', '')
-            else:
-                base64_data = adjusted_image_data
-                output_mime_type = mime_type
-            
             return {
-                "adjusted_image_base64": base64_data,
-                "mime_type": output_mime_type,
+                **stored,
+                "engine": engine,
                 "adjustment_applied": adjustment_prompt
             }
             
         except Exception as e:
             raise Exception(f"Adjustment application failed: {str(e)}")
     
-    def _handle_api_response(self, response, context: str) -> str:
+    def _handle_api_response(self, response: ModelResponse, context: str) -> InlineData:
         """
         Handle API response and extract image data - matching reference implementation
+
+        Returns:
+            The returned image's bytes and MIME type, as received from the model
         """
         # Check for prompt blocking first (reference implementation)
-        if hasattr(response, 'prompt_feedback') and response.prompt_feedback and hasattr(response.prompt_feedback, 'block_reason'):
-            block_reason = response.prompt_feedback.block_reason
-            block_message = getattr(response.prompt_feedback, 'block_reason_message', '')
-            error_message = f"Request was blocked. Reason: {block_reason}. {block_message or ''}"
+        if response.block_reason:
+            error_message = f"Request was blocked. Reason: {response.block_reason}. {response.block_reason_message or ''}"
             raise Exception(error_message)
         
         # Try to find the image part (reference implementation logic)
-        if hasattr(response, 'candidates') and response.candidates and len(response.candidates) > 0:
-            candidate = response.candidates[0]
-            if hasattr(candidate, 'content') and candidate.content and hasattr(candidate.content, 'parts'):
-                for part in candidate.content.parts:
-                    if hasattr(part, 'inline_data') and part.inline_data:
-                        mime_type = part.inline_data.mime_type
-                        # Get image bytes from inline data (following working pattern)
-                        image_bytes = part.inline_data.data
-                        # Convert bytes to base64 string (following working pattern)
-                        image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-                        return f"data:{mime_type};base64,{image_base64}"
+        if response.images:
+            return response.images[0]
         
         # Check for other finish reasons (reference implementation)
-        if (hasattr(response, 'candidates') and response.candidates and len(response.candidates) > 0):
-            candidate = response.candidates[0]
-            if hasattr(candidate, 'finish_reason') and candidate.finish_reason and candidate.finish_reason != "STOP":
-                finish_reason = candidate.finish_reason
-                error_message = f"Image generation for {context} stopped unexpectedly. Reason: {finish_reason}. This often relates to safety settings."
-                raise Exception(error_message)
+        if response.finish_reason and response.finish_reason != "STOP":
+            error_message = f"Image generation for {context} stopped unexpectedly. Reason: {response.finish_reason}. This often relates to safety settings."
+            raise Exception(error_message)
         
         # Check for text response (reference implementation)
-        text_feedback = ''
-        if hasattr(response, 'text') and response.text:
-            text_feedback = response.text.strip()
+        text_feedback = response.text.strip() if response.text else ''
         
         error_message = (
             f"The AI model did not return an image for the {context}. " +
@@ -177,4 +199,4 @@ Return only the adjusted image."""
              "This can happen due to safety filters or if the request is too complex. Please try rephrasing your prompt to be more direct.")
         )
         
-        raise Exception(error_message)
\ No newline at end of file
+        raise Exception(error_message) 
@@ -0,0 +1,239 @@
+"""
+Runs long model operations as background jobs with status tracking
+"""
+import asyncio
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from app.config import Config
+from app.services.job_store import Job, JobStore
+from app.services.model_executor import ModelExecutor
+from app.utils.metrics import metrics
+
+# Work callables receive a progress reporter and return the JSON-serializable job result
+ProgressReporter = Callable[[str], Awaitable[None]]
+JobWork = Callable[[ProgressReporter], Awaitable[Dict[str, Any]]]
+
+
+class JobManager:
+    """
+    Owns background job tasks independently of the requests that submit them.
+
+    Each submitted job runs as an asyncio task on the application loop, so
+    a client disconnect does not cancel the work. At most `max_concurrent`
+    jobs run at once; the rest wait in the `queued` state. Every state
+    change is written to the job store and bumps the job's version, which
+    lets clients long-poll for "anything newer than version N" or follow
+    changes as a stream.
+
+    Every active job carries the ID of the manager instance running it and
+    a lease that the instance renews by heartbeat. Several workers can
+    share one SQLite store: a job whose lease lapsed belongs to a worker
+    that crashed or shut down, and since its work callable is gone it
+    cannot be resumed, so the first worker to notice marks it failed (on
+    start and on every heartbeat). Jobs of live workers are left alone.
+    """
+
+    PURGE_INTERVAL = 600
+
+    def __init__(
+        self,
+        store: JobStore,
+        executor: ModelExecutor,
+        max_concurrent: int = Config.JOB_MAX_CONCURRENT,
+        retention: float = Config.JOB_RETENTION_SECONDS,
+        lease: float = Config.JOB_LEASE_SECONDS
+    ):
+        """
+        Args:
+            store: Persistence for job records
+            executor: Model executor whose IO pool runs store operations
+            max_concurrent: Maximum number of jobs running at once
+            retention: Seconds finished jobs are kept before being purged
+            lease: Seconds an active job stays owned by this instance without a heartbeat
+        """
+        self.store = store
+        self.executor = executor
+        self.retention = retention
+        self.lease = lease
+        self.instance_id = uuid.uuid4().hex
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[str, int] = {}
+        self._purger: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Fail jobs whose owner is gone and start the heartbeat and purge loops"""
+        await self._reap_expired()
+        self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        self._purger = asyncio.create_task(self._purge_loop())
+
+    async def shutdown(self):
+        """Cancel running jobs and stop the heartbeat and purge loops"""
+        tasks = list(self._tasks.values())
+        for loop_task in (self._heartbeat, self._purger):
+            if loop_task:
+                tasks.append(loop_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _reap_expired(self):
+        """Fail active jobs whose owner's lease has lapsed"""
+        now = time.time()
+        for job in await self.executor.run_blocking(ModelExecutor.IO, self.store.list_active):
+            if job.id in self._tasks or (job.lease_expires_at or 0) > now:
+                continue
+            job.status = Job.FAILED
+            job.error = "Job was interrupted: the worker running it stopped"
+            await self._save(job)
+            metrics.increment("jobs_reaped_total", kind=job.kind)
+
+    async def _save(self, job: Job):
+        """Persist a state change and wake everyone waiting on the job"""
+        job.version += 1
+        job.updated_at = time.time()
+        if not job.done:
+            job.owner = self.instance_id
+            job.lease_expires_at = job.updated_at + self.lease
+        await self.executor.run_blocking(ModelExecutor.IO, self.store.save, job)
+        event = self._changed.pop(job.id, None)
+        if event is not None:
+            event.set()
+
+    async def submit(self, kind: str, work: JobWork) -> Job:
+        """
+        Record a new job and start it in the background
+
+        Args:
+            kind: Job type label (e.g. "video")
+            work: Coroutine function doing the work; it receives a progress
+                reporter and returns the JSON-serializable result
+
+        Returns:
+            The queued job
+        """
+        job = Job(kind)
+        await self._save(job)
+        self._tasks[job.id] = asyncio.create_task(self._run(job, work))
+        metrics.increment("jobs_submitted_total", kind=kind)
+        metrics.set_gauge("jobs_active", len(self._tasks))
+        return job
+
+    async def _run(self, job: Job, work: JobWork):
+        started = time.monotonic()
+        try:
+            async with self._slots:
+                job.status = Job.RUNNING
+                await self._save(job)
+
+                async def report(progress: str):
+                    job.progress = progress
+                    await self._save(job)
+
+                job.result = await work(report)
+                job.status = Job.SUCCEEDED
+        except asyncio.CancelledError:
+            job.status = Job.CANCELLED
+            job.error = "Job was cancelled"
+        except Exception as e:
+            job.status = Job.FAILED
+            job.error = str(e)
+        finally:
+            self._tasks.pop(job.id, None)
+            metrics.set_gauge("jobs_active", len(self._tasks))
+
+        metrics.increment("jobs_finished_total", kind=job.kind, status=job.status)
+        metrics.observe("job_seconds", time.monotonic() - started, kind=job.kind)
+        await self._save(job)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Current state of a job, or None if it does not exist"""
+        return await self.executor.run_blocking(ModelExecutor.IO, self.store.get, job_id)
+
+    async def wait_for_change(self, job_id: str, version: int, timeout: float) -> Optional[Job]:
+        """
+        Long-poll for a job newer than a known version
+
+        Args:
+            job_id: Job to watch
+            version: Version the caller already has
+            timeout: Maximum seconds to wait
+
+        Returns:
+            The job (newer than `version` unless the timeout passed, or
+            finished), or None if it does not exist
+        """
+        deadline = time.monotonic() + timeout
+        self._waiters[job_id] = self._waiters.get(job_id, 0) + 1
+        try:
+            while True:
+                event = self._changed.setdefault(job_id, asyncio.Event())
+                job = await self.get(job_id)
+                remaining = deadline - time.monotonic()
+                if job is None or job.version > version or job.done or remaining <= 0:
+                    return job
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # The last waiter on a job removes its event, or unchanged jobs would leak one each
+            self._waiters[job_id] -= 1
+            if not self._waiters[job_id]:
+                del self._waiters[job_id]
+                self._changed.pop(job_id, None)
+
+    async def events(self, job_id: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Follow a job as (event, payload) pairs until it finishes
+
+        Emits a `status` event for every version change and ends with a
+        `complete` event carrying the final status.
+
+        Raises:
+            KeyError: If the job does not exist
+        """
+        version = -1
+        while True:
+            job = await self.wait_for_change(job_id, version, Config.JOB_LONG_POLL_MAX)
+            if job is None:
+                raise KeyError(f"Job {job_id} not found")
+            if job.version > version:
+                version = job.version
+                yield "status", job.to_dict()
+            if job.done:
+                yield "complete", job.to_dict()
+                return
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; returns False if it is not running in this process"""
+        task = self._tasks.get(job_id)
+        if task is None:
+            return False
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return True
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                await self.executor.run_blocking(
+                    ModelExecutor.IO, self.store.renew_leases, self.instance_id, time.time() + self.lease
+                )
+                await self._reap_expired()
+            except Exception as e:
+                print(f"Job heartbeat failed: {e}")
+
+    async def _purge_loop(self):
+        while True:
+            await asyncio.sleep(self.PURGE_INTERVAL)
+            removed = await self.executor.run_blocking(
+                ModelExecutor.IO, self.store.purge, time.time() - self.retention
+            )
+            if removed:
+                metrics.increment("jobs_purged_total", value=removed)
@@ -0,0 +1,261 @@
+"""
+Job records and pluggable job stores (in-memory and SQLite)
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from app.config import Config
+
+
+class Job:
+    """State of one background job"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    TERMINAL = (SUCCEEDED, FAILED, CANCELLED)
+
+    def __init__(
+        self,
+        kind: str,
+        job_id: Optional[str] = None,
+        status: str = QUEUED,
+        version: int = 0,
+        created_at: Optional[float] = None,
+        updated_at: Optional[float] = None,
+        progress: Optional[str] = None,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        owner: Optional[str] = None,
+        lease_expires_at: Optional[float] = None
+    ):
+        now = time.time()
+        self.id = job_id or uuid.uuid4().hex
+        self.kind = kind
+        self.status = status
+        self.version = version
+        self.created_at = created_at or now
+        self.updated_at = updated_at or now
+        self.progress = progress
+        self.result = result
+        self.error = error
+        # Job manager instance running the job, and until when its hold on the job is valid
+        self.owner = owner
+        self.lease_expires_at = lease_expires_at
+
+    @property
+    def done(self) -> bool:
+        return self.status in self.TERMINAL
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "version": self.version,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "progress": self.progress,
+            "error": self.error,
+        }
+
+
+class JobStore(ABC):
+    """
+    Persistence for job records.
+
+    Methods are blocking; the job manager runs them on the IO pool.
+    """
+
+    @abstractmethod
+    def save(self, job: Job):
+        """Insert or replace a job"""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Load a job by ID"""
+
+    @abstractmethod
+    def list_active(self) -> List[Job]:
+        """Jobs that are queued or running"""
+
+    @abstractmethod
+    def renew_leases(self, owner: str, expires_at: float):
+        """Extend the lease of every active job held by an owner"""
+
+    @abstractmethod
+    def purge(self, finished_before: float) -> int:
+        """Delete finished jobs last updated before a timestamp; returns the number removed"""
+
+    def close(self):
+        """Release store resources on shutdown"""
+
+
+class InMemoryJobStore(JobStore):
+    """Keeps jobs in a dictionary; jobs are lost when the process exits"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _copy(job: Job) -> Job:
+        return Job(**{
+            **job.to_dict(), "job_id": job.id, "result": job.result,
+            "owner": job.owner, "lease_expires_at": job.lease_expires_at
+        })
+
+    def save(self, job: Job):
+        with self._lock:
+            self._jobs[job.id] = self._copy(job)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._copy(job) if job else None
+
+    def list_active(self) -> List[Job]:
+        with self._lock:
+            return [self._copy(job) for job in self._jobs.values() if not job.done]
+
+    def renew_leases(self, owner: str, expires_at: float):
+        with self._lock:
+            for job in self._jobs.values():
+                if job.owner == owner and not job.done:
+                    job.lease_expires_at = expires_at
+
+    def purge(self, finished_before: float) -> int:
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job.done and job.updated_at < finished_before]
+            for job_id in expired:
+                del self._jobs[job_id]
+            return len(expired)
+
+
+class SqliteJobStore(JobStore):
+    """Stores jobs in a SQLite database so status and results survive restarts"""
+
+    COLUMNS = (
+        "id", "kind", "status", "version", "created_at", "updated_at", "progress", "result", "error",
+        "owner", "lease_expires_at"
+    )
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                progress TEXT,
+                result TEXT,
+                error TEXT,
+                owner TEXT,
+                lease_expires_at REAL
+            )
+            """
+        )
+        # Databases created before leases existed
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in (("owner", "TEXT"), ("lease_expires_at", "REAL")):
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, updated_at)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _from_row(row) -> Job:
+        job_id, kind, status, version, created_at, updated_at, progress, result, error, owner, lease_expires_at = row
+        return Job(
+            kind=kind,
+            job_id=job_id,
+            status=status,
+            version=version,
+            created_at=created_at,
+            updated_at=updated_at,
+            progress=progress,
+            result=json.loads(result) if result else None,
+            error=error,
+            owner=owner,
+            lease_expires_at=lease_expires_at
+        )
+
+    def save(self, job: Job):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                (
+                    job.id, job.kind, job.status, job.version, job.created_at, job.updated_at,
+                    job.progress, json.dumps(job.result) if job.result is not None else None, job.error,
+                    job.owner, job.lease_expires_at
+                )
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def list_active(self) -> List[Job]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE status IN (?, ?)", (Job.QUEUED, Job.RUNNING)
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def renew_leases(self, owner: str, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE owner = ? AND status IN (?, ?)",
+                (expires_at, owner, Job.QUEUED, Job.RUNNING)
+            )
+            self._conn.commit()
+
+    def purge(self, finished_before: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?",
+                (*Job.TERMINAL, finished_before)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_job_store(name: Optional[str] = None) -> JobStore:
+    """
+    Build the job store selected by configuration
+
+    Args:
+        name: Store name ("memory" or "sqlite"); defaults to Config.JOB_STORE
+
+    Returns:
+        A ready-to-use JobStore
+    """
+    name = (name or Config.JOB_STORE).lower()
+
+    if name == "memory":
+        return InMemoryJobStore()
+    if name == "sqlite":
+        return SqliteJobStore(Config.JOB_STORE_PATH)
+
+    raise ValueError(f"Unknown JOB_STORE '{name}'. Supported stores: memory, sqlite")
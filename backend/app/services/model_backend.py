@@ -0,0 +1,168 @@
+"""
+Model backend interface shared by all services
+"""
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, List, Optional, Sequence, Union
+
+from app.config import Config
+
+
+class ContentPart:
+    """Binary prompt part (image, document) passed inline with its MIME type"""
+
+    def __init__(self, data: bytes, mime_type: str):
+        self.data = data
+        self.mime_type = mime_type
+
+
+class InlineData:
+    """Binary output part returned by a model (e.g. a generated image)"""
+
+    def __init__(self, data: bytes, mime_type: str):
+        self.data = data
+        self.mime_type = mime_type
+
+
+class ModelResponse:
+    """SDK-independent view of a generate_content response"""
+
+    def __init__(
+        self,
+        text: Optional[str] = None,
+        images: Optional[List[InlineData]] = None,
+        finish_reason: Optional[str] = None,
+        block_reason: Optional[str] = None,
+        block_reason_message: Optional[str] = None,
+        usage_tokens: Optional[int] = None,
+        raw: Any = None
+    ):
+        self.text = text
+        self.images = images or []
+        self.finish_reason = finish_reason
+        self.block_reason = block_reason
+        self.block_reason_message = block_reason_message
+        self.usage_tokens = usage_tokens
+        self.raw = raw
+
+
+class VideoOperation:
+    """SDK-independent view of a long-running video generation operation"""
+
+    def __init__(
+        self,
+        name: str,
+        done: bool = False,
+        video_uri: Optional[str] = None,
+        video_bytes: Optional[bytes] = None,
+        error: Optional[str] = None,
+        raw: Any = None
+    ):
+        self.name = name
+        self.done = done
+        self.video_uri = video_uri
+        self.video_bytes = video_bytes
+        self.error = error
+        self.raw = raw
+
+
+Contents = Union[str, ContentPart, Sequence[Union[str, ContentPart, Any]]]
+
+
+class ModelBackend(ABC):
+    """
+    Everything the services need from a model provider.
+
+    Services describe what they want (model name, prompt parts, task) and
+    the backend decides which SDK, region and client serve it. The `task`
+    label names the kind of request (brief_analysis, translation, ...) so
+    non-Google backends can return a payload of the right shape.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def generate_content(
+        self,
+        model_name: str,
+        contents: Contents,
+        *,
+        temperature: Optional[float] = None,
+        response_mime_type: Optional[str] = None,
+        relaxed_safety: bool = False,
+        task: str = "generic"
+    ) -> ModelResponse:
+        """Generate a single response for the given prompt parts"""
+
+    async def stream_content(
+        self,
+        model_name: str,
+        contents: Contents,
+        *,
+        temperature: Optional[float] = None,
+        response_mime_type: Optional[str] = None,
+        task: str = "generic"
+    ) -> AsyncIterator[ModelResponse]:
+        """
+        Generate a response as a stream of partial responses
+
+        Each yielded ModelResponse carries the next piece of text; the last
+        one carries the token usage. Backends without native streaming
+        yield the whole response as a single chunk.
+        """
+        yield await self.generate_content(
+            model_name,
+            contents,
+            temperature=temperature,
+            response_mime_type=response_mime_type,
+            task=task
+        )
+
+    @abstractmethod
+    async def start_video(
+        self,
+        model_name: str,
+        prompt: str,
+        image: Optional[ContentPart] = None,
+        aspect_ratio: str = "16:9",
+        duration_seconds: Optional[int] = None
+    ) -> VideoOperation:
+        """Submit a long-running video generation and return its operation"""
+
+    @abstractmethod
+    async def get_video_operation(self, operation: VideoOperation) -> VideoOperation:
+        """Fetch the latest state of a video generation operation"""
+
+    @abstractmethod
+    def signed_url(self, uri: str, expiration_seconds: int = 3600) -> str:
+        """Turn a storage URI into a time-limited HTTP URL (blocking; run on the IO pool)"""
+
+    def close(self):
+        """Release backend resources on shutdown"""
+
+
+def create_model_backend(name: Optional[str] = None) -> ModelBackend:
+    """
+    Build the model backend selected by configuration
+
+    Args:
+        name: Backend name ("google" or "fake"); defaults to Config.MODEL_BACKEND
+
+    Returns:
+        A ready-to-use ModelBackend
+    """
+    name = (name or Config.MODEL_BACKEND).lower()
+
+    if name == "google":
+        from app.services.client_registry import ClientRegistry
+        from app.services.google_model_backend import GoogleModelBackend
+
+        registry = ClientRegistry()
+        registry.initialize()
+        return GoogleModelBackend(registry)
+
+    if name == "fake":
+        from app.services.fake_model_backend import FakeModelBackend, FakeBackendProfile
+
+        return FakeModelBackend(FakeBackendProfile.from_config())
+
+    raise ValueError(f"Unknown MODEL_BACKEND '{name}'. Supported backends: google, fake")
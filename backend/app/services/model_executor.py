@@ -0,0 +1,253 @@
+"""
+Async execution layer for model calls and blocking helper work
+"""
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from app.config import Config
+from app.services.model_scheduler import ModelScheduler
+from app.services.resilience import ResiliencePolicy, MalformedResponseError
+from app.utils.metrics import metrics
+
+
+async def _close_stream(stream: AsyncIterator[Any]):
+    """Close an abandoned async generator so the underlying connection is released"""
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception:
+            pass
+
+
+class ModelExecutor:
+    """
+    Runs every model invocation without blocking the event loop.
+
+    Model calls use the SDKs' native async methods, are admitted through
+    the per-model scheduler, are bounded by a per-workload timeout and are
+    retried (or hedged) according to the resilience policy. Work that has no async API (PIL decoding, base64
+    of large payloads, signed URL generation) runs on a dedicated thread
+    pool per workload class, so a burst of image work cannot starve the
+    threads used by text or video calls.
+    """
+
+    TEXT = "text"
+    IMAGE = "image"
+    VIDEO = "video"
+    IO = "io"
+
+    def __init__(
+        self,
+        scheduler: Optional[ModelScheduler] = None,
+        resilience: Optional[ResiliencePolicy] = None,
+        pool_sizes: Optional[Dict[str, int]] = None,
+        timeouts: Optional[Dict[str, float]] = None
+    ):
+        self.pool_sizes = pool_sizes or {
+            self.TEXT: Config.TEXT_EXECUTOR_WORKERS,
+            self.IMAGE: Config.IMAGE_EXECUTOR_WORKERS,
+            self.VIDEO: Config.VIDEO_EXECUTOR_WORKERS,
+            self.IO: Config.IO_EXECUTOR_WORKERS,
+        }
+        self.timeouts = timeouts or {
+            self.TEXT: Config.TEXT_CALL_TIMEOUT,
+            self.IMAGE: Config.IMAGE_CALL_TIMEOUT,
+            self.VIDEO: Config.VIDEO_CALL_TIMEOUT,
+            self.IO: Config.IO_CALL_TIMEOUT,
+        }
+        self.scheduler = scheduler
+        self.resilience = resilience
+        self._pools: Dict[str, ThreadPoolExecutor] = {
+            workload: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"{workload}-worker")
+            for workload, size in self.pool_sizes.items()
+        }
+
+    def _timeout_for(self, workload: str, timeout: Optional[float]) -> Optional[float]:
+        """Resolve the timeout for a call, falling back to the workload default"""
+        return timeout if timeout is not None else self.timeouts.get(workload)
+
+    async def call_model(
+        self,
+        model_name: str,
+        call: Callable[[], Awaitable[Any]],
+        workload: str = TEXT,
+        timeout: Optional[float] = None,
+        estimated_tokens: int = 0,
+        scheduled: bool = True,
+        parse: Optional[Callable[[Any], Any]] = None,
+        idempotent: bool = True,
+        hedge: bool = False
+    ) -> Any:
+        """
+        Await a native async model call with the workload timeout applied
+
+        Args:
+            model_name: Name of the model being invoked
+            call: Zero-argument callable returning the SDK coroutine
+            workload: Workload class of the call (text, image, video)
+            timeout: Optional override of the workload timeout in seconds
+            estimated_tokens: Estimated token cost of the request for quota accounting
+            scheduled: Whether the call counts against the model's quota
+                (False for e.g. long-running operation status checks)
+            parse: Optional function applied to the response inside the retry
+                loop, so malformed output is retried like a transient error
+            idempotent: Whether the call may be repeated after an ambiguous failure
+            hedge: Whether a backup attempt may be fired after the model's p95 latency
+
+        Returns:
+            The SDK response, or the parsed value if `parse` is given
+
+        Raises:
+            TimeoutError: If the call does not finish within the timeout
+        """
+        limit = self._timeout_for(workload, timeout)
+
+        async def timed_call():
+            started = time.monotonic()
+            try:
+                response = await asyncio.wait_for(call(), timeout=limit)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"{model_name} call timed out after {limit:g} seconds")
+            metrics.observe("model_call_seconds", time.monotonic() - started, model=model_name)
+            metrics.increment("model_calls_total", model=model_name)
+            return response
+
+        async def attempt():
+            if self.scheduler is None or not scheduled:
+                response = await timed_call()
+            else:
+                # The scheduler sees the raw response so it can reconcile real token usage
+                response = await self.scheduler.submit(model_name, timed_call, estimated_tokens)
+            if parse is None:
+                return response
+            try:
+                return parse(response)
+            except Exception as e:
+                raise MalformedResponseError(f"Unparseable {model_name} response: {str(e)}") from e
+
+        if self.resilience is None:
+            return await attempt()
+        return await self.resilience.run(model_name, attempt, idempotent=idempotent, hedge=hedge)
+
+    async def stream_model(
+        self,
+        model_name: str,
+        call: Callable[[], AsyncIterator[Any]],
+        workload: str = TEXT,
+        timeout: Optional[float] = None,
+        estimated_tokens: int = 0,
+        idempotent: bool = True
+    ) -> AsyncIterator[Any]:
+        """
+        Stream a model call's partial responses through the scheduler and retry policy
+
+        The call holds one scheduler slot until the stream ends. Retries
+        only cover opening the stream (up to the first chunk); once a chunk
+        has been handed to the caller, a failure is raised as-is. The
+        workload timeout bounds the whole stream.
+
+        Args:
+            model_name: Name of the model being invoked
+            call: Zero-argument callable returning the backend's async chunk iterator
+            workload: Workload class of the call
+            timeout: Optional override of the workload timeout in seconds
+            estimated_tokens: Estimated token cost of the request for quota accounting
+            idempotent: Whether opening the stream may be repeated after an ambiguous failure
+
+        Yields:
+            Partial responses as produced by the backend
+
+        Raises:
+            TimeoutError: If the stream does not finish within the timeout
+        """
+        limit = self._timeout_for(workload, timeout)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        async def next_chunk(stream: AsyncIterator[Any]) -> Any:
+            remaining = None if limit is None else max(0.0, limit - (loop.time() - started))
+            try:
+                return await asyncio.wait_for(stream.__anext__(), timeout=remaining)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"{model_name} stream timed out after {limit:g} seconds")
+
+        async def open_stream():
+            limiter = self.scheduler.limiter(model_name) if self.scheduler is not None else None
+            if limiter is not None:
+                await limiter.acquire(estimated_tokens)
+            stream = call().__aiter__()
+            try:
+                first = await next_chunk(stream)
+            except BaseException as e:
+                if limiter is not None:
+                    limiter.release(estimated_tokens, None)
+                await _close_stream(stream)
+                if isinstance(e, StopAsyncIteration):
+                    raise MalformedResponseError(f"{model_name} returned an empty stream")
+                raise
+            return limiter, stream, first
+
+        if self.resilience is None:
+            limiter, stream, chunk = await open_stream()
+        else:
+            limiter, stream, chunk = await self.resilience.run(model_name, open_stream, idempotent=idempotent)
+
+        metrics.observe("model_stream_first_chunk_seconds", loop.time() - started, model=model_name)
+        actual_tokens = None
+        try:
+            while True:
+                usage = getattr(chunk, "usage_tokens", None)
+                if usage:
+                    actual_tokens = usage
+                yield chunk
+                try:
+                    chunk = await next_chunk(stream)
+                except StopAsyncIteration:
+                    break
+            metrics.observe("model_stream_seconds", loop.time() - started, model=model_name)
+        finally:
+            if limiter is not None:
+                limiter.release(estimated_tokens, actual_tokens)
+            await _close_stream(stream)
+
+    async def run_blocking(
+        self,
+        workload: str,
+        fn: Callable[..., Any],
+        *args,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Run a blocking function on the thread pool of a workload class
+
+        Args:
+            workload: Workload class whose pool should run the function
+            fn: Blocking callable
+            *args: Positional arguments for the callable
+            timeout: Optional override of the workload timeout in seconds
+            **kwargs: Keyword arguments for the callable
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            TimeoutError: If the function does not finish within the timeout
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(workload) or self._pools[self.IO]
+        limit = self._timeout_for(workload, timeout)
+        future = loop.run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(future, timeout=limit)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"{workload} task timed out after {limit:g} seconds")
+
+    def shutdown(self):
+        """Stop all worker pools"""
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,291 @@
+"""
+Quota-aware per-model rate limiting and request scheduling
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from app.config import Config
+from app.utils.metrics import metrics
+
+
+# Rough token cost of one inline image part, used when estimating request size
+IMAGE_PART_TOKENS = 258
+
+
+def estimate_tokens(contents: Any) -> int:
+    """
+    Estimate the input token count of a model request
+
+    Text is counted at roughly four characters per token and each
+    non-text part (image, document) at a flat per-part cost.
+
+    Args:
+        contents: Prompt string or list of prompt parts
+
+    Returns:
+        Estimated token count
+    """
+    if contents is None:
+        return 0
+    if isinstance(contents, str):
+        return max(1, len(contents) // 4)
+    if isinstance(contents, (list, tuple)):
+        return sum(estimate_tokens(part) for part in contents)
+    return IMAGE_PART_TOKENS
+
+
+def _usage_tokens(response: Any) -> Optional[int]:
+    """Read the billed token count from a model response, if it reports one"""
+    total = getattr(response, "usage_tokens", None)
+    if total is None:
+        usage = getattr(response, "usage_metadata", None)
+        total = getattr(usage, "total_token_count", None) if usage is not None else None
+    return int(total) if isinstance(total, (int, float)) and total > 0 else None
+
+
+class SchedulerTimeoutError(TimeoutError):
+    """Raised when a request waits in the model queue longer than allowed"""
+
+
+class ModelQuota:
+    """Requests per minute, tokens per minute and concurrency cap for one model (0 = unlimited)"""
+
+    def __init__(self, rpm: float = 0, tpm: float = 0, max_concurrency: int = 0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelQuota":
+        return cls(
+            rpm=float(data.get("rpm", 0)),
+            tpm=float(data.get("tpm", 0)),
+            max_concurrency=int(data.get("max_concurrency", 0))
+        )
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate; bursts up to one minute of quota"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> float:
+        """Tokens currently available"""
+        if self.unlimited:
+            return float("inf")
+        self._refill()
+        return self.tokens
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        """Consume tokens; callers check delay_for first"""
+        if self.unlimited:
+            return
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """Refund (positive) or charge (negative) tokens after the real cost is known"""
+        if self.unlimited:
+            return
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + delta)
+
+
+class ModelLimiter:
+    """FIFO admission queue for one model, gated by its RPM/TPM buckets and concurrency cap"""
+
+    def __init__(self, model_name: str, quota: ModelQuota, max_queue_wait: float):
+        self.model_name = model_name
+        self.quota = quota
+        self.max_queue_wait = max_queue_wait
+        self.requests = TokenBucket(quota.rpm)
+        self.tokens = TokenBucket(quota.tpm)
+        self.in_flight = 0
+        self._waiters: Deque[Tuple[asyncio.Future, int]] = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for future, _ in self._waiters if not future.done())
+
+    def _has_capacity(self) -> bool:
+        return self.quota.max_concurrency <= 0 or self.in_flight < self.quota.max_concurrency
+
+    def _admit(self, tokens: int):
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        self.in_flight += 1
+
+    def _publish(self):
+        metrics.set_gauge("scheduler_queue_depth", self.queue_depth, model=self.model_name)
+        metrics.set_gauge("scheduler_in_flight", self.in_flight, model=self.model_name)
+
+    def _dispatch(self):
+        """Admit queued requests in arrival order while quota and concurrency allow"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiters:
+            future, tokens = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if not self._has_capacity():
+                break  # a release will dispatch again
+            delay = max(self.requests.delay_for(1), self.tokens.delay_for(tokens))
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                break
+            self._waiters.popleft()
+            self._admit(tokens)
+            future.set_result(None)
+
+        self._publish()
+
+    async def acquire(self, tokens: int):
+        """
+        Wait for a slot for a request of the given estimated token size
+
+        Raises:
+            SchedulerTimeoutError: If the request could not be admitted in time
+        """
+        started = time.monotonic()
+
+        if not self._waiters and self._has_capacity() and \
+                self.requests.delay_for(1) == 0 and self.tokens.delay_for(tokens) == 0:
+            self._admit(tokens)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            waiter = (future, tokens)
+            self._waiters.append(waiter)
+            self._dispatch()
+            try:
+                await asyncio.wait_for(future, timeout=self.max_queue_wait)
+            except BaseException as e:
+                if future.done() and not future.cancelled():
+                    # Admitted at the same moment we gave up: hand the slot back
+                    self.release(tokens, None)
+                else:
+                    try:
+                        self._waiters.remove(waiter)
+                    except ValueError:
+                        pass
+                    self._dispatch()
+                if isinstance(e, asyncio.TimeoutError):
+                    metrics.increment("scheduler_queue_timeouts_total", model=self.model_name)
+                    raise SchedulerTimeoutError(
+                        f"{self.model_name} request waited more than {self.max_queue_wait:g} seconds for quota"
+                    )
+                raise
+
+        waited = time.monotonic() - started
+        metrics.observe("scheduler_wait_seconds", waited, model=self.model_name)
+        metrics.increment("scheduler_admitted_total", model=self.model_name)
+        self._publish()
+
+    def release(self, reserved_tokens: int, actual_tokens: Optional[int]):
+        """Free the concurrency slot and reconcile the token estimate with real usage"""
+        self.in_flight = max(0, self.in_flight - 1)
+        if actual_tokens is not None:
+            self.tokens.adjust(reserved_tokens - actual_tokens)
+        self._dispatch()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "rpm_limit": self.quota.rpm,
+            "tpm_limit": self.quota.tpm,
+            "max_concurrency": self.quota.max_concurrency,
+            "requests_available": None if self.requests.unlimited else round(self.requests.available(), 2),
+            "tokens_available": None if self.tokens.unlimited else round(self.tokens.available(), 2),
+        }
+
+
+class ModelScheduler:
+    """
+    Single entry point through which services submit model calls.
+
+    Each model gets its own limiter so bursts are queued and released at
+    the configured quota instead of being bounced back as 429s.
+    """
+
+    def __init__(
+        self,
+        quotas: Optional[Dict[str, Dict[str, Any]]] = None,
+        default_quota: Optional[Dict[str, Any]] = None,
+        max_queue_wait: Optional[float] = None
+    ):
+        quotas = Config.MODEL_QUOTAS if quotas is None else quotas
+        self.quotas = {name: ModelQuota.from_dict(q) for name, q in quotas.items()}
+        self.default_quota = ModelQuota.from_dict(
+            default_quota if default_quota is not None
+            else {"max_concurrency": Config.DEFAULT_MODEL_CONCURRENCY}
+        )
+        self.max_queue_wait = max_queue_wait if max_queue_wait is not None else Config.SCHEDULER_MAX_QUEUE_WAIT
+        self._limiters: Dict[str, ModelLimiter] = {}
+
+    def limiter(self, model_name: str) -> ModelLimiter:
+        """Get or create the limiter for a model"""
+        limiter = self._limiters.get(model_name)
+        if limiter is None:
+            quota = self.quotas.get(model_name, self.default_quota)
+            limiter = self._limiters[model_name] = ModelLimiter(model_name, quota, self.max_queue_wait)
+        return limiter
+
+    async def submit(
+        self,
+        model_name: str,
+        call: Callable[[], Awaitable[Any]],
+        estimated_tokens: int = 0
+    ) -> Any:
+        """
+        Run a model call once the model's quota admits it
+
+        Args:
+            model_name: Model the call is billed against
+            call: Zero-argument callable returning the call coroutine
+            estimated_tokens: Estimated token cost used for the TPM bucket
+
+        Returns:
+            The call's result
+        """
+        limiter = self.limiter(model_name)
+        await limiter.acquire(estimated_tokens)
+        actual_tokens = None
+        try:
+            result = await call()
+            actual_tokens = _usage_tokens(result)
+            return result
+        finally:
+            limiter.release(estimated_tokens, actual_tokens)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current queue and quota state of every model seen so far"""
+        return {name: limiter.snapshot() for name, limiter in self._limiters.items()}
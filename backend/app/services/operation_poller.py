@@ -0,0 +1,234 @@
+"""
+Central poller for long-running video generation operations
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from app.config import Config
+from app.services.model_backend import ModelBackend, VideoOperation
+from app.services.model_executor import ModelExecutor
+from app.utils.metrics import metrics
+
+
+class _PendingOperation:
+    """An outstanding operation and the future its waiter is blocked on"""
+
+    def __init__(self, model_name: str, duration_seconds: int, operation: VideoOperation, timeout: float):
+        self.model_name = model_name
+        self.duration_seconds = duration_seconds
+        self.operation = operation
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout
+        self.checks = 0
+        self.failures = 0
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    @property
+    def profile_key(self) -> Tuple[str, int]:
+        return self.model_name, self.duration_seconds
+
+
+class OperationPoller:
+    """
+    Tracks every outstanding video operation from a single polling loop.
+
+    Callers register an operation with `wait()` and block on a future that
+    the loop resolves once the operation is done. Each tick, the loop
+    checks all operations that are due (at most `max_batch` status calls in
+    flight), so polling load follows the number of operations close to
+    completion rather than the number outstanding.
+
+    Check times adapt to observed completion times per (model, clip
+    length). The first check comes quickly to catch rejected requests.
+    Until enough completions are recorded, checks then back off
+    exponentially. Afterwards nothing is checked before the fastest
+    completions usually finish; checks run at `min_interval` through the
+    typical completion window and back off again for stragglers.
+    """
+
+    HISTORY_SIZE = 50
+    MIN_SAMPLES = 3
+    BACKOFF_FACTOR = 1.5
+    MAX_CONSECUTIVE_FAILURES = 3
+
+    def __init__(
+        self,
+        backend: ModelBackend,
+        executor: ModelExecutor,
+        initial_delay: float = Config.VIDEO_POLL_INITIAL_DELAY,
+        min_interval: float = Config.VIDEO_POLL_MIN_INTERVAL,
+        max_interval: float = Config.VIDEO_POLL_MAX_INTERVAL,
+        max_batch: int = Config.VIDEO_POLL_BATCH_SIZE
+    ):
+        """
+        Args:
+            backend: Model backend used for status checks
+            executor: Model executor applying timeouts and retries to status checks
+            initial_delay: Seconds before an operation's first check
+            min_interval: Shortest gap between checks of one operation
+            max_interval: Longest gap between checks of one operation
+            max_batch: Maximum status checks in flight at once
+        """
+        self.backend = backend
+        self.executor = executor
+        self.initial_delay = initial_delay
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._in_flight = asyncio.Semaphore(max_batch)
+        self._schedule: List[Tuple[float, int, _PendingOperation]] = []
+        self._sequence = itertools.count()
+        self._history: Dict[Tuple[str, int], Deque[float]] = defaultdict(lambda: deque(maxlen=self.HISTORY_SIZE))
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._checks: set = set()
+        self._pending = 0
+
+    async def wait(
+        self,
+        model_name: str,
+        operation: VideoOperation,
+        duration_seconds: int,
+        timeout: float = Config.VIDEO_OPERATION_TIMEOUT
+    ) -> VideoOperation:
+        """
+        Wait until a video operation is done
+
+        Args:
+            model_name: Model that runs the operation
+            operation: Operation returned by the backend's start_video
+            duration_seconds: Requested clip length (selects the timing profile)
+            timeout: Maximum seconds to wait for completion
+
+        Returns:
+            The finished operation (check `error` for failures reported by the model)
+
+        Raises:
+            TimeoutError: If the operation does not finish within the timeout
+        """
+        if operation.done:
+            return operation
+
+        entry = _PendingOperation(model_name, duration_seconds, operation, timeout)
+        self._ensure_running()
+        self._pending += 1
+        metrics.set_gauge("video_operations_pending", self._pending)
+        self._enqueue(entry, entry.started + self._next_delay(entry))
+        try:
+            return await entry.future
+        finally:
+            self._pending -= 1
+            metrics.set_gauge("video_operations_pending", self._pending)
+
+    async def shutdown(self):
+        """Stop the polling loop and fail every waiter"""
+        tasks = list(self._checks)
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for _, _, entry in self._schedule:
+            if not entry.future.done():
+                entry.future.set_exception(RuntimeError("Video operation poller stopped"))
+        self._schedule.clear()
+
+    def _ensure_running(self):
+        if self._loop_task is None or self._loop_task.done():
+            self._wakeup = asyncio.Event()
+            self._loop_task = asyncio.create_task(self._run())
+
+    def _enqueue(self, entry: _PendingOperation, due: float):
+        heapq.heappush(self._schedule, (min(due, entry.deadline), next(self._sequence), entry))
+        self._wakeup.set()
+
+    def _next_delay(self, entry: _PendingOperation) -> float:
+        """Seconds from now until an operation's next status check"""
+        elapsed = time.monotonic() - entry.started
+        if entry.checks == 0:
+            return self.initial_delay
+
+        history = self._history.get(entry.profile_key)
+        if not history or len(history) < self.MIN_SAMPLES:
+            backoff = self.initial_delay * self.BACKOFF_FACTOR ** entry.checks
+            return min(max(backoff, self.min_interval), self.max_interval)
+
+        observed = sorted(history)
+        fastest = observed[len(observed) // 10]
+        slowest = observed[(len(observed) * 9) // 10]
+
+        if elapsed < fastest - self.min_interval:
+            # Skip ahead to just before the usual completion window
+            return min(fastest - self.min_interval - elapsed, self.max_interval * 4)
+        if elapsed <= slowest:
+            return self.min_interval
+        overdue = elapsed - slowest
+        return min(max(self.min_interval, overdue * (self.BACKOFF_FACTOR - 1)), self.max_interval)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            while self._schedule and self._schedule[0][0] <= now:
+                _, _, entry = heapq.heappop(self._schedule)
+                if entry.future.done():
+                    continue  # Waiter gave up (e.g. job cancelled)
+                task = asyncio.create_task(self._check(entry))
+                self._checks.add(task)
+                task.add_done_callback(self._checks.discard)
+
+            delay = self._schedule[0][0] - now if self._schedule else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _check(self, entry: _PendingOperation):
+        async with self._in_flight:
+            if entry.future.done():
+                return
+            try:
+                operation = await self.executor.call_model(
+                    entry.model_name,
+                    lambda: self.backend.get_video_operation(entry.operation),
+                    workload=ModelExecutor.VIDEO,
+                    scheduled=False  # status checks do not count against the Veo quota
+                )
+                entry.failures = 0
+            except Exception as e:
+                entry.failures += 1
+                metrics.increment("video_poll_requests_total", model=entry.model_name, result="error")
+                if entry.failures >= self.MAX_CONSECUTIVE_FAILURES:
+                    # The waiter may have been cancelled while the status request was in flight
+                    if not entry.future.done():
+                        entry.future.set_exception(e)
+                    return
+                operation = entry.operation
+            else:
+                metrics.increment("video_poll_requests_total", model=entry.model_name, result="ok")
+
+        entry.checks += 1
+        entry.operation = operation
+        now = time.monotonic()
+
+        if operation.done:
+            elapsed = now - entry.started
+            if not operation.error:
+                self._history[entry.profile_key].append(elapsed)
+            metrics.observe("video_operation_seconds", elapsed, model=entry.model_name)
+            metrics.observe("video_poll_checks", entry.checks, model=entry.model_name)
+            if not entry.future.done():
+                entry.future.set_result(operation)
+            return
+
+        if now >= entry.deadline:
+            if not entry.future.done():
+                entry.future.set_exception(
+                    TimeoutError(f"Video generation timed out after {now - entry.started:.0f} seconds")
+                )
+            return
+
+        self._enqueue(entry, now + self._next_delay(entry))
@@ -0,0 +1,222 @@
+"""
+Retry, retry-budget and request-hedging policies for model calls
+"""
+import asyncio
+import json
+import random
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pydantic import ValidationError
+
+from app.config import Config
+from app.services.model_scheduler import SchedulerTimeoutError
+from app.utils.metrics import metrics
+
+
+# HTTP status codes worth retrying: throttling and transient server errors
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Transient error class names raised by google.api_core / grpc
+RETRYABLE_ERROR_NAMES = {
+    "ResourceExhausted",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "InternalServerError",
+    "BadGateway",
+    "GatewayTimeout",
+    "Aborted",
+    "RetryError",
+}
+
+
+class MalformedResponseError(ValueError):
+    """Raised when a model response cannot be parsed into the expected shape"""
+
+
+def classify_error(error: BaseException, idempotent: bool = True) -> Optional[str]:
+    """
+    Decide whether a failed model call may be retried
+
+    Args:
+        error: The exception raised by the call
+        idempotent: Whether repeating the call is safe even if the first
+            attempt may have been executed (timeouts, dropped connections)
+
+    Returns:
+        A short reason string if the error is retryable, otherwise None
+    """
+    if isinstance(error, SchedulerTimeoutError):
+        return None  # Already waited for quota; retrying would only queue again
+    if isinstance(error, (MalformedResponseError, json.JSONDecodeError, ValidationError)):
+        return "malformed_response"
+
+    code = getattr(error, "code", None)
+    if callable(code):
+        code = None  # grpc errors expose code() as a method with enum values
+    if isinstance(code, int) and code in RETRYABLE_STATUS_CODES:
+        if code == 429:
+            return "rate_limited"
+        if code == 503:
+            return "unavailable"
+        return f"http_{code}" if idempotent else None
+
+    name = type(error).__name__
+    if name in RETRYABLE_ERROR_NAMES:
+        if name in ("ResourceExhausted", "TooManyRequests"):
+            return "rate_limited"
+        if name == "DeadlineExceeded" and not idempotent:
+            return None
+        return "unavailable"
+
+    if idempotent and isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return "timeout" if isinstance(error, (TimeoutError, asyncio.TimeoutError)) else "connection"
+
+    return None
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of regular traffic so retries cannot amplify an outage.
+
+    Every first attempt deposits `ratio` tokens, every retry or hedge
+    withdraws one. The bucket starts full at `max_tokens`, which allows a
+    small number of retries before any traffic has been seen.
+    """
+
+    def __init__(self, ratio: float, max_tokens: float):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def record_request(self):
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class ResiliencePolicy:
+    """Runs a model call with classified retries, a per-model retry budget and optional hedging"""
+
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        budget_ratio: Optional[float] = None,
+        budget_max_tokens: Optional[float] = None,
+        hedging_enabled: Optional[bool] = None,
+        hedge_min_delay: Optional[float] = None,
+        hedge_min_samples: Optional[int] = None
+    ):
+        self.max_attempts = max_attempts if max_attempts is not None else Config.RETRY_MAX_ATTEMPTS
+        self.base_delay = base_delay if base_delay is not None else Config.RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else Config.RETRY_MAX_DELAY
+        self.budget_ratio = budget_ratio if budget_ratio is not None else Config.RETRY_BUDGET_RATIO
+        self.budget_max_tokens = budget_max_tokens if budget_max_tokens is not None else Config.RETRY_BUDGET_MAX_TOKENS
+        self.hedging_enabled = hedging_enabled if hedging_enabled is not None else Config.HEDGING_ENABLED
+        self.hedge_min_delay = hedge_min_delay if hedge_min_delay is not None else Config.HEDGE_MIN_DELAY
+        self.hedge_min_samples = hedge_min_samples if hedge_min_samples is not None else Config.HEDGE_MIN_SAMPLES
+        self._budgets: Dict[str, RetryBudget] = {}
+
+    def budget(self, model_name: str) -> RetryBudget:
+        """Get or create the retry budget of a model"""
+        budget = self._budgets.get(model_name)
+        if budget is None:
+            budget = self._budgets[model_name] = RetryBudget(self.budget_ratio, self.budget_max_tokens)
+        return budget
+
+    def backoff_delay(self, retry_number: int) -> float:
+        """Full-jitter exponential backoff for the given retry (1-based)"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (retry_number - 1)))
+        return random.uniform(0, ceiling)
+
+    def hedge_delay(self, model_name: str) -> Optional[float]:
+        """Delay before a hedged attempt, based on the model's observed p95 latency"""
+        if not self.hedging_enabled:
+            return None
+        samples = metrics.get_counter("model_calls_total", model=model_name)
+        if samples < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, metrics.quantile("model_call_seconds", 0.95, model=model_name))
+
+    async def run(
+        self,
+        model_name: str,
+        attempt: Callable[[], Awaitable[Any]],
+        idempotent: bool = True,
+        hedge: bool = False
+    ) -> Any:
+        """
+        Run an attempt factory until it succeeds or the error is not retryable
+
+        Args:
+            model_name: Model the call targets (selects budget and latency stats)
+            attempt: Zero-argument callable starting one attempt
+            idempotent: Whether the call may safely be repeated after ambiguous failures
+            hedge: Fire a second attempt after the p95 delay and take whichever finishes first
+
+        Returns:
+            The result of the first successful attempt
+        """
+        budget = self.budget(model_name)
+        budget.record_request()
+        retry_number = 0
+
+        while True:
+            try:
+                if hedge and idempotent:
+                    return await self._hedged(model_name, attempt, budget)
+                return await attempt()
+            except Exception as e:
+                reason = classify_error(e, idempotent)
+                if reason is None or retry_number + 1 >= self.max_attempts:
+                    raise
+                if not budget.try_spend():
+                    metrics.increment("model_retry_budget_exhausted_total", model=model_name)
+                    raise
+
+                retry_number += 1
+                delay = self.backoff_delay(retry_number)
+                metrics.increment("model_retries_total", model=model_name, reason=reason)
+                print(f"Retrying {model_name} call ({reason}) in {delay:.2f}s, retry {retry_number}")
+                await asyncio.sleep(delay)
+
+    async def _hedged(
+        self,
+        model_name: str,
+        attempt: Callable[[], Awaitable[Any]],
+        budget: RetryBudget
+    ) -> Any:
+        """Start a backup attempt if the primary is slower than the hedge delay"""
+        delay = self.hedge_delay(model_name)
+        if delay is None:
+            return await attempt()
+
+        primary = asyncio.ensure_future(attempt())
+        pending = {primary}
+        first_error: Optional[BaseException] = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done or not budget.try_spend():
+                return await primary
+
+            metrics.increment("model_hedges_total", model=model_name)
+            backup = asyncio.ensure_future(attempt())
+            pending.add(backup)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            metrics.increment("model_hedge_wins_total", model=model_name)
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in pending:
+                task.cancel()
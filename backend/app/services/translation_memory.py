@@ -0,0 +1,235 @@
+"""
+Persistent translation memory with exact and MinHash-based fuzzy segment lookup
+"""
+import hashlib
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.utils.metrics import metrics
+
+
+# MinHash signature length and LSH banding (16 bands x 4 rows ~ 0.5 Jaccard threshold)
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(1)  # Fixed seed: stored signatures must stay comparable across restarts
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def normalize_segment(text: str) -> str:
+    """Canonical form of a segment for exact matching (Unicode NFKC, collapsed whitespace)"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def _shingles(text: str) -> Set[bytes]:
+    """Character n-grams of the lower-cased segment"""
+    text = f" {text.lower()} "
+    if len(text) <= SHINGLE_SIZE:
+        return {text.encode("utf-8")}
+    return {text[i:i + SHINGLE_SIZE].encode("utf-8") for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text: str) -> Tuple[int, ...]:
+    """MinHash signature of a segment's character shingles"""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "little")
+        for shingle in _shingles(text)
+    ]
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def signature_similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for a, b in zip(left, right) if a == b) / NUM_PERMUTATIONS
+
+
+class FuzzyMatch:
+    """A previously translated segment similar to the one being looked up"""
+
+    def __init__(self, source: str, target: str, similarity: float):
+        self.source = source
+        self.target = target
+        self.similarity = similarity
+
+
+class TranslationMemory:
+    """
+    Stores approved segment translations keyed by (source segment, target language, brand).
+
+    Exact lookups go to SQLite; fuzzy lookups use an in-memory MinHash LSH
+    index (rebuilt from stored signatures on first use) to find candidate
+    segments in the same language and brand, then rank them by estimated
+    Jaccard similarity of their character trigrams.
+
+    Methods are blocking; async callers run them on the IO pool.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Args:
+            path: SQLite database file (":memory:" keeps the memory for the process lifetime)
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY,
+                brand TEXT NOT NULL,
+                language TEXT NOT NULL,
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                uses INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                UNIQUE (brand, language, source)
+            )
+            """
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._buckets: Optional[Dict[Tuple[str, str, int, Tuple[int, ...]], Set[int]]] = None
+        self._entries: Dict[int, Tuple[str, str, Tuple[int, ...]]] = {}  # id -> (source, target, signature)
+
+    @staticmethod
+    def _scope(language: str, brand: Optional[str]) -> Tuple[str, str]:
+        return language.strip().lower(), (brand or "").strip().lower()
+
+    def _index(self, entry_id: int, language: str, brand: str, source: str, target: str, signature: Tuple[int, ...]):
+        self._entries[entry_id] = (source, target, signature)
+        for band in range(LSH_BANDS):
+            rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+            self._buckets[(language, brand, band, rows)].add(entry_id)
+
+    def _load_index(self):
+        """Build the LSH index from stored signatures the first time it is needed"""
+        if self._buckets is not None:
+            return
+        self._buckets = defaultdict(set)
+        cursor = self._conn.execute("SELECT id, language, brand, source, target, signature FROM segments")
+        for entry_id, language, brand, source, target, blob in cursor:
+            self._index(entry_id, language, brand, source, target, tuple(array("I", blob)))
+
+    def lookup(
+        self,
+        segments: List[str],
+        language: str,
+        brand: Optional[str] = None,
+        fuzzy_threshold: float = 0.6,
+        fuzzy_limit: int = 3
+    ) -> Tuple[Dict[str, str], Dict[str, List[FuzzyMatch]]]:
+        """
+        Look up a list of segments for one language and brand
+
+        Args:
+            segments: Source segments
+            language: Target language
+            brand: Brand the copy belongs to (None for brand-neutral)
+            fuzzy_threshold: Minimum estimated similarity for fuzzy matches
+            fuzzy_limit: Maximum fuzzy matches returned per segment
+
+        Returns:
+            (exact, fuzzy): exact translations by segment, and fuzzy matches
+            (best first) for segments without an exact translation
+        """
+        language, brand = self._scope(language, brand)
+        exact: Dict[str, str] = {}
+        fuzzy: Dict[str, List[FuzzyMatch]] = {}
+
+        with self._lock:
+            for segment in segments:
+                source = normalize_segment(segment)
+                row = self._conn.execute(
+                    "SELECT id, target FROM segments WHERE brand = ? AND language = ? AND source = ?",
+                    (brand, language, source)
+                ).fetchone()
+                if row is not None:
+                    exact[segment] = row[1]
+                    self._conn.execute("UPDATE segments SET uses = uses + 1 WHERE id = ?", (row[0],))
+                    metrics.increment("translation_memory_lookups_total", result="exact")
+                    continue
+
+                self._load_index()
+                signature = minhash_signature(source)
+                candidates: Set[int] = set()
+                for band in range(LSH_BANDS):
+                    rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+                    candidates |= self._buckets.get((language, brand, band, rows), set())
+
+                matches = []
+                for entry_id in candidates:
+                    candidate_source, candidate_target, candidate_signature = self._entries[entry_id]
+                    similarity = signature_similarity(signature, candidate_signature)
+                    if similarity >= fuzzy_threshold:
+                        matches.append(FuzzyMatch(candidate_source, candidate_target, similarity))
+                matches.sort(key=lambda match: match.similarity, reverse=True)
+                if matches:
+                    fuzzy[segment] = matches[:fuzzy_limit]
+                metrics.increment("translation_memory_lookups_total", result="fuzzy" if matches else "miss")
+
+            self._conn.commit()
+
+        return exact, fuzzy
+
+    def store(self, translations: Dict[str, str], language: str, brand: Optional[str] = None):
+        """
+        Save segment translations, replacing older translations of the same segment
+
+        Args:
+            translations: Target text by source segment
+            language: Target language
+            brand: Brand the copy belongs to (None for brand-neutral)
+        """
+        language, brand = self._scope(language, brand)
+        now = time.time()
+
+        with self._lock:
+            for segment, target in translations.items():
+                source = normalize_segment(segment)
+                if not source or not target.strip():
+                    continue
+                signature = minhash_signature(source)
+                self._conn.execute(
+                    """
+                    INSERT INTO segments (brand, language, source, target, signature, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (brand, language, source)
+                    DO UPDATE SET target = excluded.target, updated_at = excluded.updated_at
+                    """,
+                    (brand, language, source, target.strip(), array("I", signature).tobytes(), now)
+                )
+                entry_id = self._conn.execute(
+                    "SELECT id FROM segments WHERE brand = ? AND language = ? AND source = ?",
+                    (brand, language, source)
+                ).fetchone()[0]
+                if self._buckets is not None:
+                    self._index(entry_id, language, brand, source, target.strip(), signature)
+            self._conn.commit()
+
+        metrics.increment("translation_memory_stored_total", value=len(translations))
+
+    def size(self) -> int:
+        """Number of stored segment translations"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
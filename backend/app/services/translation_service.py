@@ -1,42 +1,88 @@
 """
 Translation service using Gemini AI for context-aware translations
 """
+import asyncio
 import json
-from typing import Dict, Any
-from vertexai.generative_models import GenerativeModel
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
+from app.config import Config
 from app.prompts import PromptLoader
-from app.models.translation_models import TranslationResponse
+from app.services.model_backend import ModelBackend
+from app.services.model_executor import ModelExecutor
+from app.services.model_scheduler import estimate_tokens
+from app.services.translation_memory import TranslationMemory
+from app.models.translation_models import (
+    TranslationResponse,
+    CopyVariationInput,
+    PackedTranslationResponse,
+    SegmentTranslationResponse
+)
+from app.utils.metrics import metrics
+
+
+# Output tokens per translated language beyond the copy itself (JSON keys, language name)
+TRANSLATION_OVERHEAD_TOKENS = 40
+
+# Translations can run longer than the source text (e.g. German, Finnish)
+TRANSLATION_EXPANSION = 1.5
+
+# Sentence boundary inside body text: terminal punctuation followed by whitespace
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?\u3002\uff01\uff1f])\s+")
+
+
+def split_sentences(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Split body text into sentences and the separators between them
+
+    Returns:
+        (sentences, separators) with len(separators) == len(sentences) - 1,
+        so the text can be rebuilt with its original line breaks
+    """
+    sentences, separators = [], []
+    last = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        sentences.append(text[last:match.start()])
+        separators.append(match.group())
+        last = match.end()
+    sentences.append(text[last:])
+    return sentences, separators
 
 
 class TranslationService:
     """Service for translating copy text using Gemini AI with context maintenance"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        backend: ModelBackend,
+        executor: ModelExecutor,
+        memory: Optional[TranslationMemory] = None
+    ):
         self.model_name = 'gemini-2.5-pro'
-        self.model = None
-
-    def _get_model(self) -> GenerativeModel:
-        """Lazy load the model when needed"""
-        if self.model is None:
-            self.model = GenerativeModel(self.model_name)
-        return self.model
+        self.backend = backend
+        self.executor = executor
+        self.memory = memory
 
     async def translate_copy(
         self,
         headline: str,
         body_text: str,
         call_to_action: str,
-        target_language: str
+        target_language: str,
+        brand: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Translate structured copy to target language while maintaining context
 
+        With a translation memory configured, only segments that have not
+        been translated before are sent to the model.
+
         Args:
             headline: The headline text to be translated
             body_text: The body text to be translated
             call_to_action: The call to action text to be translated
             target_language: The target language for translation
+            brand: Brand the copy belongs to (scopes translation memory reuse)
 
         Returns:
             Dictionary with translated_copy structure and translated_to fields
@@ -44,6 +90,13 @@ class TranslationService:
         Raises:
             ValueError: If translation fails
         """
+        if self.memory is not None:
+            variation = CopyVariationInput(headline=headline, body_text=body_text, call_to_action=call_to_action)
+            item = (await self._translate_with_memory(variation, [target_language], brand))[0]
+            if item["error"]:
+                raise ValueError(item["error"])
+            return {"translated_copy": item["translated_copy"], "translated_to": item["translated_to"]}
+
         # Load prompt template
         prompt = PromptLoader.load(
             "translation",
@@ -54,24 +107,360 @@ class TranslationService:
         )
 
         try:
-            model = self._get_model()
-
-            # Generate translation with JSON response
-            response = model.generate_content(
-                prompt,
-                generation_config={
-                    "response_mime_type": "application/json"
-                }
+            # Generate translation with JSON response, parsed and validated with Pydantic
+            validated_response = await self.executor.call_model(
+                self.model_name,
+                lambda: self.backend.generate_content(
+                    self.model_name,
+                    prompt,
+                    response_mime_type="application/json",
+                    task="translation"
+                ),
+                estimated_tokens=estimate_tokens(prompt),
+                parse=lambda response: TranslationResponse.model_validate(json.loads(response.text)),
+                hedge=True
             )
 
-            # Parse and validate the response using Pydantic
-            raw_result = json.loads(response.text)
-
-            # Validate and convert to our Pydantic model
-            validated_response = TranslationResponse.model_validate(raw_result)
-
             # Return as dict for the API response
             return validated_response.model_dump(mode='json', by_alias=False)
 
         except Exception as e:
             raise ValueError(f"Error translating copy: {str(e)}")
+
+    def _plan_batches(
+        self,
+        variations: List[CopyVariationInput],
+        target_languages: List[str]
+    ) -> List[Tuple[CopyVariationInput, List[str]]]:
+        """
+        Split the work into (variation, languages) groups, one model call each
+
+        Each call carries one variation and as many languages as fit the
+        output token budget, up to the configured per-prompt maximum.
+        """
+        batches = []
+        for variation in variations:
+            copy_tokens = estimate_tokens([variation.headline, variation.body_text, variation.call_to_action])
+            per_language = int(copy_tokens * TRANSLATION_EXPANSION) + TRANSLATION_OVERHEAD_TOKENS
+            group_size = max(1, min(
+                Config.TRANSLATION_BATCH_MAX_LANGUAGES,
+                Config.TRANSLATION_BATCH_OUTPUT_TOKENS // per_language
+            ))
+            for start in range(0, len(target_languages), group_size):
+                batches.append((variation, target_languages[start:start + group_size]))
+        return batches
+
+    @staticmethod
+    def _failed_items(variation: CopyVariationInput, languages: List[str], error: str) -> List[Dict[str, Any]]:
+        return [
+            {"variation_number": variation.variation_number, "translated_to": language,
+             "translated_copy": None, "error": error}
+            for language in languages
+        ]
+
+    async def _translate_with_memory(
+        self,
+        variation: CopyVariationInput,
+        languages: List[str],
+        brand: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Translate one variation into several languages, reusing translation memory
+
+        The copy is split into segments (headline, each body sentence, call
+        to action). Segments with an exact match in memory are reused as-is;
+        the rest are translated in a single prompt, with the reused segments
+        and fuzzy matches supplied as reference translations. New segment
+        translations are written back to memory.
+        """
+        sentences, separators = split_sentences(variation.body_text)
+        unique_segments = list(dict.fromkeys(
+            segment for segment in [variation.headline, *sentences, variation.call_to_action] if segment.strip()
+        ))
+        segment_ids = {segment: index + 1 for index, segment in enumerate(unique_segments)}
+
+        lookups = await asyncio.gather(*(
+            self.executor.run_blocking(
+                ModelExecutor.IO, self.memory.lookup, unique_segments, language, brand,
+                Config.TRANSLATION_MEMORY_FUZZY_THRESHOLD
+            )
+            for language in languages
+        ))
+        translated = {language: dict(exact) for language, (exact, _) in zip(languages, lookups)}
+        pending = {
+            language: [segment for segment in unique_segments if segment not in translated[language]]
+            for language in languages
+        }
+        pending_languages = [language for language in languages if pending[language]]
+
+        reused = sum(len(translated[language]) for language in languages)
+        metrics.increment("translation_segments_total", value=reused, source="memory")
+        metrics.increment(
+            "translation_segments_total",
+            value=sum(len(pending[language]) for language in languages),
+            source="model"
+        )
+
+        if pending_languages:
+            references = []
+            for language, (exact, fuzzy) in zip(languages, lookups):
+                if language not in pending_languages:
+                    continue
+                for source, target in exact.items():
+                    references.append(f"- {language} (approved): \"{source}\" -> \"{target}\"")
+                for matches in fuzzy.values():
+                    for match in matches:
+                        references.append(
+                            f"- {language} (similar, {match.similarity:.0%}): \"{match.source}\" -> \"{match.target}\""
+                        )
+
+            prompt = PromptLoader.load(
+                "segment_translation",
+                headline=variation.headline,
+                body_text=variation.body_text,
+                call_to_action=variation.call_to_action,
+                segments="\n".join(f"[{segment_ids[segment]}] {segment}" for segment in unique_segments),
+                assignments="\n".join(
+                    f"{language}: {', '.join(str(segment_ids[segment]) for segment in pending[language])}"
+                    for language in pending_languages
+                ),
+                references="\n".join(references) or "(none)"
+            )
+            expected_output = sum(
+                int(estimate_tokens(pending[language]) * TRANSLATION_EXPANSION) + TRANSLATION_OVERHEAD_TOKENS
+                for language in pending_languages
+            )
+
+            def parse(response) -> Dict[str, Dict[str, str]]:
+                """Map the response back to {language: {segment: translation}}, requiring every pending segment"""
+                entries = SegmentTranslationResponse.model_validate(json.loads(response.text)).translations
+                by_language = {entry.translated_to.strip().lower(): entry for entry in entries}
+                result = {}
+                for language in pending_languages:
+                    entry = by_language.get(language.strip().lower())
+                    by_id = {item.id: item.translation for item in entry.segments} if entry else {}
+                    missing = [segment for segment in pending[language] if not by_id.get(segment_ids[segment], "").strip()]
+                    if missing:
+                        raise ValueError(f"{len(missing)} segment(s) missing for {language}")
+                    result[language] = {segment: by_id[segment_ids[segment]].strip() for segment in pending[language]}
+                return result
+
+            try:
+                new_translations = await self.executor.call_model(
+                    self.model_name,
+                    lambda: self.backend.generate_content(
+                        self.model_name,
+                        prompt,
+                        response_mime_type="application/json",
+                        task="segment_translation"
+                    ),
+                    estimated_tokens=estimate_tokens(prompt) + expected_output,
+                    parse=parse,
+                    hedge=True
+                )
+            except Exception as e:
+                # Languages fully served from memory still succeed
+                error = f"Error translating copy: {str(e)}"
+                return [
+                    self._failed_items(variation, [language], error)[0] if language in pending_languages
+                    else self._assemble(variation, language, translated[language], sentences, separators)
+                    for language in languages
+                ]
+
+            for language, segments in new_translations.items():
+                translated[language].update(segments)
+                await self.executor.run_blocking(ModelExecutor.IO, self.memory.store, segments, language, brand)
+
+        return [
+            self._assemble(variation, language, translated[language], sentences, separators)
+            for language in languages
+        ]
+
+    @staticmethod
+    def _assemble(
+        variation: CopyVariationInput,
+        language: str,
+        translations: Dict[str, str],
+        sentences: List[str],
+        separators: List[str]
+    ) -> Dict[str, Any]:
+        """Rebuild a translated copy from its segment translations"""
+        def translate(segment: str) -> str:
+            return translations.get(segment, segment) if segment.strip() else segment
+
+        body_text = translate(sentences[0])
+        for separator, sentence in zip(separators, sentences[1:]):
+            body_text += separator + translate(sentence)
+
+        return {
+            "variation_number": variation.variation_number,
+            "translated_to": language,
+            "translated_copy": {
+                "headline": translate(variation.headline),
+                "body_text": body_text,
+                "call_to_action": translate(variation.call_to_action),
+            },
+            "error": None
+        }
+
+    async def _translate_single(
+        self,
+        variation: CopyVariationInput,
+        language: str,
+        brand: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Translate one variation into one language as a batch result item"""
+        try:
+            result = await self.translate_copy(
+                headline=variation.headline,
+                body_text=variation.body_text,
+                call_to_action=variation.call_to_action,
+                target_language=language,
+                brand=brand
+            )
+            return {
+                "variation_number": variation.variation_number,
+                "translated_to": language,
+                "translated_copy": result["translated_copy"],
+                "error": None
+            }
+        except Exception as e:
+            return {
+                "variation_number": variation.variation_number,
+                "translated_to": language,
+                "translated_copy": None,
+                "error": str(e)
+            }
+
+    async def _translate_packed(
+        self,
+        variation: CopyVariationInput,
+        languages: List[str],
+        brand: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Translate one variation into several languages with a single prompt"""
+        if self.memory is not None:
+            return await self._translate_with_memory(variation, languages, brand)
+        if len(languages) == 1:
+            return [await self._translate_single(variation, languages[0], brand)]
+
+        prompt = PromptLoader.load(
+            "batch_translation",
+            headline=variation.headline,
+            body_text=variation.body_text,
+            call_to_action=variation.call_to_action,
+            target_languages=", ".join(languages)
+        )
+        expected_output = len(languages) * (
+            int(estimate_tokens(variation.body_text) * TRANSLATION_EXPANSION) + TRANSLATION_OVERHEAD_TOKENS
+        )
+
+        try:
+            packed = await self.executor.call_model(
+                self.model_name,
+                lambda: self.backend.generate_content(
+                    self.model_name,
+                    prompt,
+                    response_mime_type="application/json",
+                    task="batch_translation"
+                ),
+                estimated_tokens=estimate_tokens(prompt) + expected_output,
+                parse=lambda response: PackedTranslationResponse.model_validate(json.loads(response.text)),
+                hedge=True
+            )
+        except Exception as e:
+            return self._failed_items(variation, languages, f"Error translating copy: {str(e)}")
+
+        by_language = {entry.translated_to.strip().lower(): entry for entry in packed.translations}
+        results = []
+        missing = []
+        for language in languages:
+            entry = by_language.get(language.strip().lower())
+            if entry is None:
+                missing.append(language)
+                continue
+            results.append({
+                "variation_number": variation.variation_number,
+                "translated_to": language,
+                "translated_copy": entry.translated_copy.model_dump(mode='json'),
+                "error": None
+            })
+
+        # Languages the model skipped are retried one by one
+        if missing:
+            results.extend(await asyncio.gather(*(
+                self._translate_single(variation, language, brand) for language in missing
+            )))
+        return results
+
+    async def stream_batch_translation(
+        self,
+        variations: List[CopyVariationInput],
+        target_languages: List[str],
+        brand: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Translate every variation into every language, yielding results as they complete
+
+        Languages are packed into as few prompts as the output budget allows
+        and all prompts run concurrently; the model scheduler keeps the fan-out
+        within the model's rate limits.
+
+        Args:
+            variations: Copy variations to translate
+            target_languages: Languages to translate into
+            brand: Brand the copy belongs to (scopes translation memory reuse)
+
+        Yields:
+            ("translation", item) for every variation and language as its prompt completes,
+            then ("complete", {"translations": [...]}) ordered by variation and language
+        """
+        # Drop blank and duplicate languages, keeping the first spelling
+        languages = []
+        seen = set()
+        for language in target_languages:
+            key = language.strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                languages.append(language.strip())
+        language_order = {language: index for index, language in enumerate(languages)}
+
+        tasks = [
+            asyncio.ensure_future(self._translate_packed(variation, group, brand))
+            for variation, group in self._plan_batches(variations, languages)
+        ]
+        results = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for item in await next_done:
+                    results.append(item)
+                    yield "translation", item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        results.sort(key=lambda item: (item["variation_number"], language_order.get(item["translated_to"], 0)))
+        yield "complete", {"translations": results}
+
+    async def translate_batch(
+        self,
+        variations: List[CopyVariationInput],
+        target_languages: List[str],
+        brand: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Translate every variation into every language
+
+        Args:
+            variations: Copy variations to translate
+            target_languages: Languages to translate into
+            brand: Brand the copy belongs to (scopes translation memory reuse)
+
+        Returns:
+            Dictionary with a translations list, one item per variation and language
+        """
+        result = {"translations": []}
+        async for event, data in self.stream_batch_translation(variations, target_languages, brand):
+            if event == "complete":
+                result = data
+        return result
@@ -1,42 +1,274 @@
 """
 File extraction utilities for PDF and DOCX files
 """
-from typing import Optional
-from PyPDF2 import PdfReader
-from docx import Document
-import io
+import asyncio
+import hashlib
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Union
+
+from app.config import Config
+from app.services.model_executor import ModelExecutor
+from app.utils.extractor_backends import (
+    DocumentExtractorBackend,
+    ExtractionDeadlineExceeded,
+    ExtractorBackend,
+    PagedExtractorBackend,
+    get_backend
+)
+from app.utils.metrics import metrics
+from app.utils.response_cache import ResponseCache
+
+# Bump when the shape of extraction results changes so cached results from older code are not reused
+# (backend output changes bump ExtractorBackend.version instead)
+EXTRACTOR_VERSION = "3"
+
+PDF_TYPE = "application/pdf"
+DOCX_TYPES = [
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/msword"
+]
+
+
+class UnreadableDocumentError(ValueError):
+    """The document could not be parsed (corrupt, encrypted, or not really of its declared type)"""
+
+
+class ExtractionLimitExceeded(ValueError):
+    """The document is larger or slower to extract than the page or time budget allows"""
+
+
+def _kind(content_type: str) -> str:
+    """Short document kind for metric labels and messages"""
+    return "pdf" if content_type == PDF_TYPE else "docx" if content_type in DOCX_TYPES else content_type
+
+
+class ExtractedDocument:
+    """Text of a document plus its page (PDF) or section (DOCX) structure"""
+
+    def __init__(self, text: str, pages: Optional[List[str]] = None, sections: Optional[List[Dict[str, Any]]] = None):
+        self.text = text
+        self.pages = pages or []
+        self.sections = sections or []  # [{"heading": str or None, "text": str}]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"text": self.text, "pages": self.pages, "sections": self.sections}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExtractedDocument":
+        return cls(data["text"], data.get("pages"), data.get("sections"))
+
+
+def default_backends() -> Dict[str, ExtractorBackend]:
+    """MIME type -> backend as selected by EXTRACTION_PDF_BACKEND / EXTRACTION_DOCX_BACKEND"""
+    docx_backend = get_backend(Config.EXTRACTION_DOCX_BACKEND)
+    return {PDF_TYPE: get_backend(Config.EXTRACTION_PDF_BACKEND), **{mime: docx_backend for mime in DOCX_TYPES}}
 
 
 class FileExtractor:
-    """Extract text content from various file formats"""
+    """
+    Extract text content from various file formats
 
-    @staticmethod
-    async def extract_from_pdf(file_content: bytes) -> str:
-        """
-        Extract text from PDF file
+    Each supported MIME type maps to an ExtractorBackend (see
+    extractor_backends). Parsing is CPU-bound, so backends run in a
+    process pool and never on the event loop. Paged backends (PDF) are
+    called on page ranges of `pages_per_shard` that are extracted in
+    parallel and reassembled in page order; the first shard also reports
+    the page count, so small documents take a single round trip. Each
+    document has a page budget (larger files are rejected before any
+    further shard is scheduled) and a time budget (workers stop at the
+    next page boundary once it has passed).
 
+    With a cache, results are keyed by the SHA-256 of the file, the
+    backend and EXTRACTOR_VERSION, so a repeated upload skips parsing
+    entirely. A cache with a disk tier in a host-wide directory is shared
+    by every worker process on the host.
+
+    A worker that dies (crash, OOM kill) breaks the whole pool; the pool is
+    then rebuilt and the task retried once. A document that runs out of
+    time may still occupy workers (a single page can hang the parser), so
+    on timeout the pool's workers are terminated and the pool is replaced;
+    tasks of other documents interrupted by that are retried on the new pool.
+    """
+
+    def __init__(
+        self,
+        executor: ModelExecutor,
+        max_workers: int = Config.EXTRACTION_WORKERS,
+        pages_per_shard: int = Config.EXTRACTION_PAGES_PER_SHARD,
+        max_pages: int = Config.EXTRACTION_MAX_PAGES,
+        timeout: float = Config.EXTRACTION_TIMEOUT,
+        max_tasks_per_child: int = Config.EXTRACTION_MAX_TASKS_PER_CHILD,
+        cache: Optional[ResponseCache] = None,
+        backends: Optional[Dict[str, Union[str, ExtractorBackend]]] = None
+    ):
+        """
         Args:
-            file_content: PDF file content as bytes
+            executor: Model executor whose IO pool runs hashing and cache lookups
+            max_workers: Worker processes in the extraction pool
+            pages_per_shard: Pages extracted per pool task
+            max_pages: Largest page count accepted per document
+            timeout: Seconds a single document may take
+            max_tasks_per_child: Tasks after which a worker process is replaced
+                (bounds memory growth from parser caches)
+            cache: Optional cache of extraction results
+            backends: MIME type -> backend (or registered backend name);
+                defaults to the backends selected in Config
 
-        Returns:
-            Extracted text content
+        Raises:
+            ValueError: If a backend name is not registered
         """
+        self.executor = executor
+        self.pages_per_shard = max(1, pages_per_shard)
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.cache = cache
+        self.backends = {
+            mime: get_backend(backend) if isinstance(backend, str) else backend
+            for mime, backend in (default_backends() if backends is None else backends).items()
+        }
+        self.max_workers = max_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self._lookups = 0
+        self._hits = 0
+        self._pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # Spawned (not forked) workers: the API process runs threads and SDK clients that must not be copied
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=self.max_tasks_per_child or None
+        )
+
+    def _replace_pool(self, pool: ProcessPoolExecutor, reason: str):
+        """Swap in a fresh pool and kill the workers of the old one"""
+        if self._pool is not pool:
+            return  # Another task already replaced it
+        self._pool = self._new_pool()
+        # Workers busy on a hung page would never pick up a shutdown request
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        metrics.increment("extraction_pool_restarts_total", reason=reason)
+
+    @property
+    def supported_types(self) -> List[str]:
+        """MIME types that have a backend"""
+        return list(self.backends)
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            return await loop.run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            self._replace_pool(pool, reason="broken")
+            return await loop.run_in_executor(self._pool, fn, *args)
+
+    async def _extract_paged(self, backend: PagedExtractorBackend, file_content: bytes, kind: str) -> ExtractedDocument:
+        """
+        Extract a document shard by shard with a paged backend
+
+        Raises:
+            UnreadableDocumentError: If the document cannot be parsed
+            ExtractionLimitExceeded: If the document exceeds the page or time budget
+            BrokenProcessPool: If the pool broke again after being rebuilt
+        """
+        started = time.monotonic()
+        deadline = time.time() + self.timeout
+        label = kind.upper()
+        pool = self._pool
+        pending: List[asyncio.Future] = []
         try:
-            pdf_file = io.BytesIO(file_content)
-            pdf_reader = PdfReader(pdf_file)
+            page_count, first = await asyncio.wait_for(
+                self._run(backend.extract_pages, file_content, 0, self.pages_per_shard, deadline),
+                timeout=self.timeout
+            )
+            if page_count > self.max_pages:
+                metrics.increment("extraction_rejected_total", reason="pages")
+                raise ExtractionLimitExceeded(
+                    f"{label} has {page_count} pages; at most {self.max_pages} pages can be extracted"
+                )
+
+            pending = [
+                asyncio.ensure_future(
+                    self._run(backend.extract_pages, file_content, start, start + self.pages_per_shard, deadline)
+                )
+                for start in range(self.pages_per_shard, page_count, self.pages_per_shard)
+            ]
+            remaining = max(0.0, deadline - time.time())
+            shards = await asyncio.wait_for(asyncio.gather(*pending), timeout=remaining) if pending else []
+        except (asyncio.TimeoutError, ExtractionDeadlineExceeded) as e:
+            for future in pending:
+                future.cancel()  # Shards not yet started are dropped
+            if isinstance(e, asyncio.TimeoutError):
+                # Running shards did not reach a page boundary in time and may be stuck in one page
+                self._replace_pool(pool, reason="timeout")
+            metrics.increment("extraction_rejected_total", reason="timeout")
+            raise ExtractionLimitExceeded(f"{label} extraction exceeded the {self.timeout:g} second budget")
+        except (ExtractionLimitExceeded, BrokenProcessPool):
+            raise
+        except Exception as e:
+            raise UnreadableDocumentError(f"Failed to extract text from {label}: {str(e)}")
 
-            text_content = []
-            for page in pdf_reader.pages:
-                text = page.extract_text()
-                if text:
-                    text_content.append(text)
+        texts = first + [text for _, shard in shards for text in shard]
+        metrics.increment("extraction_pages_total", value=page_count, type=kind)
+        metrics.increment("extraction_shards_total", value=1 + len(pending), type=kind)
+        metrics.observe("extraction_seconds", time.monotonic() - started, type=kind, backend=backend.name)
+        return ExtractedDocument("\n\n".join(text for text in texts if text), pages=texts)
 
-            return "\n\n".join(text_content)
+    async def _extract_whole(self, backend: DocumentExtractorBackend, file_content: bytes, kind: str) -> ExtractedDocument:
+        """
+        Extract a document in a single pool task
+
+        Raises:
+            UnreadableDocumentError: If the document cannot be parsed
+            ExtractionLimitExceeded: If the document exceeds the time budget
+            BrokenProcessPool: If the pool broke again after being rebuilt
+        """
+        started = time.monotonic()
+        label = kind.upper()
+        pool = self._pool
+        try:
+            extracted = await asyncio.wait_for(self._run(backend.extract, file_content), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self._replace_pool(pool, reason="timeout")  # The worker is still busy with the document
+            metrics.increment("extraction_rejected_total", reason="timeout")
+            raise ExtractionLimitExceeded(f"{label} extraction exceeded the {self.timeout:g} second budget")
+        except BrokenProcessPool:
+            raise
         except Exception as e:
-            raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+            raise UnreadableDocumentError(f"Failed to extract text from {label}: {str(e)}")
+
+        metrics.observe("extraction_seconds", time.monotonic() - started, type=kind, backend=backend.name)
+        return ExtractedDocument(extracted["text"], sections=extracted.get("sections"))
+
+    async def _extract_uncached(self, file_content: bytes, content_type: str) -> ExtractedDocument:
+        backend = self.backends[content_type]
+        kind = _kind(content_type)
+        if isinstance(backend, PagedExtractorBackend):
+            return await self._extract_paged(backend, file_content, kind)
+        return await self._extract_whole(backend, file_content, kind)
+
+    async def extract_from_pdf(self, file_content: bytes) -> ExtractedDocument:
+        """
+        Extract text from PDF file
 
-    @staticmethod
-    async def extract_from_docx(file_content: bytes) -> str:
+        Args:
+            file_content: PDF file content as bytes
+
+        Returns:
+            Extracted text content with the text of each page
+
+        Raises:
+            ValueError: If the PDF cannot be parsed or exceeds the page or time budget
+        """
+        return await self._extract_uncached(file_content, PDF_TYPE)
+
+    async def extract_from_docx(self, file_content: bytes) -> ExtractedDocument:
         """
         Extract text from DOCX file
 
@@ -44,30 +276,48 @@ class FileExtractor:
             file_content: DOCX file content as bytes
 
         Returns:
-            Extracted text content
+            Extracted text content with its heading-delimited sections
+
+        Raises:
+            ValueError: If the document cannot be parsed or exceeds the time budget
         """
-        try:
-            docx_file = io.BytesIO(file_content)
-            doc = Document(docx_file)
-
-            text_content = []
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_content.append(paragraph.text)
-
-            # Also extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            text_content.append(cell.text)
-
-            return "\n\n".join(text_content)
-        except Exception as e:
-            raise ValueError(f"Failed to extract text from DOCX: {str(e)}")
+        return await self._extract_uncached(file_content, DOCX_TYPES[0])
 
-    @staticmethod
-    async def extract_text(file_content: bytes, content_type: str) -> str:
+    async def extract_document(self, file_content: bytes, content_type: str) -> ExtractedDocument:
+        """
+        Extract text and structure from a file, using the cache when available
+
+        Args:
+            file_content: File content as bytes
+            content_type: MIME type of the file
+
+        Returns:
+            Extracted document
+        """
+        backend = self.backends.get(content_type)
+        if backend is None:
+            raise ValueError(f"Unsupported file type: {content_type}")
+
+        if self.cache is None:
+            return await self._extract_uncached(file_content, content_type)
+
+        kind = _kind(content_type)
+        digest = await self.executor.run_blocking(ModelExecutor.IO, lambda: hashlib.sha256(file_content).hexdigest())
+        key = ResponseCache.make_key(digest, kind, backend.name, backend.version, EXTRACTOR_VERSION)
+        cached = await self.executor.run_blocking(ModelExecutor.IO, self.cache.get, key)
+        self._lookups += 1
+        if cached is not None:
+            self._hits += 1
+            metrics.increment("extraction_cache_bytes_saved_total", value=len(file_content), type=kind)
+            metrics.set_gauge("extraction_cache_hit_ratio", self._hits / self._lookups)
+            return ExtractedDocument.from_dict(cached)
+        metrics.set_gauge("extraction_cache_hit_ratio", self._hits / self._lookups)
+
+        document = await self._extract_uncached(file_content, content_type)
+        await self.executor.run_blocking(ModelExecutor.IO, self.cache.set, key, document.to_dict())
+        return document
+
+    async def extract_text(self, file_content: bytes, content_type: str) -> str:
         """
         Extract text from file based on content type
 
@@ -78,12 +328,8 @@ class FileExtractor:
         Returns:
             Extracted text content
         """
-        if content_type == "application/pdf":
-            return await FileExtractor.extract_from_pdf(file_content)
-        elif content_type in [
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            "application/msword"
-        ]:
-            return await FileExtractor.extract_from_docx(file_content)
-        else:
-            raise ValueError(f"Unsupported file type: {content_type}")
+        return (await self.extract_document(file_content, content_type)).text
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
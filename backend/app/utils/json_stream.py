@@ -0,0 +1,158 @@
+"""
+Incremental JSON parsing for streamed model output
+"""
+import json
+from typing import Any, List, Optional, Tuple, Union
+
+PathItem = Union[str, int]
+Path = Tuple[PathItem, ...]
+
+
+class _Container:
+    """An open object or array and the key/index of the value currently being read"""
+
+    def __init__(self, kind: str, start: int):
+        self.kind = kind
+        self.start = start
+        self.key: Optional[PathItem] = 0 if kind == "array" else None
+        self.expect_key = kind == "object"
+
+
+class JsonStreamParser:
+    """
+    Parses a JSON document fed in arbitrary chunks and reports every value
+    as soon as it is complete, together with its path in the document.
+
+    Only values at most `max_depth` levels deep are decoded and reported,
+    so a caller interested in top-level fields does not pay for decoding
+    every nested string. Text before the opening bracket (e.g. a Markdown
+    code fence) and after the closing one is ignored.
+
+    Example:
+        parser = JsonStreamParser(max_depth=1)
+        parser.feed('{"brand_name": {"value": "Ac')   # -> []
+        parser.feed('me"}, "key')                     # -> [(("brand_name",), {"value": "Acme"})]
+    """
+
+    def __init__(self, max_depth: Optional[int] = None):
+        self.max_depth = max_depth
+        self._text = ""
+        self._pos = 0
+        self._stack: List[_Container] = []
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._string_is_key = False
+        self._scalar_start: Optional[int] = None
+        self._result: Any = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the top-level value has been closed"""
+        return self._done
+
+    def result(self) -> Any:
+        """
+        The decoded top-level value
+
+        Raises:
+            ValueError: If the document has not been closed yet
+        """
+        if not self._done:
+            raise ValueError("Incomplete JSON document")
+        return self._result
+
+    def _path(self) -> Path:
+        return tuple(container.key for container in self._stack)
+
+    def _complete(self, start: int, end: int, completed: List[Tuple[Path, Any]]):
+        """Record the value spanning text[start:end] at the current path"""
+        path = self._path()
+        if self.max_depth is None or len(path) <= self.max_depth:
+            value = json.loads(self._text[start:end])
+            if not path:
+                self._result = value
+            completed.append((path, value))
+
+    def feed(self, chunk: str) -> List[Tuple[Path, Any]]:
+        """
+        Consume the next chunk of the document
+
+        Args:
+            chunk: Next piece of JSON text
+
+        Returns:
+            (path, value) pairs for every value completed by this chunk, innermost first
+        """
+        self._text += chunk
+        completed: List[Tuple[Path, Any]] = []
+        text = self._text
+
+        while self._pos < len(text) and not self._done:
+            i = self._pos
+            c = text[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        self._stack[-1].key = json.loads(text[self._string_start:i + 1])
+                    else:
+                        self._complete(self._string_start, i + 1, completed)
+                continue
+
+            if self._scalar_start is not None:
+                if c not in ",}] \t\r\n":
+                    continue
+                self._complete(self._scalar_start, i, completed)
+                self._scalar_start = None
+
+            if not self._started:
+                if c in "{[":
+                    self._started = True
+                else:
+                    continue  # Skip leading fences or prose
+
+            if c in " \t\r\n":
+                continue
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+                self._string_is_key = bool(self._stack) and self._stack[-1].expect_key
+            elif c in "{[":
+                self._stack.append(_Container("object" if c == "{" else "array", i))
+            elif c in "}]":
+                container = self._stack.pop()
+                self._complete(container.start, i + 1, completed)
+                if not self._stack:
+                    self._done = True
+            elif c == ":":
+                self._stack[-1].expect_key = False
+            elif c == ",":
+                container = self._stack[-1]
+                if container.kind == "object":
+                    container.expect_key = True
+                else:
+                    container.key += 1
+            else:
+                self._scalar_start = i
+
+        return completed
+
+
+def format_path(path: Path) -> str:
+    """Render a parser path as dotted keys with bracketed indexes, e.g. target_audience.demographics or [0]"""
+    rendered = ""
+    for item in path:
+        if isinstance(item, int):
+            rendered += f"[{item}]"
+        else:
+            rendered += f".{item}" if rendered else item
+    return rendered
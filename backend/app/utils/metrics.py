@@ -0,0 +1,105 @@
+"""
+In-process metrics collection exposed through the /metrics endpoint
+"""
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+
+class _Summary:
+    """Running summary of observed values with a bounded sample window for quantiles"""
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "avg": round(self.total / self.count, 6) if self.count else 0.0,
+            "p50": round(self.quantile(0.50), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "p99": round(self.quantile(0.99), 6),
+            "max": round(self.max, 6),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters, gauges and summaries keyed by name and labels"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._gauges: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._summaries: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], _Summary] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def increment(self, name: str, value: float = 1, **labels):
+        """Add to a counter"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Set a gauge to its current value"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record an observation (latency, size, ...) in a summary"""
+        key = self._key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = _Summary()
+            summary.observe(value)
+
+    def get_counter(self, name: str, **labels) -> float:
+        """Read the current value of a counter"""
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0)
+
+    def quantile(self, name: str, q: float, **labels) -> float:
+        """Read a quantile of a summary, 0.0 if nothing was observed yet"""
+        with self._lock:
+            summary = self._summaries.get(self._key(name, labels))
+            return summary.quantile(q) if summary else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Export every metric as a JSON-serializable dictionary"""
+        def render(store, convert):
+            result: Dict[str, list] = {}
+            for (name, labels), value in sorted(store.items(), key=lambda item: item[0]):
+                result.setdefault(name, []).append({"labels": dict(labels), "value": convert(value)})
+            return result
+
+        with self._lock:
+            return {
+                "counters": render(self._counters, lambda v: v),
+                "gauges": render(self._gauges, lambda v: v),
+                "summaries": render(self._summaries, lambda v: v.to_dict()),
+            }
+
+
+# Process-wide metrics registry
+metrics = MetricsRegistry()
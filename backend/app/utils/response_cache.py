@@ -0,0 +1,228 @@
+"""
+Content-addressed response cache with an in-memory LRU tier and an optional disk tier
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.utils.metrics import metrics
+
+
+class ResponseCache:
+    """
+    Two-tier cache for JSON-serializable model responses.
+
+    The memory tier is a bounded LRU. The optional disk tier stores one JSON
+    file per key under `directory/<name>/`, expires entries after `ttl`
+    seconds and evicts the least recently written files once the tier
+    exceeds `max_bytes`. Disk hits are promoted to the memory tier.
+    Several processes may share a directory: entries written by another
+    process are picked up on lookup, and the size limit applies to the
+    directory as a whole: with `max_bytes` set, every write rescans the
+    directory before evicting, so other processes' writes and deletions
+    are counted. Writes follow a model call or a document extraction, so
+    the scan is small next to the work that produced the entry.
+
+    Methods are blocking (the disk tier does file IO); async callers run
+    them on the IO pool.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 256,
+        directory: Optional[str] = None,
+        ttl: float = 0,
+        max_bytes: int = 0
+    ):
+        """
+        Args:
+            name: Cache name, used for metric labels and the disk subdirectory
+            max_entries: Capacity of the memory tier (0 disables it)
+            directory: Root directory of the disk tier (None disables it)
+            ttl: Disk entry lifetime in seconds (0 = no expiry)
+            max_bytes: Disk tier size limit in bytes (0 = unlimited)
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.directory = os.path.join(directory, name) if directory else None
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._disk_index: Optional[Dict[str, Tuple[float, int]]] = None  # key -> (mtime, size)
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Hash the parts identifying a response into a cache key"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x1f")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for a key, or None on a miss"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                metrics.increment("cache_hits_total", cache=self.name, tier="memory")
+                return self._memory[key]
+
+            value = self._disk_get(key) if self.directory else None
+            if value is not None:
+                metrics.increment("cache_hits_total", cache=self.name, tier="disk")
+                self._memory_set(key, value)
+                return value
+
+        metrics.increment("cache_misses_total", cache=self.name)
+        return None
+
+    def set(self, key: str, value: Any):
+        """Store a value in every enabled tier"""
+        with self._lock:
+            self._memory_set(key, value)
+            if self.directory:
+                self._disk_set(key, value)
+
+    def invalidate(self, key: str):
+        """Drop a key from every tier"""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self.directory:
+                self._load_disk_index()
+                self._disk_remove(key)
+            self._publish()
+
+    def _publish(self):
+        metrics.set_gauge("cache_entries", len(self._memory), cache=self.name, tier="memory")
+        if self._disk_index is not None:
+            metrics.set_gauge("cache_entries", len(self._disk_index), cache=self.name, tier="disk")
+            metrics.set_gauge("cache_disk_bytes", self._disk_bytes, cache=self.name)
+
+    def _memory_set(self, key: str, value: Any):
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            metrics.increment("cache_evictions_total", cache=self.name, tier="memory", reason="size")
+        self._publish()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _load_disk_index(self):
+        """Scan the disk tier once to learn the size and age of existing entries"""
+        if self._disk_index is not None:
+            return
+        self._disk_index = {}
+        self._disk_bytes = 0
+        if not os.path.isdir(self.directory):
+            return
+        for root, _, files in os.walk(self.directory):
+            for file_name in files:
+                if not file_name.endswith(".json"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, file_name))
+                except OSError:
+                    continue  # Removed by another process since the listing
+                self._disk_index[file_name[:-5]] = (stat.st_mtime, stat.st_size)
+                self._disk_bytes += stat.st_size
+
+    def _rescan_disk(self):
+        """Rebuild the index from the directory, including other processes' writes and deletions"""
+        self._disk_index = None
+        self._load_disk_index()
+
+    def _adopt(self, key: str) -> Optional[Tuple[float, int]]:
+        """Index an entry written by another process sharing the directory"""
+        try:
+            stat = os.stat(self._path(key))
+        except OSError:
+            return None
+        entry = (stat.st_mtime, stat.st_size)
+        self._disk_index[key] = entry
+        self._disk_bytes += stat.st_size
+        return entry
+
+    def _disk_remove(self, key: str):
+        entry = self._disk_index.pop(key, None)
+        if entry is not None:
+            self._disk_bytes -= entry[1]
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _expired(self, mtime: float) -> bool:
+        return self.ttl > 0 and time.time() - mtime > self.ttl
+
+    def _disk_get(self, key: str) -> Optional[Any]:
+        self._load_disk_index()
+        entry = self._disk_index.get(key)
+        if entry is None:
+            entry = self._adopt(key)
+            if entry is None:
+                return None
+        if self._expired(entry[0]):
+            self._disk_remove(key)
+            metrics.increment("cache_evictions_total", cache=self.name, tier="disk", reason="ttl")
+            self._publish()
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            self._disk_remove(key)  # Missing or corrupt file: treat as a miss
+            return None
+
+    def _disk_set(self, key: str, value: Any):
+        self._load_disk_index()
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+        self._disk_remove_index_only(key)
+        size = os.path.getsize(path)
+        self._disk_index[key] = (time.time(), size)
+        self._disk_bytes += size
+        self._evict_disk()
+        self._publish()
+
+    def _disk_remove_index_only(self, key: str):
+        entry = self._disk_index.pop(key, None)
+        if entry is not None:
+            self._disk_bytes -= entry[1]
+
+    def _evict_disk(self):
+        """Drop expired entries, then the oldest ones until the tier fits in max_bytes"""
+        if self.max_bytes > 0:
+            # Evict based on what is actually on disk: the index misses other processes' changes
+            self._rescan_disk()
+
+        for key, (mtime, _) in list(self._disk_index.items()):
+            if self._expired(mtime):
+                self._disk_remove(key)
+                metrics.increment("cache_evictions_total", cache=self.name, tier="disk", reason="ttl")
+
+        if self.max_bytes <= 0 or self._disk_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self._disk_index.items(), key=lambda item: item[1][0]):
+            if self._disk_bytes <= self.max_bytes:
+                break
+            self._disk_remove(key)
+            metrics.increment("cache_evictions_total", cache=self.name, tier="disk", reason="size")
@@ -0,0 +1,45 @@
+"""
+Server-Sent Events helpers for streaming endpoints
+"""
+import json
+from typing import Any, AsyncIterator, Tuple
+
+from fastapi.responses import StreamingResponse
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one event in the text/event-stream wire format with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def event_stream_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """
+    Stream (event, data) pairs to the client as Server-Sent Events
+
+    Headers go out immediately with an opening comment so clients and
+    proxies see the stream start before the first model chunk arrives.
+    An exception raised by the producer is reported as a final `error`
+    event, since the HTTP status has already been sent.
+
+    Args:
+        events: Async iterator of (event name, JSON-serializable payload)
+
+    Returns:
+        StreamingResponse with media type text/event-stream
+    """
+    async def body():
+        yield ": stream opened\n\n"
+        try:
+            async for event, data in events:
+                yield format_sse(event, data)
+        except Exception as e:
+            yield format_sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering (nginx, Cloud Run front ends)
+        }
+    )
@@ -0,0 +1,268 @@
+"""
+Benchmark the document extractor backends on a generated corpus of sample briefs
+
+Usage:
+    python benchmark_extraction.py [--pages 1,10,50,200] [--repeat 3] [--backends pypdf2,docx-xml] [--json]
+
+Every document in the corpus is a synthetic campaign brief with body
+text, a table and an image per few pages, in PDF and DOCX form. Each
+backend runs in its own fresh process, so its peak RSS is not inflated by
+the other backends. For each backend and document the harness reports
+pages/sec, extracted character count and peak RSS (next to the
+process's RSS before the first document, to separate the interpreter's
+footprint from the backend's).
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import zlib
+from typing import Any, Dict, List
+
+from PIL import Image as PILImage
+from docx import Document
+from docx.shared import Inches
+
+from app.utils.extractor_backends import BACKENDS, ExtractorBackend, PagedExtractorBackend
+from app.utils.file_extractor import PDF_TYPE, DOCX_TYPES
+
+DOCX_TYPE = DOCX_TYPES[0]
+
+# ExtractorBackend.kind -> MIME type of the corpus documents it is benchmarked on
+KIND_TYPES = {"pdf": PDF_TYPE, "docx": DOCX_TYPE}
+
+SENTENCES = [
+    "The campaign introduces a limited-edition flavour to urban fitness enthusiasts aged 18 to 34.",
+    "Creative should feel playful and energetic while staying true to the brand's premium positioning.",
+    "Influencer partners will publish short-form video and carousel posts across Instagram and YouTube.",
+    "Key performance indicators are trial rate, saved posts and the share of branded search.",
+    "All assets must carry the product shot, the tagline and the legal line on the final frame.",
+    "Retail partners receive point-of-sale kits two weeks before launch to align in-store visibility.",
+]
+
+TABLE_ROWS = [
+    ("Channel", "Format", "Budget"),
+    ("Instagram", "Reels, carousels", "40%"),
+    ("YouTube", "Shorts, pre-roll", "35%"),
+    ("Retail", "Point of sale", "25%"),
+]
+
+PARAGRAPHS_PER_PAGE = 6
+# Every page with (page number % N == 0) also carries a table and an image
+RICH_PAGE_INTERVAL = 3
+
+
+def _paragraph(page: int, index: int) -> str:
+    start = (page + index) % len(SENTENCES)
+    return " ".join(SENTENCES[(start + i) % len(SENTENCES)] for i in range(3))
+
+
+def _sample_image(page: int) -> PILImage.Image:
+    return PILImage.radial_gradient("L").resize((160, 120)).convert("RGB").rotate(page * 17)
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str, width: int = 95) -> List[str]:
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + len(word) + 1 > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    return lines + ([line] if line else [])
+
+
+def make_pdf(pages: int) -> bytes:
+    """A brief of `pages` pages: text on every page, a table and an image on every third"""
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(b"")
+    kids = []
+    for page in range(pages):
+        commands = [f"BT /F1 16 Tf 50 800 Td (Campaign brief - section {page + 1}) Tj ET"]
+        y = 770
+        for index in range(PARAGRAPHS_PER_PAGE):
+            for line in _wrap(_paragraph(page, index)):
+                commands.append(f"BT /F1 9 Tf 50 {y} Td ({_pdf_escape(line)}) Tj ET")
+                y -= 11
+            y -= 6
+
+        resources = f"/Font << /F1 {font} 0 R >>"
+        if page % RICH_PAGE_INTERVAL == 0:
+            # Table: ruled grid with one text run per cell
+            for row, cells in enumerate(TABLE_ROWS):
+                top = y - row * 18
+                commands.append(f"50 {top - 14} 480 18 re S")
+                for column, cell in enumerate(cells):
+                    commands.append(f"BT /F1 9 Tf {56 + column * 160} {top - 9} Td ({_pdf_escape(cell)}) Tj ET")
+            y -= len(TABLE_ROWS) * 18 + 140
+            image = _sample_image(page)
+            pixels = zlib.compress(image.tobytes())
+            image_id = add(
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+                b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n"
+                % (image.width, image.height, len(pixels)) + pixels + b"\nendstream"
+            )
+            commands.append(f"q 160 0 0 120 50 {y} cm /Im1 Do Q")
+            resources += f" /XObject << /Im1 {image_id} 0 R >>"
+
+        stream = "\n".join(commands).encode("latin-1")
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 595 842] "
+            f"/Contents {content} 0 R /Resources << {resources} >> >>".encode()
+        ))
+
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)
+    )
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    return bytes(output)
+
+
+def make_docx(pages: int) -> bytes:
+    """The DOCX counterpart of make_pdf: a heading per page, page breaks between pages"""
+    document = Document()
+    document.add_heading("Campaign brief", level=0)
+    for page in range(pages):
+        document.add_heading(f"Section {page + 1}", level=1)
+        for index in range(PARAGRAPHS_PER_PAGE):
+            document.add_paragraph(_paragraph(page, index))
+        if page % RICH_PAGE_INTERVAL == 0:
+            table = document.add_table(rows=len(TABLE_ROWS), cols=len(TABLE_ROWS[0]))
+            for row, cells in enumerate(TABLE_ROWS):
+                for column, cell in enumerate(cells):
+                    table.cell(row, column).text = cell
+            picture = io.BytesIO()
+            _sample_image(page).save(picture, format="PNG")
+            picture.seek(0)
+            document.add_picture(picture, width=Inches(2))
+        if page < pages - 1:
+            document.add_page_break()
+
+    output = io.BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+
+def build_corpus(page_counts: List[int]) -> List[Dict[str, Any]]:
+    corpus = []
+    for pages in page_counts:
+        corpus.append({"name": f"brief-{pages}p.pdf", "type": PDF_TYPE, "pages": pages, "content": make_pdf(pages)})
+        corpus.append({"name": f"brief-{pages}p.docx", "type": DOCX_TYPE, "pages": pages, "content": make_docx(pages)})
+    return corpus
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+def _extract(backend: ExtractorBackend, content: bytes) -> str:
+    if isinstance(backend, PagedExtractorBackend):
+        _, texts = backend.extract_pages(content, 0, sys.maxsize, float("inf"))
+        return "\n\n".join(text for text in texts if text)
+    return backend.extract(content)["text"]
+
+
+def _run_backend(name: str, documents: List[Dict[str, Any]], repeat: int) -> List[Dict[str, Any]]:
+    """Runs in a fresh process; returns one result row per document"""
+    backend = BACKENDS[name]
+    baseline = _peak_rss_bytes()
+    rows = []
+    for document in documents:
+        _extract(backend, document["content"])  # Warm-up: imports, font tables and parser caches
+        started = time.perf_counter()
+        for _ in range(repeat):
+            text = _extract(backend, document["content"])
+        seconds = (time.perf_counter() - started) / repeat
+        rows.append({
+            "backend": name,
+            "document": document["name"],
+            "pages": document["pages"],
+            "bytes": len(document["content"]),
+            "characters": len(text),
+            "seconds": seconds,
+            "pages_per_second": document["pages"] / seconds if seconds else float("inf"),
+            "peak_rss_mb": _peak_rss_bytes() / 1e6,
+            "baseline_rss_mb": baseline / 1e6,
+        })
+    return rows
+
+
+def benchmark(backends: List[str], page_counts: List[int], repeat: int) -> List[Dict[str, Any]]:
+    corpus = build_corpus(page_counts)
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for name in backends:
+        documents = [document for document in corpus if document["type"] == KIND_TYPES.get(BACKENDS[name].kind)]
+        with context.Pool(1) as pool:
+            results.extend(pool.apply(_run_backend, (name, documents, repeat)))
+    return results
+
+
+def _print_table(results: List[Dict[str, Any]]):
+    header = f"{'backend':<12} {'document':<18} {'pages':>5} {'KB':>8} {'chars':>9} {'pages/s':>9} {'peak RSS MB':>12} {'(baseline)':>11}"
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        print(
+            f"{row['backend']:<12} {row['document']:<18} {row['pages']:>5} {row['bytes'] / 1024:>8.0f} "
+            f"{row['characters']:>9} {row['pages_per_second']:>9.1f} {row['peak_rss_mb']:>12.1f} {row['baseline_rss_mb']:>11.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="Comma-separated backend names")
+    parser.add_argument("--pages", default="1,10,50,200", help="Comma-separated page counts of the corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per document")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--save-corpus", metavar="DIR", help="Also write the generated documents to DIR")
+    args = parser.parse_args()
+
+    backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+    unknown = [name for name in backends if name not in BACKENDS]
+    if unknown:
+        parser.error(f"Unknown backends: {', '.join(unknown)}. Available: {', '.join(BACKENDS)}")
+    page_counts = [int(pages) for pages in args.pages.split(",")]
+
+    if args.save_corpus:
+        os.makedirs(args.save_corpus, exist_ok=True)
+        for document in build_corpus(page_counts):
+            with open(os.path.join(args.save_corpus, document["name"]), "wb") as file:
+                file.write(document["content"])
+
+    results = benchmark(backends, page_counts, max(1, args.repeat))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results)
+
+
+if __name__ == "__main__":
+    main()
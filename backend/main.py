@@ -2,23 +2,121 @@
 Brandstreams Backend API
 Main application entry point
 """
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 # Import modular components
 from app.config import Config
-from app.routers import brief_router, ad_creative_router, translation_router
-from app.routers import brief_router, ad_creative_router, image_processing_router
+from app.utils.metrics import metrics
+from app.utils.response_cache import ResponseCache
+from app.utils.file_extractor import FileExtractor
+from app.routers import (
+    brief_router,
+    ad_creative_router,
+    translation_router,
+    image_processing_router,
+    edit_session_router,
+    job_router,
+    asset_router,
+)
+from app.services import (
+    create_model_backend,
+    TranslationMemory,
+    create_job_store,
+    JobManager,
+    EditSessionManager,
+    OperationPoller,
+    create_asset_store,
+    ImagePreprocessor,
+    ModelExecutor,
+    ModelScheduler,
+    ResiliencePolicy,
+    BriefCompactor,
+    BriefIngestionPolicy,
+    GeminiService,
+    TranslationService,
+    AdCreativeService,
+    AssetGenerationService,
+    ImageProcessingService,
+)
 
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the model backend and services once for the lifetime of the app"""
+    backend = create_model_backend()
+    scheduler = ModelScheduler()
+    executor = ModelExecutor(scheduler, ResiliencePolicy())
+    brief_cache = ResponseCache(
+        "brief_analysis",
+        max_entries=Config.BRIEF_CACHE_MAX_ENTRIES,
+        directory=Config.BRIEF_CACHE_DIR or None,
+        ttl=Config.BRIEF_CACHE_TTL,
+        max_bytes=Config.BRIEF_CACHE_MAX_BYTES
+    )
+    translation_memory = None
+    if Config.TRANSLATION_MEMORY_ENABLED:
+        translation_memory = TranslationMemory(Config.TRANSLATION_MEMORY_PATH or ":memory:")
+    operation_poller = OperationPoller(backend, executor)
+    asset_store = create_asset_store()
+    image_preprocessor = ImagePreprocessor()
+    job_store = create_job_store()
+    job_manager = JobManager(job_store, executor)
+    await job_manager.start()
+    edit_session_manager = EditSessionManager(asset_store, executor)
+    extraction_cache = ResponseCache(
+        "document_extraction",
+        max_entries=Config.EXTRACTION_CACHE_MAX_ENTRIES,
+        directory=Config.EXTRACTION_CACHE_DIR or None,
+        ttl=Config.EXTRACTION_CACHE_TTL,
+        max_bytes=Config.EXTRACTION_CACHE_MAX_BYTES
+    )
+    file_extractor = FileExtractor(executor, cache=extraction_cache)
+    await edit_session_manager.start()
+
+    app.state.model_backend = backend
+    app.state.model_scheduler = scheduler
+    app.state.model_executor = executor
+    app.state.gemini_service = GeminiService(backend, executor, brief_cache, BriefCompactor())
+    app.state.translation_service = TranslationService(backend, executor, translation_memory)
+    app.state.ad_creative_service = AdCreativeService(backend, executor, image_preprocessor)
+    app.state.asset_generation_service = AssetGenerationService(
+        backend, executor, operation_poller, asset_store, image_preprocessor
+    )
+    app.state.image_processing_service = ImageProcessingService(
+        backend, executor, asset_store, image_preprocessor
+    )
+    app.state.file_extractor = file_extractor
+    app.state.brief_ingestion = BriefIngestionPolicy(file_extractor, executor)
+    app.state.job_manager = job_manager
+    app.state.edit_session_manager = edit_session_manager
+    app.state.asset_store = asset_store
+
+    yield
+
+    await job_manager.shutdown()
+    await edit_session_manager.shutdown()
+    await operation_poller.shutdown()
+    executor.shutdown()
+    file_extractor.shutdown()
+    backend.close()
+    if translation_memory is not None:
+        translation_memory.close()
+    job_store.close()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title=Config.API_TITLE,
     description=Config.API_DESCRIPTION,
-    version=Config.API_VERSION
+    version=Config.API_VERSION,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -35,6 +133,9 @@ app.include_router(brief_router.router)
 app.include_router(ad_creative_router.router)
 app.include_router(translation_router.router)
 app.include_router(image_processing_router.router)
+app.include_router(edit_session_router.router)
+app.include_router(job_router.router)
+app.include_router(asset_router.router)
 
 
 @app.get("/")
@@ -57,6 +158,15 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def get_metrics(request: Request):
+    """Scheduler queue state and collected runtime metrics"""
+    return {
+        "scheduler": request.app.state.model_scheduler.snapshot(),
+        **metrics.snapshot()
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
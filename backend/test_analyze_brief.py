@@ -3,6 +3,8 @@ Test script for the analyze-brief endpoint
 """
 import asyncio
 from app.config import Config
+from app.services.model_backend import create_model_backend
+from app.services.model_executor import ModelExecutor
 from app.services.gemini_service import GeminiService
 from app.models.brief_models import BriefAnalysisResponse
 
@@ -40,7 +42,7 @@ async def test_brief_analysis():
     print("\n" + "=" * 60)
 
     try:
-        gemini_service = GeminiService()
+        gemini_service = GeminiService(create_model_backend(), ModelExecutor())
         result = await gemini_service.analyze_creative_brief(sample_brief)
 
         print("\n✅ Analysis Complete!")
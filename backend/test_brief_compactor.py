@@ -0,0 +1,104 @@
+"""
+Unit tests for BriefCompactor and split_sections
+
+Run with: python -m pytest test_brief_compactor.py
+"""
+from app.services.brief_compactor import TRUNCATION_MARK, BriefCompactor, split_sections
+from app.services.model_scheduler import estimate_tokens
+
+
+def _compact(text: str, max_tokens: int = 0) -> str:
+    return BriefCompactor(max_tokens=max_tokens, enabled=True).compact(text)
+
+
+def _page(number: int, body: str) -> str:
+    return f"ACME Spring Campaign - Confidential\n{body}\n{number}"
+
+
+def test_keeps_short_values_and_ratios():
+    text = "Number of video variations\n4\nAspect ratio\n4/5\nBudget (k EUR)\n250"
+    assert _compact(text) == text
+
+
+def test_keeps_numeric_paragraphs_that_do_not_count_up():
+    text = "Number of variations\n\n3\n\nNumber of channels\n\n3\n\nBudget\n\n250"
+    assert _compact(text) == text
+
+
+def test_drops_page_labels_anywhere():
+    text = "Objectives\nPage 2 of 7\nDrive trial among urban gym-goers"
+    assert _compact(text) == "Objectives\nDrive trial among urban gym-goers"
+
+
+def test_drops_page_numbers_counting_up_across_pages():
+    pages = [_page(number, f"Body text of page {number}") for number in range(1, 5)]
+    compacted = _compact("\n\n".join(pages))
+    assert compacted.splitlines()[-1] == "Body text of page 4"
+    for number in range(1, 5):
+        assert f"\n{number}\n" not in f"\n{compacted}\n"
+
+
+def test_drops_page_x_of_y_footers_counting_up():
+    pages = [f"Page body {number}\nmore text\n{number} / 3" for number in range(1, 4)]
+    assert "/ 3" not in _compact("\n\n".join(pages))
+
+
+def test_keeps_page_numbers_when_too_few_pages():
+    text = "Intro\nBody\n1\n\nMore\nBody\n2"
+    assert _compact(text) == text
+
+
+def test_removes_running_header_after_the_first_page():
+    pages = [_page(number, f"Body text of page {number}") for number in range(1, 4)]
+    compacted = _compact("\n\n".join(pages))
+    assert compacted.count("ACME Spring Campaign - Confidential") == 1
+    assert compacted.startswith("ACME Spring Campaign - Confidential")
+
+
+def test_keeps_repeated_lines_inside_the_body():
+    line = "Deliver a 15 second cut for every market"
+    text = f"Video\n{line}\nfor launch\n\nStatic\n{line}\nfor retail"
+    assert _compact(text).count(line) == 2
+
+
+def test_keeps_repeated_single_line_paragraphs():
+    paragraph = "Mandatory: legal line on the final frame"
+    text = f"Video\n\n{paragraph}\n\nStatic\n\n{paragraph}"
+    assert _compact(text).count(paragraph) == 2
+
+
+def test_removes_table_header_repeated_after_page_break():
+    header = "Channel | Format | Budget"
+    text = f"{header}\nInstagram | Reels | 40%\n\n{header}\nYouTube | Shorts | 35%"
+    compacted = _compact(text)
+    assert compacted.count(header) == 1
+    assert "YouTube | Shorts | 35%" in compacted
+
+
+def test_collapses_merged_table_cells():
+    assert _compact("Q3 | Q3 | Launch\nQ4 | Retail | Retail") == "Q3 | Launch\nQ4 | Retail"
+
+
+def test_normalizes_whitespace_and_invisible_characters():
+    assert _compact("Brand:\u200b  ACME\r\n\r\n\r\n\r\nTone:\tplayful ") == "Brand: ACME\n\nTone: playful"
+
+
+def test_fits_budget_and_keeps_every_paragraph():
+    text = "\n\n".join(["Heading"] + ["word " * 400] * 3 + ["Closing line"])
+    compacted = _compact(text, max_tokens=200)
+    assert estimate_tokens(compacted) <= 200
+    paragraphs = compacted.split("\n\n")
+    assert paragraphs[0] == "Heading" and paragraphs[-1] == "Closing line"
+    assert all(paragraph.endswith(TRUNCATION_MARK) for paragraph in paragraphs[1:-1])
+
+
+def test_disabled_returns_text_unchanged():
+    text = "Page 1\n\nA\u200b  B"
+    assert BriefCompactor(enabled=False).compact(text) == text
+
+
+def test_split_sections_packs_paragraphs_in_order():
+    paragraphs = [f"Paragraph {index} " + "x" * 30 for index in range(10)]
+    chunks = split_sections("\n\n".join(paragraphs), max_tokens=25)
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert "\n\n".join(chunks) == "\n\n".join(paragraphs)
@@ -1,9 +1,11 @@
 import json
 from app.models.brief_models import BriefAnalysisResponse
+from app.services.model_backend import create_model_backend
+from app.services.model_executor import ModelExecutor
 from app.services.gemini_service import GeminiService
 
 # Test the schema flattening
-service = GeminiService()
+service = GeminiService(create_model_backend(), ModelExecutor())
 original_schema = BriefAnalysisResponse.model_json_schema()
 flattened_schema = service._flatten_schema(original_schema)
 
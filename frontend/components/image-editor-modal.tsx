@@ -8,7 +8,7 @@ import {
   DialogTitle,
 } from "@/components/ui/dialog"
 import { Button } from "@/components/ui/button"
-import { applyImageFilter, applyImageAdjustment } from "@/services/api"
+import { applyImageFilter, applyImageAdjustment, resolveAssetUrl } from "@/services/api"
 
 type EditorTool = 'crop' | 'adjust' | 'filters'
 type AspectRatio = 'free' | '1:1' | '4:3' | '3:2' | '16:9' | '21:9' | '9:16' | '4:5' | '2:3'
@@ -16,7 +16,7 @@ type AspectRatio = 'free' | '1:1' | '4:3' | '3:2' | '16:9' | '21:9' | '9:16' | '
 interface ImageEditorModalProps {
   open: boolean
   onOpenChange: (open: boolean) => void
-  imageBase64: string
+  imageSrc: string
   mimeType: string
   onSave: (editedImageBase64: string) => void
 }
@@ -42,7 +42,7 @@ const TOOL_CONFIG = {
 export function ImageEditorModal({
   open,
   onOpenChange,
-  imageBase64,
+  imageSrc,
   mimeType,
   onSave
 }: ImageEditorModalProps) {
@@ -109,7 +109,7 @@ export function ImageEditorModal({
   }, [historyIndex])
 
   useEffect(() => {
-    console.log('🔍 useEffect triggered - open:', open, 'hasCanvas:', !!canvasRef.current, 'hasImageData:', !!imageBase64)
+    console.log('🔍 useEffect triggered - open:', open, 'hasCanvas:', !!canvasRef.current, 'hasImageData:', !!imageSrc)
     
     if (!open) {
       console.log('⏸️ Modal not open, skipping')
@@ -120,7 +120,7 @@ export function ImageEditorModal({
       console.log('⏸️ Canvas ref not ready, waiting...')
       // Try again after a short delay
       const timer = setTimeout(() => {
-        if (canvasRef.current && imageBase64) {
+        if (canvasRef.current && imageSrc) {
           console.log('🔄 Retrying image load after canvas ready')
           loadImage()
         }
@@ -128,24 +128,24 @@ export function ImageEditorModal({
       return () => clearTimeout(timer)
     }
     
-    if (!imageBase64) {
+    if (!imageSrc) {
       console.log('❌ No image data provided')
       setImageError('No image data provided')
       return
     }
     
     loadImage()
-  }, [open, imageBase64, mimeType])
+  }, [open, imageSrc, mimeType])
   
   const loadImage = useCallback(() => {
     const canvas = canvasRef.current
-    if (!canvas || !imageBase64) {
+    if (!canvas || !imageSrc) {
       console.log('❌ Cannot load - missing canvas or image data')
       return
     }
     
     console.log('🖼️ Starting image load...')
-    console.log('📊 imageBase64 length:', imageBase64.length)
+    console.log('📊 imageSrc length:', imageSrc.length)
     console.log('📊 mimeType:', mimeType)
       
     setImageLoaded(false)
@@ -202,10 +202,10 @@ export function ImageEditorModal({
         }
       }, 10000) // 10 second timeout
       
-      const dataUrl = `data:${mimeType};base64,${imageBase64}`
     console.log('🖼️ Setting image source...')
-    img.src = dataUrl
-  }, [imageBase64, mimeType])
+    img.crossOrigin = 'anonymous' // Asset URLs are cross-origin; keep the canvas exportable
+    img.src = imageSrc
+  }, [imageSrc, mimeType])
 
   useEffect(() => {
     if (open) {
@@ -325,7 +325,8 @@ export function ImageEditorModal({
           setHasChanges(true)
         }
       }
-      img.src = `data:${result.mime_type};base64,${result.adjusted_image_base64}`
+      img.crossOrigin = 'anonymous'
+      img.src = resolveAssetUrl(result.image_url)
       
       // Clear prompt on successful application
       if (customAdjustPrompt === prompt) {
@@ -361,7 +362,8 @@ export function ImageEditorModal({
           setHasChanges(true)
         }
       }
-      img.src = `data:${result.mime_type};base64,${result.filtered_image_base64}`
+      img.crossOrigin = 'anonymous'
+      img.src = resolveAssetUrl(result.image_url)
       
       // Clear prompt on successful application
       if (customFilterPrompt === prompt) {
@@ -5,7 +5,7 @@ import { Edit3 } from "lucide-react"
 import { Button } from "@/components/ui/button"
 import { useAppSelector, useAppDispatch } from "@/services/store/hooks"
 import { setImageEvaluation, setEvaluating } from "@/services/store/slices/assetsSlice"
-import { evaluateAdCreative, translateCopy } from "@/services/api"
+import { evaluateAdCreative, translateCopy, resolveAssetUrl, GeneratedImage } from "@/services/api"
 import { ScoreBar } from "@/components/ui/score-bar"
 import JSZip from "jszip"
 import { saveAs } from "file-saver"
@@ -112,7 +112,7 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
   // Image editor state
   const [editingImage, setEditingImage] = useState<{
     variationNumber: number
-    imageBase64: string
+    imageSrc: string
     mimeType: string
   } | null>(null)
   const [editedImages, setEditedImages] = useState<Map<number, string>>(new Map())
@@ -134,8 +134,7 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
           generatedImages.map(async (image) => {
             try {
               const evaluation = await evaluateAdCreative(
-                image.image_base64,
-                image.mime_type,
+                image.asset_id,
                 imagePrompt
               )
               dispatch(setImageEvaluation({
@@ -157,15 +156,10 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
     return () => clearTimeout(timeoutId)
   }, [generatedImages.length, imagePrompt, dispatch])
 
-  const downloadSingleImage = (imageBase64: string, variationNumber: number, mimeType: string) => {
-    // Convert base64 to blob
-    const byteCharacters = atob(imageBase64)
-    const byteNumbers = new Array(byteCharacters.length)
-    for (let i = 0; i < byteCharacters.length; i++) {
-      byteNumbers[i] = byteCharacters.charCodeAt(i)
-    }
-    const byteArray = new Uint8Array(byteNumbers)
-    const blob = new Blob([byteArray], { type: mimeType })
+  const downloadSingleImage = async (imageSrc: string, variationNumber: number, mimeType: string) => {
+    // Fetch the asset (or decode the edited data URL) into a blob
+    const response = await fetch(imageSrc)
+    const blob = new Blob([await response.blob()], { type: mimeType })
 
     // Create download link
     const url = URL.createObjectURL(blob)
@@ -178,14 +172,9 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
     URL.revokeObjectURL(url)
   }
 
-  const downloadVideo = (videoBase64: string, mimeType: string) => {
-    const byteCharacters = atob(videoBase64)
-    const byteNumbers = new Array(byteCharacters.length)
-    for (let i = 0; i < byteCharacters.length; i++) {
-      byteNumbers[i] = byteCharacters.charCodeAt(i)
-    }
-    const byteArray = new Uint8Array(byteNumbers)
-    const blob = new Blob([byteArray], { type: mimeType })
+  const downloadVideo = async (videoUrl: string, mimeType: string) => {
+    const response = await fetch(resolveAssetUrl(videoUrl))
+    const blob = new Blob([await response.blob()], { type: mimeType })
 
     const url = URL.createObjectURL(blob)
     const link = document.createElement('a')
@@ -202,10 +191,10 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
     // Optional: Show a toast notification
   }
 
-  const openImageEditor = (variationNumber: number, imageBase64: string, mimeType: string) => {
+  const openImageEditor = (variationNumber: number, imageSrc: string, mimeType: string) => {
     setEditingImage({
       variationNumber,
-      imageBase64: editedImages.get(variationNumber) || imageBase64,
+      imageSrc,
       mimeType
     })
   }
@@ -217,8 +206,10 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
     }
   }
 
-  const getImageBase64 = (variationNumber: number, originalBase64: string) => {
-    return editedImages.get(variationNumber) || originalBase64
+  // Edited images live in the browser as base64; originals are served by the asset endpoint
+  const getImageSrc = (image: GeneratedImage) => {
+    const edited = editedImages.get(image.variation_number)
+    return edited ? `data:${image.mime_type};base64,${edited}` : resolveAssetUrl(image.image_url)
   }
 
   
@@ -229,29 +220,18 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
     // Add images to zip (use edited versions if available)
     if (generatedImages.length > 0) {
       const imagesFolder = zip.folder('images')
-      generatedImages.forEach((img) => {
-        const imageBase64 = getImageBase64(img.variation_number, img.image_base64)
-        const byteCharacters = atob(imageBase64)
-        const byteNumbers = new Array(byteCharacters.length)
-        for (let i = 0; i < byteCharacters.length; i++) {
-          byteNumbers[i] = byteCharacters.charCodeAt(i)
-        }
-        const byteArray = new Uint8Array(byteNumbers)
+      await Promise.all(generatedImages.map(async (img) => {
+        const response = await fetch(getImageSrc(img))
         const suffix = editedImages.has(img.variation_number) ? '_edited' : ''
-        imagesFolder?.file(`${brandName}_image_variation_${img.variation_number}${suffix}.png`, byteArray)
-      })
+        imagesFolder?.file(`${brandName}_image_variation_${img.variation_number}${suffix}.png`, await response.arrayBuffer())
+      }))
     }
 
     // Add video to zip
-    if (generatedVideo && generatedVideo.video_base64) {
+    if (generatedVideo && generatedVideo.asset_id) {
       const videoFolder = zip.folder('video')
-      const byteCharacters = atob(generatedVideo.video_base64)
-      const byteNumbers = new Array(byteCharacters.length)
-      for (let i = 0; i < byteCharacters.length; i++) {
-        byteNumbers[i] = byteCharacters.charCodeAt(i)
-      }
-      const byteArray = new Uint8Array(byteNumbers)
-      videoFolder?.file(`${brandName}_video.mp4`, byteArray)
+      const response = await fetch(resolveAssetUrl(generatedVideo.video_url))
+      videoFolder?.file(`${brandName}_video.mp4`, await response.arrayBuffer())
     }
 
     // Add copy to zip
@@ -352,7 +332,7 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
                   {/* Image Preview */}
                   <div className="aspect-square bg-card dark:bg-card/50 flex items-center justify-center relative overflow-hidden">
                     <img
-                      src={`data:${image.mime_type};base64,${getImageBase64(image.variation_number, image.image_base64)}`}
+                      src={getImageSrc(image)}
                       alt={`Generated variation ${image.variation_number}`}
                       className="w-full h-full object-cover"
                     />
@@ -361,7 +341,7 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
                     {/* Hover overlay with edit and download buttons */}
                     <div className="absolute inset-0 flex items-center justify-center gap-2 opacity-0 group-hover:opacity-100 transition-opacity">
                       <Button
-                        onClick={() => openImageEditor(image.variation_number, getImageBase64(image.variation_number, image.image_base64), image.mime_type)}
+                        onClick={() => openImageEditor(image.variation_number, getImageSrc(image), image.mime_type)}
                         size="sm"
                         className="bg-purple-500/90 hover:bg-purple-600 text-white"
                       >
@@ -369,7 +349,7 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
                         Edit
                       </Button>
                       <Button
-                        onClick={() => downloadSingleImage(getImageBase64(image.variation_number, image.image_base64), image.variation_number, image.mime_type)}
+                        onClick={() => downloadSingleImage(getImageSrc(image), image.variation_number, image.mime_type)}
                         size="sm"
                         className="bg-white/90 hover:bg-white text-foreground"
                       >
@@ -390,7 +370,7 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
                         <Button
                           variant="outline"
                           size="sm"
-                          onClick={() => openImageEditor(image.variation_number, getImageBase64(image.variation_number, image.image_base64), image.mime_type)}
+                          onClick={() => openImageEditor(image.variation_number, getImageSrc(image), image.mime_type)}
                           className="bg-transparent border-border hover:border-purple-500 hover:text-purple-400"
                         >
                           <Edit3 className="w-3 h-3" />
@@ -398,7 +378,7 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
                         <Button
                           variant="outline"
                           size="sm"
-                          onClick={() => downloadSingleImage(getImageBase64(image.variation_number, image.image_base64), image.variation_number, image.mime_type)}
+                          onClick={() => downloadSingleImage(getImageSrc(image), image.variation_number, image.mime_type)}
                           className="bg-transparent border-border hover:border-purple-500 hover:text-purple-400"
                         >
                           <Download className="w-3 h-3" />
@@ -487,7 +467,7 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
               <div className="border border-border rounded-xl overflow-hidden hover:border-green-500/50 transition-all hover:shadow-lg hover:shadow-green-500/10">
             <div className="aspect-video bg-card dark:bg-card/50 flex items-center justify-center">
               <video
-                src={`data:${generatedVideo.mime_type};base64,${generatedVideo.video_base64}`}
+                src={resolveAssetUrl(generatedVideo.video_url)}
                 controls
                 className="w-full h-full"
               />
@@ -497,21 +477,13 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
                 <h4 className="font-medium text-foreground text-sm">Ad Creative Video</h4>
                 <p className="text-xs text-muted-foreground mt-1">MP4 Format • {generatedVideo.duration_seconds || 5}s</p>
               </div>
-              {generatedVideo.video_base64 && (
-                <Button
-                  variant="outline"
-                  size="sm"
-                  onClick={() => downloadVideo(generatedVideo.video_base64!, generatedVideo.mime_type)}
-                  className="bg-transparent border-border hover:border-green-500 hover:text-green-400"
-                >
-                  <Download className="w-3 h-3" />
-                </Button>
-              )}
-              {generatedVideo.video_url && !generatedVideo.video_base64 && (
+              {generatedVideo.video_url && (
                 <Button
                   variant="outline"
                   size="sm"
-                  onClick={() => window.open(generatedVideo.video_url, '_blank')}
+                  onClick={() => generatedVideo.asset_id
+                    ? downloadVideo(generatedVideo.video_url, generatedVideo.mime_type)
+                    : window.open(generatedVideo.video_url, '_blank')}
                   className="bg-transparent border-border hover:border-green-500 hover:text-green-400"
                 >
                   <Download className="w-3 h-3" />
@@ -694,7 +666,7 @@ export function ReviewExport({ onPrev }: ReviewExportProps) {
         <ImageEditorModal
           open={true}
           onOpenChange={(open) => !open && setEditingImage(null)}
-          imageBase64={editingImage.imageBase64}
+          imageSrc={editingImage.imageSrc}
           mimeType={editingImage.mimeType}
           onSave={handleImageEditSave}
         />
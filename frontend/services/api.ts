@@ -81,6 +81,15 @@ export interface BriefAnalysisResponse {
 // Get the backend API URL from environment variable or use default
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
 
+/**
+ * Resolves an asset URL returned by the backend (relative paths are served by the API)
+ * @param url - Absolute URL or path such as /api/assets/<id>
+ * @returns URL usable in the browser
+ */
+export function resolveAssetUrl(url: string): string {
+  return url.startsWith('/') ? `${API_BASE_URL}${url}` : url
+}
+
 /**
  * Analyzes a creative brief by sending it to the backend API
  * @param fileOrText - Either the uploaded file (PDF or DOCX) or plain text string
@@ -160,15 +169,16 @@ export interface ImageEvaluationScores {
 }
 
 export interface GeneratedImage {
-  image_base64: string
+  asset_id: string
+  image_url: string
   variation_number: number
   mime_type: string
   evaluation?: ImageEvaluationScores
 }
 
 export interface GeneratedVideo {
-  video_base64?: string
-  video_url?: string
+  video_url: string
+  asset_id?: string
   mime_type: string
   duration_seconds?: number
 }
@@ -248,27 +258,16 @@ export async function generateAssets(params: AssetGenerationParams): Promise<Ass
 
 /**
  * Evaluates a generated ad creative image
- * @param imageBase64 - Base64 encoded image
- * @param mimeType - MIME type of the image
+ * @param imageAssetId - Asset ID of the stored image
  * @param imagePrompt - The prompt used to generate the image
  * @returns Promise with the evaluation scores
  */
 export async function evaluateAdCreative(
-  imageBase64: string,
-  mimeType: string,
+  imageAssetId: string,
   imagePrompt: string
 ): Promise<ImageEvaluationScores> {
-  // Convert base64 to blob
-  const byteCharacters = atob(imageBase64)
-  const byteNumbers = new Array(byteCharacters.length)
-  for (let i = 0; i < byteCharacters.length; i++) {
-    byteNumbers[i] = byteCharacters.charCodeAt(i)
-  }
-  const byteArray = new Uint8Array(byteNumbers)
-  const blob = new Blob([byteArray], { type: mimeType })
-
   const formData = new FormData()
-  formData.append('image', blob, 'image.png')
+  formData.append('image_asset_id', imageAssetId)
   formData.append('image_prompt', imagePrompt)
 
   const response = await fetch(`${API_BASE_URL}/api/evaluate-ad-creative`, {
@@ -334,6 +333,16 @@ export async function translateCopy(
   return response.json()
 }
 
+/**
+ * Result of an image filter or adjustment, stored server-side
+ */
+export interface ProcessedImage {
+  asset_id: string
+  image_url: string
+  mime_type: string
+  engine: 'local' | 'model'
+}
+
 /**
  * Applies AI-powered filter to an image
  * @param imageBase64 - Base64 encoded image
@@ -345,7 +354,7 @@ export async function applyImageFilter(
   imageBase64: string,
   mimeType: string,
   filterPrompt: string
-): Promise<{ filtered_image_base64: string; mime_type: string }> {
+): Promise<ProcessedImage> {
   const response = await fetch(`${API_BASE_URL}/api/image/filter`, {
     method: 'POST',
     headers: {
@@ -377,7 +386,7 @@ export async function applyImageAdjustment(
   imageBase64: string,
   mimeType: string,
   adjustmentPrompt: string
-): Promise<{ adjusted_image_base64: string; mime_type: string }> {
+): Promise<ProcessedImage> {
   const response = await fetch(`${API_BASE_URL}/api/image/adjust`, {
     method: 'POST',
     headers: {
@@ -397,3 +406,101 @@ export async function applyImageAdjustment(
 
   return response.json()
 }
+
+/**
+ * One version in a server-side editing session
+ */
+export interface EditVersion {
+  version: number
+  parent: number | null
+  asset_id: string
+  image_url: string
+  mime_type: string
+  operation: 'original' | 'filter' | 'adjustment'
+  prompt: string | null
+  engine: 'local' | 'model' | null
+  created_at: number
+}
+
+/**
+ * Server-side editing session: version history and the current version
+ */
+export interface EditSession {
+  session_id: string
+  head: number
+  versions: EditVersion[]
+}
+
+async function editSessionRequest<T>(path: string, body: unknown, errorLabel: string): Promise<T> {
+  const response = await fetch(`${API_BASE_URL}/api/image/sessions${path}`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(body)
+  })
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({}))
+    throw new Error(errorData.detail || `Failed to ${errorLabel}: ${response.status}`)
+  }
+
+  return response.json()
+}
+
+/**
+ * Starts an editing session from a stored image, so later edits send no pixels
+ * @param assetId - Asset ID of the image to edit
+ * @returns Promise with the new session (version 0 is the original)
+ */
+export async function createEditSession(assetId: string): Promise<EditSession> {
+  return editSessionRequest<EditSession>('', { image_asset_id: assetId }, 'start editing session')
+}
+
+/**
+ * Applies a filter to a session version and makes the result the current version
+ * @param sessionId - Editing session ID
+ * @param filterPrompt - Text prompt describing the desired filter
+ * @param parentVersion - Version to edit (defaults to the current version)
+ * @returns Promise with the new version
+ */
+export async function applySessionFilter(
+  sessionId: string,
+  filterPrompt: string,
+  parentVersion?: number
+): Promise<EditVersion> {
+  return editSessionRequest<EditVersion>(
+    `/${sessionId}/filter`,
+    { filter_prompt: filterPrompt, parent_version: parentVersion ?? null },
+    'apply filter'
+  )
+}
+
+/**
+ * Applies an adjustment to a session version and makes the result the current version
+ * @param sessionId - Editing session ID
+ * @param adjustmentPrompt - Text prompt describing the desired adjustment
+ * @param parentVersion - Version to edit (defaults to the current version)
+ * @returns Promise with the new version
+ */
+export async function applySessionAdjustment(
+  sessionId: string,
+  adjustmentPrompt: string,
+  parentVersion?: number
+): Promise<EditVersion> {
+  return editSessionRequest<EditVersion>(
+    `/${sessionId}/adjust`,
+    { adjustment_prompt: adjustmentPrompt, parent_version: parentVersion ?? null },
+    'apply adjustment'
+  )
+}
+
+/**
+ * Makes an existing version current (undo, redo or switching branches)
+ * @param sessionId - Editing session ID
+ * @param version - Version number to make current
+ * @returns Promise with the updated session
+ */
+export async function checkoutEditVersion(sessionId: string, version: number): Promise<EditSession> {
+  return editSessionRequest<EditSession>(`/${sessionId}/head`, { version }, 'switch version')
+}